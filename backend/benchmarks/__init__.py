@@ -0,0 +1,13 @@
+"""
+Benchmarks for request hot paths.
+
+Run from the backend directory:
+
+    python -m benchmarks                          # every suite
+    python -m benchmarks --save benchmarks/baselines/ci.json
+    python -m benchmarks --compare benchmarks/baselines/ci.json
+    python -m benchmarks.revocation               # revocation check vs DB lookup
+
+Baselines hold absolute timings, so compare only against one recorded on
+the same machine class.
+"""
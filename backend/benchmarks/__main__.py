@@ -0,0 +1,57 @@
+# backend/benchmarks/__main__.py
+import argparse
+import importlib
+import sys
+
+from benchmarks.harness import compare_baseline, measure, print_table, save_baseline
+
+SUITES = ["auth", "serialization", "catalog", "tracing", "pricing", "profiling"]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run hot-path microbenchmarks")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--suite", action="append", choices=SUITES, help="suite to run (default: all)")
+    parser.add_argument("--save", metavar="PATH", help="store results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="fail on regressions against a baseline")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed slowdown of the median, as a fraction (default 0.2)")
+    args = parser.parse_args()
+
+    results, failures = [], []
+    for suite in args.suite or SUITES:
+        try:
+            cases = importlib.import_module(f"benchmarks.{suite}").cases()
+        except Exception as e:
+            failures.append(f"{suite} (setup): {type(e).__name__}: {e}")
+            continue
+        for case in cases:
+            if args.filter not in case.name:
+                continue
+            # One broken case is reported, not allowed to end the run
+            try:
+                results.append(measure(case.name, case.fn, repeat=case.repeat, note=case.note))
+            except Exception as e:
+                failures.append(f"{case.name}: {type(e).__name__}: {e}")
+    if results:
+        print_table(results)
+    if failures:
+        print(f"\n{len(failures)} benchmark(s) failed:")
+        for line in failures:
+            print(f"  - {line}")
+
+    if args.save:
+        save_baseline(args.save, results)
+    if args.compare:
+        regressions = compare_baseline(args.compare, results, args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.compare}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\nNo regressions vs {args.compare} (max {args.max_regression:.0%})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
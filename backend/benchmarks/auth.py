@@ -0,0 +1,55 @@
+# backend/benchmarks/auth.py
+"""Token, password and dependency-chain costs paid by authenticated requests."""
+import asyncio
+import time
+
+from jose import jwt
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.harness import Case
+from core.auth import create_tokens, get_password_hash, verify_password
+from core.config import settings
+from core.revocation import revocation_store
+from dependencies.auth import get_current_user
+from dependencies.roles import require_admin
+from models.token import RevokedToken
+from models.user import User, UserRole
+
+PASSWORD = "benchmark-password"
+
+
+def _admin_session():
+    """In-memory SQLite holding one admin, so the chain runs without a server."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    User.__table__.create(engine)
+    RevokedToken.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(User(username="bench-admin", email="bench@example.com", role=UserRole.admin))
+    db.commit()
+    return db
+
+
+def cases() -> list[Case]:
+    tokens = create_tokens("bench-admin")
+    hashed = get_password_hash(PASSWORD)
+    db = _admin_session()
+    loop = asyncio.new_event_loop()
+    # Steady state between revocation syncs
+    revocation_store._next_sync = time.monotonic() + 3600
+
+    async def admin_chain():
+        user = await get_current_user(token=tokens.access_token, db=db)
+        return await require_admin(user=user)
+
+    return [
+        Case("auth.create_tokens", lambda: create_tokens("bench-admin")),
+        Case("auth.jwt_decode", lambda: jwt.decode(
+            tokens.access_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+        )),
+        Case("auth.is_revoked", lambda: revocation_store.is_revoked("0" * 32)),
+        Case("auth.verify_password", lambda: verify_password(PASSWORD, hashed), repeat=3,
+             note=f"bcrypt rounds {settings.BCRYPT_ROUNDS}"),
+        Case("auth.require_admin_chain", lambda: loop.run_until_complete(admin_chain())),
+    ]
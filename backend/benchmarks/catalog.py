@@ -0,0 +1,85 @@
+# backend/benchmarks/catalog.py
+"""
+Product list pages end to end (query, load, serialize): every column vs a
+sparse fieldset, plus the cost of compressing a full page vs a cache hit.
+"""
+import asyncio
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.harness import Case
+from core.compression import CompressionMiddleware
+from models.category import Category, CategoryClosure
+from models.product import Product
+from schemas.product import ProductResponse, partial_product_response
+from services.catalog import parse_fields, product_list_query
+
+PAGE = 500
+LIST_FIELDS = "name,price,image_url"
+DESCRIPTION = "A long-form product description with specs, materials and care notes. " * 30
+
+
+def _catalog_session():
+    """In-memory SQLite with one page of products carrying realistic descriptions."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Category.__table__.create(engine)
+    CategoryClosure.__table__.create(engine)  # filled by the category insert hook
+    Product.__table__.create(engine)
+    db = sessionmaker(bind=engine)()
+    category = Category(name="Electronics")
+    db.add_all(
+        Product(
+            name=f"Product {i}",
+            description=DESCRIPTION,
+            price=round(9.99 + i * 0.37, 2),
+            image_url=f"https://res.cloudinary.com/demo/image/upload/v1/products/product_{i}.jpg",
+            category=category
+        )
+        for i in range(1, PAGE + 1)
+    )
+    db.commit()
+    return db
+
+
+def cases() -> list[Case]:
+    db = _catalog_session()
+    fields = parse_fields(LIST_FIELDS)
+    full = TypeAdapter(list[ProductResponse])
+    sparse = TypeAdapter(list[partial_product_response(fields)])
+
+    def page(adapter: TypeAdapter, selected):
+        def run() -> bytes:
+            db.expunge_all()  # load fresh rows every call, as a request would
+            return adapter.dump_json(adapter.validate_python(
+                product_list_query(db, 0, PAGE, fields=selected).all()
+            ))
+        return run
+
+    full_page, sparse_page = page(full, None), page(sparse, fields)
+    result = [
+        Case(f"catalog.page[{PAGE}].all_fields", full_page, note=f"{len(full_page()):,} bytes"),
+        Case(f"catalog.page[{PAGE}].fields={LIST_FIELDS}", sparse_page, note=f"{len(sparse_page()):,} bytes"),
+    ]
+
+    payload = full_page()
+    compression = CompressionMiddleware(app=None)
+    loop = asyncio.new_event_loop()
+    encodings = ("gzip", "br") if compression._brotli else ("gzip",)
+    for encoding in encodings:
+        size = len(compression._compress(payload, encoding))
+        result.append(Case(
+            f"compress.page[{PAGE}].{encoding}",
+            lambda encoding=encoding: compression._compress(payload, encoding),
+            note=f"{size:,} bytes"
+        ))
+        # Two passes admit the body; later calls are cache hits
+        for _ in range(2):
+            loop.run_until_complete(compression.compress(payload, encoding, cacheable=True))
+        result.append(Case(
+            f"compress.page[{PAGE}].{encoding}.cached",
+            lambda encoding=encoding: loop.run_until_complete(compression.compress(payload, encoding, cacheable=True))
+        ))
+    return result
@@ -0,0 +1,77 @@
+# backend/benchmarks/harness.py
+"""Timing helpers shared by the benchmark scripts."""
+import json
+import statistics
+import timeit
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable
+
+
+@dataclass
+class Case:
+    """A named benchmark; `repeat` can be lowered for deliberately slow calls."""
+    name: str
+    fn: Callable[[], object]
+    repeat: int = 7
+    note: str = ""  # extra context printed next to the timing, e.g. payload size
+
+
+@dataclass
+class Measurement:
+    name: str
+    median: float  # seconds per call
+    best: float
+    calls: int
+    note: str = ""
+
+
+def measure(name: str, fn: Callable[[], object], repeat: int = 7, note: str = "") -> Measurement:
+    """Time `fn` with timeit, auto-sizing the loop so each run takes >= 0.2s."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return Measurement(
+        name=name,
+        median=statistics.median(runs),
+        best=min(runs),
+        calls=number * repeat,
+        note=note
+    )
+
+
+def format_duration(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def print_table(results: list[Measurement]) -> None:
+    width = max(len(r.name) for r in results) + 2
+    print(f"{'benchmark':<{width}}{'median':>12}{'best':>12}{'calls':>10}")
+    for r in results:
+        print(
+            f"{r.name:<{width}}{format_duration(r.median):>12}"
+            f"{format_duration(r.best):>12}{r.calls:>10}"
+            + (f"  {r.note}" if r.note else "")
+        )
+
+
+def save_baseline(path: str, results: list[Measurement]) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps({r.name: asdict(r) for r in results}, indent=2))
+
+
+def compare_baseline(path: str, results: list[Measurement], max_regression: float) -> list[str]:
+    """Benchmarks whose median got slower than the stored one by more than `max_regression`."""
+    baseline = json.loads(Path(path).read_text())
+    regressions = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base and r.median > base["median"] * (1 + max_regression):
+            regressions.append(
+                f"{r.name}: {format_duration(base['median'])} -> {format_duration(r.median)} "
+                f"(+{r.median / base['median'] - 1:.0%})"
+            )
+    return regressions
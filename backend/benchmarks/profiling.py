@@ -0,0 +1,55 @@
+# backend/benchmarks/profiling.py
+"""
+Cost of core.profiling: what an unprofiled request pays for the middleware,
+and one stack sample of a worker with busy and idle threads (the sampler
+spaces samples so this stays under PROFILING_MAX_OVERHEAD of wall time).
+"""
+import asyncio
+import threading
+import time
+
+from benchmarks.harness import Case
+from core.profiling import Profile, ProfilingMiddleware, SamplingProfiler
+
+BUSY_THREADS = 4
+IDLE_THREADS = 40
+STACK_DEPTH = 40
+SCOPE = {"type": "http", "method": "GET", "path": "/products/", "headers": [
+    (b"host", b"localhost"), (b"accept", b"application/json"), (b"authorization", b"Bearer x" * 20)
+]}
+
+
+def _park(depth: int, stop: threading.Event) -> None:
+    """Hold a deep stack that looks busy to the sampler, without competing for the GIL."""
+    if depth:
+        return _park(depth - 1, stop)
+    while not stop.is_set():
+        time.sleep(0.05)
+
+
+async def _app(scope, receive, send) -> None:
+    pass
+
+
+def cases() -> list[Case]:
+    stop = threading.Event()
+    for _ in range(BUSY_THREADS):
+        threading.Thread(target=_park, args=(STACK_DEPTH, stop), daemon=True).start()
+    for _ in range(IDLE_THREADS):
+        threading.Thread(target=stop.wait, daemon=True).start()
+
+    profiler = SamplingProfiler("profiles", interval=0.005, max_overhead=0.02, max_seconds=30, keep=1)
+    profile = Profile("request")
+
+    def sample_and_record() -> None:
+        for stack in profiler._sample():
+            profile.add(stack)
+
+    middleware = ProfilingMiddleware(_app, profiler, sample_rate=0.0, token="secret")
+    loop = asyncio.new_event_loop()
+    return [
+        Case("profiling.no_middleware", lambda: loop.run_until_complete(_app(SCOPE, None, None))),
+        Case("profiling.middleware.not_profiled", lambda: loop.run_until_complete(middleware(SCOPE, None, None))),
+        Case(f"profiling.sample[{BUSY_THREADS} busy x {STACK_DEPTH} deep, {IDLE_THREADS} idle]",
+             sample_and_record, note="one sample, recorded"),
+    ]
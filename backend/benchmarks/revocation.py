@@ -0,0 +1,71 @@
+# backend/benchmarks/revocation.py
+"""
+Cost of the token revocation check on the authenticated request path.
+
+    cd backend && python -m benchmarks.revocation [--entries 100000] [--with-db]
+
+Compares the in-memory denylist lookup against the JWT decode every
+request already pays for and, with --with-db, against the primary-key
+lookup a per-request database check would cost.
+"""
+import argparse
+import time
+from uuid import uuid4
+
+from jose import jwt
+
+from benchmarks.harness import measure, print_table
+from core.auth import create_access_token
+from core.config import settings
+from core.revocation import RevocationStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100_000, help="revoked ids held in memory")
+    parser.add_argument("--with-db", action="store_true", help="also time a DB primary-key lookup")
+    args = parser.parse_args()
+
+    store = RevocationStore(sync_interval=settings.REVOCATION_SYNC_SECONDS)
+    store._next_sync = time.monotonic() + 3600  # measure the steady state, not a sync
+    expires = time.time() + 3600
+    store._revoked = {uuid4().hex: expires for _ in range(args.entries)}
+    revoked_jti = next(iter(store._revoked))
+
+    token = create_access_token({"sub": "bench-user"})
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    jti = payload["jti"]
+
+    def decode():
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+
+    def decode_and_check():
+        claims = decode()
+        return store.is_revoked(claims.get("jti"))
+
+    results = [
+        measure("jwt.decode (baseline)", decode),
+        measure("jwt.decode + is_revoked", decode_and_check),
+        measure(f"is_revoked miss ({args.entries:,} entries)", lambda: store.is_revoked(jti)),
+        measure(f"is_revoked hit ({args.entries:,} entries)", lambda: store.is_revoked(revoked_jti)),
+        measure("maybe_sync (between syncs)", lambda: store.maybe_sync(None)),
+    ]
+
+    if args.with_db:
+        from database import SessionLocal
+        from models.token import RevokedToken
+
+        db = SessionLocal()
+        try:
+            results.append(measure(
+                "DB lookup by jti (per-request alternative)",
+                lambda: db.query(RevokedToken.jti).filter(RevokedToken.jti == jti).first()
+            ))
+        finally:
+            db.close()
+
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# backend/benchmarks/serialization.py
+"""Response-model validation and JSON serialization at realistic page sizes."""
+from datetime import datetime, timezone
+
+from pydantic import TypeAdapter
+
+from benchmarks.harness import Case
+from models.order import Order, OrderItem, OrderStatus
+from models.product import Product
+from models.user import User, UserRole
+from schemas.order import OrderResponse
+from schemas.product import ProductResponse
+from schemas.user import UserResponse
+
+PRODUCT_PAGES = (20, 100, 500)
+USER_PAGE = 100
+ORDER_PAGE = 50
+ITEMS_PER_ORDER = 4
+
+
+def _products(count: int) -> list[Product]:
+    return [
+        Product(
+            id=i,
+            name=f"Product {i}",
+            description="A reasonably detailed product description. " * 6,
+            price=round(9.99 + i * 0.37, 2),
+            image_url=f"https://res.cloudinary.com/demo/image/upload/v1/products/product_{i}.jpg"
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def _users(count: int) -> list[User]:
+    now = datetime.now(timezone.utc)
+    return [
+        User(id=i, username=f"user{i}", email=f"user{i}@example.com", role=UserRole.user, created_at=now)
+        for i in range(1, count + 1)
+    ]
+
+
+def _orders(count: int) -> list[Order]:
+    now = datetime.now(timezone.utc)
+    products = _products(ITEMS_PER_ORDER)
+    orders = []
+    for i in range(1, count + 1):
+        order = Order(id=i, user_id=1, status=OrderStatus.completed, total_price=99.5, created_at=now)
+        order.items = [
+            OrderItem(id=i * 10 + j, order_id=i, quantity=j + 1, price=product.price, product=product)
+            for j, product in enumerate(products)
+        ]
+        orders.append(order)
+    return orders
+
+
+def _page_cases(label: str, adapter: TypeAdapter, rows: list) -> list[Case]:
+    validated = adapter.validate_python(rows)
+    return [
+        Case(f"{label}.validate", lambda: adapter.validate_python(rows)),
+        Case(f"{label}.dump_json", lambda: adapter.dump_json(validated)),
+        Case(f"{label}.validate+dump_json", lambda: adapter.dump_json(adapter.validate_python(rows))),
+    ]
+
+
+def cases() -> list[Case]:
+    products = TypeAdapter(list[ProductResponse])
+    result = []
+    for size in PRODUCT_PAGES:
+        result += _page_cases(f"serialize.products[{size}]", products, _products(size))
+    result += _page_cases(f"serialize.users[{USER_PAGE}]", TypeAdapter(list[UserResponse]), _users(USER_PAGE))
+    result += _page_cases(
+        f"serialize.orders[{ORDER_PAGE}x{ITEMS_PER_ORDER}]", TypeAdapter(list[OrderResponse]), _orders(ORDER_PAGE)
+    )
+    return result
@@ -0,0 +1,34 @@
+# backend/benchmarks/tracing.py
+"""Per-span and per-request overhead of core.tracing, sampled and not."""
+from benchmarks.harness import Case
+from core import tracing
+from core.tracing import Trace, span
+
+
+def _traced(trace: Trace):
+    def run():
+        token = tracing._current.set(trace)
+        try:
+            with span("db", "SELECT"):
+                pass
+        finally:
+            tracing._current.reset(token)
+    return run
+
+
+def _untraced():
+    with span("db", "SELECT"):
+        pass
+
+
+def cases() -> list[Case]:
+    timed = Trace(sampled=False)
+    for category in ("db", "stripe", "hash"):
+        timed.record(category, "x", 0.0, 0.001)
+    return [
+        Case("tracing.span.outside_request", _untraced),
+        Case("tracing.span.unsampled", _traced(Trace(sampled=False))),
+        # Fresh trace per call so the span list doesn't grow without bound
+        Case("tracing.span.sampled", lambda: _traced(Trace(sampled=True))()),
+        Case("tracing.server_timing_header", timed.server_timing),
+    ]
@@ -13,6 +13,7 @@ from .auth import (
     get_current_user,
     get_current_active_user,
     validate_token,
+    revoke_token,
     Token,
     TokenData
 )
@@ -28,6 +29,7 @@ __all__ = [
     'get_current_user',
     'get_current_active_user',
     'validate_token',
+    'revoke_token',
     'Token',
     'TokenData'
 ]
\ No newline at end of file
@@ -1,6 +1,7 @@
 # backend/core/auth.py
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
+from uuid import uuid4
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -10,6 +11,8 @@ from sqlalchemy.orm import Session
 
 # Local imports
 from core.config import settings
+from core.tracing import span
+from core.revocation import revocation_store
 from models.user import User
 from database import get_db
 
@@ -17,7 +20,7 @@ from database import get_db
 # Security Setup
 # -----------------------------
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl="auth/login",
     scheme_name="JWT"
@@ -41,19 +44,21 @@ class TokenData(BaseModel):
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Securely verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    with span("hash", "bcrypt.verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Generate a secure password hash using bcrypt."""
-    return pwd_context.hash(password)
+    with span("hash", "bcrypt.hash"):
+        return pwd_context.hash(password)
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Generate a JWT access token with expiration."""
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
-        expires_delta or timedelta(minutes=settings.REFRESH_TOKEN_EXPIRES_DAYS)
+        expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRES_MINUTES)
     )
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid4().hex})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 def create_refresh_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -62,7 +67,7 @@ def create_refresh_token(data: dict, expires_delta: timedelta | None = None) ->
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRES_DAYS)
     )
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid4().hex})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 # -----------------------------
@@ -74,6 +79,10 @@ def authenticate_user(db: Session, username: str, password: str) -> User | None:
     user = db.query(User).filter(User.username == username).first()
     if not user or not verify_password(password, str(user.hashed_password)):
         return None
+    # Roll BCRYPT_ROUNDS changes out transparently, one login at a time
+    if pwd_context.needs_update(str(user.hashed_password)):
+        user.hashed_password = get_password_hash(password)
+        db.commit()
     return user
 
 # -----------------------------
@@ -94,12 +103,16 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("type") != "access":
             raise credentials_exception
         token_data = TokenData(username=username)
     except JWTError as e:
         raise credentials_exception from e
 
+    revocation_store.maybe_sync(db)
+    if revocation_store.is_revoked(payload.get("jti")):
+        raise credentials_exception
+
     user = db.query(User).filter(User.username == token_data.username).first()
     if user is None:
         raise credentials_exception
@@ -132,10 +145,28 @@ def validate_token(token: str) -> dict:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         if payload.get("type") not in ["access", "refresh"]:
             raise JWTError("Invalid token type")
+        if revocation_store.is_revoked(payload.get("jti")):
+            raise JWTError("Token has been revoked")
         return payload
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+
+def revoke_token(db: Session, payload: dict) -> bool:
+    """
+    Revoke a decoded token by its jti (the caller commits).
+    Returns False if it was already revoked or carries no jti.
+    """
+    jti = payload.get("jti")
+    if not jti:
+        return False
+    return revocation_store.revoke(
+        db,
+        jti=jti,
+        token_type=payload.get("type", "access"),
+        expires_at=float(payload["exp"]),
+        username=payload.get("sub")
+    )
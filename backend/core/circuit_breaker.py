@@ -0,0 +1,126 @@
+# backend/core/circuit_breaker.py
+"""
+Circuit breakers for calls to external services.
+
+A breaker is closed while calls succeed. After `failure_threshold`
+consecutive failures (timeouts, connection errors, 5xx/429 - whatever
+`is_failure` says) it opens, and for `reset_timeout` seconds every call
+fails immediately with CircuitOpenError instead of waiting on a degraded
+service while holding a threadpool slot and a DB connection. After that
+one call at a time is let through as a probe (half-open): success closes
+the breaker, failure opens it again.
+
+State is per worker process. main.py turns CircuitOpenError into a 503
+with Retry-After, and GET /admin/metrics shows every breaker's state.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        is_failure: Callable[[BaseException], bool] = lambda e: True
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.is_failure = is_failure
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        # counters for metrics
+        self.times_opened = 0
+        self.rejected = 0
+        BREAKERS[name] = self
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def _admit(self) -> bool:
+        """Whether a call may go ahead; True means it is the half-open probe."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return False
+            if state == HALF_OPEN and not self._probing:
+                self._state = HALF_OPEN
+                self._probing = True
+                return True
+            self.rejected += 1
+            retry_after = max(self.reset_timeout - (time.monotonic() - self._opened_at), 1.0)
+        raise CircuitOpenError(self.name, retry_after)
+
+    def _record(self, probe: bool, failed: bool) -> None:
+        with self._lock:
+            if probe:
+                self._probing = False
+            if not failed:
+                self._failures = 0
+                self._state = CLOSED
+                return
+            self._failures += 1
+            if probe or (self._state == CLOSED and self._failures >= self.failure_threshold):
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self.times_opened += 1
+
+    @contextmanager
+    def protect(self) -> Iterator[None]:
+        """Run the block through the breaker (raises CircuitOpenError while open)."""
+        probe = self._admit()
+        try:
+            yield
+        except BaseException as e:
+            self._record(probe, failed=self.is_failure(e))
+            raise
+        else:
+            self._record(probe, failed=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.times_opened = self.rejected = 0
+
+    def reset(self) -> None:
+        """Close the breaker and forget past failures."""
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probing = False
+
+
+BREAKERS: dict[str, CircuitBreaker] = {}
@@ -0,0 +1,197 @@
+# backend/core/compression.py
+"""
+gzip / brotli response compression (pure ASGI middleware).
+
+The encoding is negotiated from Accept-Encoding (q-values honoured,
+brotli preferred when the client accepts both and the `brotli` package is
+installed). Only complete, non-streamed JSON/text bodies above a size
+threshold are compressed, so Server-Sent Events and other streams pass
+through untouched.
+
+Compressed bytes of public GET responses are kept in a small LRU keyed by
+the body's digest, so identical payloads (e.g. the first catalog pages)
+are compressed once rather than on every request. A body is only admitted
+the second time it is seen, keeping one-off responses out of the cache.
+"""
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from anyio import to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+# Bodies bigger than this are compressed in a worker thread instead of on the event loop
+THREAD_THRESHOLD = 256 * 1024
+
+
+def parse_accept_encoding(value: str) -> dict[str, float]:
+    """'gzip, br;q=0.8, *;q=0' -> {'gzip': 1.0, 'br': 0.8, '*': 0.0}"""
+    accepted = {}
+    for part in value.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, number = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class CompressedCache:
+    """LRU of compressed bodies keyed by (encoding, body digest), with second-hit admission."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, bytes], bytes] = OrderedDict()
+        self._seen: OrderedDict[tuple[str, bytes], None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, bytes]) -> Optional[bytes]:
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compressed
+
+    def admit(self, key: tuple[str, bytes]) -> bool:
+        """True if `key` was seen before and its compressed body should now be stored."""
+        with self._lock:
+            if key in self._seen:
+                del self._seen[key]
+                return True
+            self._seen[key] = None
+            if len(self._seen) > self.max_entries * 4:
+                self._seen.popitem(last=False)
+            return False
+
+    def put(self, key: tuple[str, bytes], compressed: bytes) -> None:
+        with self._lock:
+            self._entries[key] = compressed
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_entries: int = 256,
+        cache_max_body: int = 4 * 1024 * 1024
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = CompressedCache(cache_entries) if cache_entries > 0 else None
+        self.cache_max_body = cache_max_body
+        try:
+            import brotli
+            self._brotli = brotli
+        except ImportError:
+            logger.info("brotli not installed; responses will only be gzip-compressed")
+            self._brotli = None
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        candidates = (("br", "gzip") if self._brotli else ("gzip",))
+        best, best_q = None, 0.0
+        for coding in candidates:
+            q = accepted.get(coding, wildcard)
+            if q > best_q:
+                best, best_q = coding, q
+        return best
+
+    def _compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return self._brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def compress(self, body: bytes, encoding: str, cacheable: bool) -> bytes:
+        key = None
+        if cacheable and self.cache and len(body) <= self.cache_max_body:
+            # sha256 is hardware-accelerated on most servers; ~1 ms per MB, far below compression
+            key = (encoding, hashlib.sha256(body).digest())
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        if len(body) > THREAD_THRESHOLD:
+            compressed = await to_thread.run_sync(self._compress, body, encoding)
+        else:
+            compressed = self._compress(body, encoding)
+
+        if key is not None and self.cache.admit(key):
+            self.cache.put(key, compressed)
+        return compressed
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes) -> bool:
+        content_type = headers.get("content-type", "")
+        return (
+            len(body) >= self.minimum_size
+            and "content-encoding" not in headers
+            and content_type.startswith(COMPRESSIBLE_TYPES)
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        encoding = self.negotiate(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        # Only public responses are cached; per-user bodies rarely repeat anyway
+        cacheable = scope["method"] == "GET" and "authorization" not in request_headers
+        initial: Optional[Message] = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal initial
+            if message["type"] == "http.response.start":
+                initial = message  # held back until we know what the body looks like
+                return
+            if message["type"] != "http.response.body" or initial is None:
+                await send(message)
+                return
+
+            start, initial = initial, None
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not self._should_compress(headers, body):
+                # Streamed or small/binary responses go out as-is
+                await send(start)
+                await send(message)
+                return
+
+            compressed = await self.compress(body, encoding, cacheable and start["status"] == 200)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -22,6 +22,21 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRES_DAYS: int = Field(
         default=7
     )
+    REVOCATION_SYNC_SECONDS: float = Field(
+        default=5,
+        description="How often each worker pulls new token revocations"
+    )
+    REVOCATION_REDIS_URL: str | None = Field(
+        default=None,
+        description="Optional Redis-compatible cache that shares revocations between workers"
+    )
+    BCRYPT_ROUNDS: int = Field(
+        default=12,
+        ge=4,
+        le=31,
+        description="bcrypt cost; pick it with `python -m scripts.calibrate_password_hash`. "
+                    "Hashes with another cost are upgraded at the user's next login"
+    )
     
     
     # Cloudinary configuration
@@ -37,6 +52,15 @@ class Settings(BaseSettings):
         default=...,  
         description="Cloudinary API Secret from your dashboard"
     )
+    CLOUDINARY_UPLOAD_PREFIX: str | None = Field(
+        default=None,
+        description="Override the Cloudinary API host (e.g. a local fake for load tests)"
+    )
+    CLOUDINARY_TIMEOUT_SECONDS: float = Field(
+        default=20,
+        gt=0,
+        description="Socket timeout for each Cloudinary upload/destroy/delete call"
+    )
     
 
     # Stripe Configuration
@@ -52,6 +76,265 @@ class Settings(BaseSettings):
         default="usd",
         description="Default currency for Stripe payments"
     )
+    PAYMENT_INTENT_REUSE_HOURS: int = Field(
+        default=24,
+        description="How long an unpaid PaymentIntent is reused for retries of the same checkout"
+    )
+    STRIPE_API_BASE: str | None = Field(
+        default=None,
+        description="Override the Stripe API host (e.g. a local fake for load tests)"
+    )
+    STRIPE_DEADLINE_SECONDS: float = Field(
+        default=10,
+        gt=0,
+        description="Time budget for one Stripe call, split evenly across its network retries"
+    )
+    STRIPE_MAX_NETWORK_RETRIES: int = Field(
+        default=1,
+        ge=0,
+        description="Retries (with the same idempotency key) after a Stripe connection error or 5xx"
+    )
+
+
+    # Rate limiting configuration
+    RATE_LIMIT_ENABLED: bool = Field(
+        default=True,
+        description="Throttle login/registration before any password hashing"
+    )
+    RATE_LIMIT_BACKEND: str = Field(
+        default="memory",
+        description="'memory' for a single node, 'redis' to share buckets across workers"
+    )
+    RATE_LIMIT_REDIS_URL: str = Field(
+        default="redis://localhost:6379/0",
+        description="Redis-compatible server used when RATE_LIMIT_BACKEND is 'redis'"
+    )
+    RATE_LIMIT_TRUST_PROXY_HEADERS: bool = Field(
+        default=False,
+        description="Key on X-Forwarded-For (only behind a trusted proxy)"
+    )
+    RATE_LIMIT_LOGIN_PER_IP: str = Field(
+        default="30/minute",
+        description="Login attempts allowed per client IP"
+    )
+    RATE_LIMIT_LOGIN_PER_USERNAME: str = Field(
+        default="5/minute",
+        description="Login attempts allowed per username"
+    )
+    RATE_LIMIT_REGISTER_PER_IP: str = Field(
+        default="10/hour",
+        description="Registrations allowed per client IP"
+    )
+    RATE_LIMIT_REGISTER_PER_USERNAME: str = Field(
+        default="3/hour",
+        description="Registration attempts allowed per requested username"
+    )
+
+
+    # Background jobs
+    SCHEDULER_ENABLED: bool = Field(
+        default=True,
+        description="Run periodic maintenance jobs inside the app workers"
+    )
+    MAINTENANCE_INTERVAL_SECONDS: int = Field(
+        default=300,
+        description="Seconds between cart-expiry / stale-order / revoked-token purge runs"
+    )
+    MAINTENANCE_BATCH_SIZE: int = Field(
+        default=1000,
+        description="Rows deleted/updated per statement by maintenance jobs"
+    )
+    CART_EXPIRY_DAYS: int = Field(
+        default=30,
+        description="Cart items untouched for this long are deleted"
+    )
+    PENDING_ORDER_TIMEOUT_MINUTES: int = Field(
+        default=60,
+        description="Orders still pending after this long are cancelled"
+    )
+
+    # Response compression
+    COMPRESSION_ENABLED: bool = Field(
+        default=True,
+        description="gzip/brotli-compress JSON and text responses"
+    )
+    COMPRESSION_MIN_SIZE: int = Field(
+        default=1024,
+        description="Smallest response body (bytes) worth compressing"
+    )
+    COMPRESSION_GZIP_LEVEL: int = Field(
+        default=6,
+        ge=1,
+        le=9,
+        description="gzip compression level"
+    )
+    COMPRESSION_BROTLI_QUALITY: int = Field(
+        default=5,
+        ge=0,
+        le=11,
+        description="brotli quality (used only if the brotli package is installed)"
+    )
+    COMPRESSION_CACHE_ENTRIES: int = Field(
+        default=256,
+        description="Compressed bodies of repeated public GET responses kept per worker (0 disables)"
+    )
+
+    # Outbox (external side effects)
+    OUTBOX_INTERVAL_SECONDS: float = Field(
+        default=2,
+        description="Seconds between outbox dispatcher runs"
+    )
+    OUTBOX_BATCH_SIZE: int = Field(
+        default=100,
+        description="Messages claimed per dispatcher batch"
+    )
+    OUTBOX_MAX_ATTEMPTS: int = Field(
+        default=10,
+        description="Deliveries tried before a message is marked failed"
+    )
+    OUTBOX_BACKOFF_SECONDS: float = Field(
+        default=5,
+        description="Base retry delay; doubles on every failed attempt (capped at an hour)"
+    )
+
+    # Catalog cache
+    CATALOG_CACHE_TTL_SECONDS: int = Field(
+        default=0,
+        description="Seconds a product stays in each worker's catalog cache (0 disables it)"
+    )
+    CATALOG_CACHE_MAX_ENTRIES: int = Field(
+        default=10_000,
+        description="Products kept per worker before least-recently-used ones are dropped"
+    )
+    CATEGORY_TREE_TTL_SECONDS: int = Field(
+        default=60,
+        description="Seconds a worker serves its cached category tree; edits on the same worker apply at once"
+    )
+
+    # Promotions
+    PROMOTIONS_CACHE_TTL_SECONDS: int = Field(
+        default=30,
+        description="Seconds a worker prices with its compiled promotion rules; edits on the same worker apply at once"
+    )
+
+    # Tracing
+    TRACING_ENABLED: bool = Field(
+        default=True,
+        description="Time DB, Stripe, Cloudinary and bcrypt work per request for Server-Timing and span export"
+    )
+    TRACING_TIMING_TOKEN: str = Field(
+        default="",
+        description="Requests sent with 'X-Server-Timing: <token>' get a Server-Timing header (empty: never sent)"
+    )
+    TRACING_SAMPLE_RATE: float = Field(
+        default=0.01,
+        ge=0,
+        le=1,
+        description="Fraction of requests whose individual spans are exported (plus any with a sampled traceparent)"
+    )
+    TRACING_EXPORTER: str = Field(
+        default="none",
+        description="'none', 'otlp' (OTLP/JSON over HTTP) or 'file' (one OTLP/JSON document per line)"
+    )
+    TRACING_OTLP_ENDPOINT: str = Field(
+        default="http://localhost:4318/v1/traces",
+        description="Collector endpoint used when TRACING_EXPORTER is 'otlp'"
+    )
+    TRACING_FILE: str = Field(
+        default="traces.jsonl",
+        description="File appended to when TRACING_EXPORTER is 'file'"
+    )
+    TRACING_SERVICE_NAME: str = Field(
+        default="lotuslynx",
+        description="service.name on exported spans"
+    )
+
+    # Profiling
+    PROFILING_ENABLED: bool = Field(
+        default=False,
+        description="Allow sampling profiles of live requests; when off nothing is installed"
+    )
+    PROFILING_SAMPLE_RATE: float = Field(
+        default=0.0,
+        ge=0,
+        le=1,
+        description="Fraction of requests profiled into each worker's aggregate 'sampled' profile"
+    )
+    PROFILING_TOKEN: str = Field(
+        default="",
+        description="Requests sent with 'X-Profile: <token>' get a profile of their own (empty disables the header)"
+    )
+    PROFILING_INTERVAL_MS: float = Field(
+        default=5,
+        gt=0,
+        description="Milliseconds between stack samples"
+    )
+    PROFILING_MAX_OVERHEAD: float = Field(
+        default=0.02,
+        gt=0,
+        le=0.5,
+        description="Most wall time the sampler may spend taking samples; it samples less often to stay under it"
+    )
+    PROFILING_MAX_SECONDS: float = Field(
+        default=30,
+        gt=0,
+        description="Longest a single request is sampled (long-lived streams stop counting after this)"
+    )
+    PROFILING_DIR: str = Field(
+        default="profiles",
+        description="Directory the workers write finished profiles to"
+    )
+    PROFILING_KEEP: int = Field(
+        default=50,
+        ge=1,
+        description="Single-request profiles kept on disk; older ones are deleted"
+    )
+
+    # Circuit breakers (Stripe, Cloudinary)
+    BREAKER_FAILURE_THRESHOLD: int = Field(
+        default=5,
+        ge=1,
+        description="Consecutive failed calls to a service before requests fail fast with 503"
+    )
+    BREAKER_RESET_SECONDS: float = Field(
+        default=30,
+        gt=0,
+        description="How long a breaker stays open before one probe call is let through"
+    )
+
+    # Request coalescing
+    SINGLE_FLIGHT_ENABLED: bool = Field(
+        default=True,
+        description="Concurrent identical product reads on a worker share one DB fetch"
+    )
+
+    # Product change stream (SSE)
+    PRODUCT_STREAM_ENABLED: bool = Field(
+        default=True,
+        description="Hold a LISTEN connection per worker and serve GET /products/stream"
+    )
+    PRODUCT_STREAM_QUEUE_SIZE: int = Field(
+        default=100,
+        description="Undelivered events per stream before the client is told to resync and dropped"
+    )
+    PRODUCT_STREAM_HEARTBEAT_SECONDS: float = Field(
+        default=15,
+        description="Idle streams get a comment this often so proxies keep them open"
+    )
+    PRODUCT_STREAM_MAX_CONNECTIONS: int = Field(
+        default=10_000,
+        description="Open streams per worker before new ones get 503"
+    )
+
+    # Recommendations
+    RECOMMENDATIONS_TOP_K: int = Field(
+        default=20,
+        description="Related products stored per product"
+    )
+    RECOMMENDATIONS_REFRESH_SECONDS: int = Field(
+        default=900,
+        description="Seconds between incremental 'frequently bought together' refreshes"
+    )
 
     model_config = SettingsConfigDict(
         env_file=".env",
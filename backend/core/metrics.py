@@ -0,0 +1,78 @@
+# backend/core/metrics.py
+"""
+Per-worker runtime counters, served by GET /admin/metrics.
+
+Each worker process keeps its own numbers; with several workers every
+request sees only the worker that handled it.
+"""
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from core.circuit_breaker import BREAKERS
+from core.single_flight import GROUPS
+
+
+class PoolUsage:
+    """Connections checked out of an engine's pool, now and at peak."""
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.in_use = 0
+        self.peak = 0
+        self.checkouts = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.peak = max(self.peak, self.in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+    def stats(self) -> dict:
+        pool = self.engine.pool
+        return {
+            "size": pool.size(),
+            "in_use": self.in_use,
+            "peak_in_use": self.peak,
+            "checkouts": self.checkouts,
+            "overflow": max(pool.overflow(), 0),
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.peak = self.in_use
+            self.checkouts = 0
+
+
+_pool_usage: PoolUsage | None = None
+
+
+def track_pool(engine: Engine) -> None:
+    global _pool_usage
+    _pool_usage = PoolUsage(engine)
+
+
+def snapshot() -> dict:
+    return {
+        "db_pool": _pool_usage.stats() if _pool_usage else None,
+        "single_flight": {name: group.stats() for name, group in GROUPS.items()},
+        "circuit_breakers": {name: breaker.stats() for name, breaker in BREAKERS.items()},
+    }
+
+
+def reset() -> None:
+    """Start a new measurement window (peaks and counters), e.g. between load-test scenarios."""
+    if _pool_usage:
+        _pool_usage.reset_stats()
+    for group in GROUPS.values():
+        group.reset_stats()
+    for breaker in BREAKERS.values():
+        breaker.reset_stats()
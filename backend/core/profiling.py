@@ -0,0 +1,427 @@
+# backend/core/profiling.py
+"""
+On-demand statistical profiling of live requests.
+
+Off unless PROFILING_ENABLED is set. Then ProfilingMiddleware picks the
+requests to profile:
+
+- a fraction of all requests (PROFILING_SAMPLE_RATE). Their samples add
+  up in one "sampled" profile per worker.
+- a single request sent with `X-Profile: <PROFILING_TOKEN>`. It gets a
+  profile of its own, and its id comes back in the X-Profile-Id
+  response header.
+
+While at least one profiled request is in flight, a sampler thread reads
+every thread's Python stack from sys._current_frames(). It does this
+every PROFILING_INTERVAL_MS. This is wall-clock sampling of the event loop
+and the threadpool. Threads that are only waiting (an idle event loop, an
+idle worker thread) are skipped. Busy threads are recorded whichever
+request they are serving, so under load a profile also shows the
+overlapping requests' work. That is what a hot worker looks like.
+
+Overhead is bounded in three ways. Requests that aren't profiled pay one
+random() call. The sampler times itself and backs off so that it never
+holds the GIL for more than PROFILING_MAX_OVERHEAD of wall time. And one
+request is sampled for at most PROFILING_MAX_SECONDS, so long-lived
+streams don't keep the sampler running.
+
+Finished profiles are written to PROFILING_DIR by the sampler thread,
+never the event loop. That makes them downloadable from any worker on the
+host (GET /admin/profiles). Downloads come as speedscope JSON or as
+folded stacks for flamegraph.pl / inferno.
+"""
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import CodeType
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+SAMPLED = "sampled"
+PROFILE_ID = re.compile(r"[0-9a-f]{16}")
+FLUSH_SECONDS = 10.0
+MAX_STACK_DEPTH = 128
+MAX_STACKS = 20_000  # distinct stacks kept per profile; rarer ones beyond this are lumped together
+TRUNCATED = "[other stacks]"
+
+# Leaf frames of threads that are waiting, not working. uvloop waits for
+# events in C, so an idle uvloop thread's leaf is the loop runner itself
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("runners.py", "run"),
+    ("base_events.py", "run_until_complete"),
+    ("base_events.py", "run_forever"),
+}
+
+
+def _short_path(filename: str) -> str:
+    """File path relative to the import root it was loaded from (app dir or site-packages)."""
+    for root in sorted((p for p in sys.path if p), key=len, reverse=True):
+        if filename.startswith(root + os.sep):
+            return filename[len(root) + 1:]
+    return filename
+
+
+@dataclass(eq=False)
+class Profile:
+    kind: str  # SAMPLED or "request"
+    id: str = field(default_factory=lambda: os.urandom(8).hex())
+    name: str = ""
+    started: float = field(default_factory=time.time)
+    requests: int = 0
+    samples: int = 0
+    # stack (root first: thread name, then frames) -> samples
+    counts: Counter = field(default_factory=Counter)
+
+    def add(self, stack: tuple) -> None:
+        if stack not in self.counts and len(self.counts) >= MAX_STACKS:
+            stack = (TRUNCATED,)
+        self.counts[stack] += 1
+
+
+@dataclass(eq=False)
+class Window:
+    """One profiled request in flight."""
+    profiles: tuple[Profile, ...]
+    opened: float = field(default_factory=time.monotonic)
+
+
+class SamplingProfiler:
+    def __init__(self, directory: str, interval: float, max_overhead: float, max_seconds: float, keep: int):
+        self.directory = Path(directory)
+        self.interval = interval
+        self.max_overhead = max_overhead
+        self.max_seconds = max_seconds
+        self.keep = keep
+        self.sampled = Profile(SAMPLED)
+        self._windows: set[Window] = set()
+        self._finished: list[Profile] = []
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # Stacks hold id(code): hashing a code object hashes its bytecode. _codes keeps them
+        # alive (so ids aren't reused) and caches whether each one means "idle"
+        self._codes: dict[int, CodeType] = {}
+        self._idle: dict[int, bool] = {}
+        self._thread_names: dict[int, str] = {}
+        self._frames: dict[int, tuple[str, str, int]] = {}
+
+    # --- request side (event loop) ---
+
+    def open(self, sampled: bool, request: Optional[Profile]) -> Window:
+        window = Window(tuple(p for p in (self.sampled if sampled else None, request) if p is not None))
+        with self._lock:
+            self._windows.add(window)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+        return window
+
+    def close(self, window: Window) -> None:
+        with self._lock:
+            self._windows.discard(window)
+            for profile in window.profiles:
+                profile.requests += 1
+                if profile.kind != SAMPLED:
+                    self._finished.append(profile)
+
+    # --- sampler thread ---
+
+    def _is_idle(self, code: CodeType) -> bool:
+        idle = self._idle.get(id(code))
+        if idle is None:
+            idle = (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES
+            self._codes[id(code)], self._idle[id(code)] = code, idle
+        return idle
+
+    def _sample(self) -> list[tuple]:
+        """Stacks of the busy threads, root first: thread name, then id(code) per frame."""
+        me = threading.get_ident()
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == me or self._is_idle(frame.f_code):
+                continue
+            stack = []
+            while frame is not None and len(stack) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                if id(code) not in self._codes:
+                    self._is_idle(code)
+                stack.append(id(code))
+                frame = frame.f_back
+            if ident not in self._thread_names:
+                self._thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            stack.append(self._thread_names.get(ident, f"thread {ident}"))
+            stacks.append(tuple(reversed(stack)))
+        return stacks
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while True:
+            cost = 0.0
+            with self._lock:
+                now = time.monotonic()
+                profiles = {p for w in self._windows if now - w.opened < self.max_seconds for p in w.profiles}
+                if not self._windows:
+                    self._thread = None
+                    break
+            if profiles:
+                # CPU time of this thread: waiting for the GIL behind busy requests isn't overhead
+                started = time.thread_time()
+                stacks = self._sample()
+                with self._lock:
+                    for profile in profiles:
+                        profile.samples += 1
+                        for stack in stacks:
+                            profile.add(stack)
+                cost = time.thread_time() - started
+            if self._finished or time.monotonic() - last_flush > FLUSH_SECONDS:
+                self._write()
+                last_flush = time.monotonic()
+            # Never busy more than max_overhead of the time, however deep the stacks get
+            time.sleep(max(self.interval - cost, cost / self.max_overhead - cost))
+        self._write()
+
+    # --- storage ---
+
+    def _frame(self, item) -> tuple[str, str, int]:
+        if isinstance(item, str):  # thread name or TRUNCATED
+            return item, "", 0
+        frame = self._frames.get(item)
+        if frame is None:
+            code = self._codes[item]
+            frame = self._frames[item] = (code.co_qualname, _short_path(code.co_filename), code.co_firstlineno)
+        return frame
+
+    def _document(self, profile: Profile) -> dict:
+        frames: dict[tuple, int] = {}
+        stacks = []
+        for stack, count in profile.counts.items():
+            stacks.append([[frames.setdefault(self._frame(item), len(frames)) for item in stack], count])
+        return {
+            "id": profile.id,
+            "kind": profile.kind,
+            "name": profile.name,
+            "started": profile.started,
+            "interval_ms": self.interval * 1000,
+            "requests": profile.requests,
+            "samples": profile.samples,
+            "frames": [list(frame) for frame in frames],
+            "stacks": stacks,
+        }
+
+    def _write(self) -> None:
+        with self._lock:
+            finished, self._finished = self._finished, []
+            live, sampled = self.sampled, None
+            if live.samples or live.requests:
+                # Move what came in since the last flush out; it's added to what's on disk
+                sampled = Profile(SAMPLED, id=live.id, started=live.started, requests=live.requests,
+                                  samples=live.samples, counts=live.counts)
+                live.requests, live.samples, live.counts = 0, 0, Counter()
+        with self._write_lock:
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                for profile in finished:
+                    _save(self.directory / f"request-{profile.id}.json", self._document(profile))
+                if finished:
+                    _prune(self.directory, self.keep)
+                if sampled is not None:
+                    path = self.directory / f"{SAMPLED}-{os.getpid()}.json"
+                    document = self._document(sampled)
+                    if path.exists():
+                        document = merge([load(path), document], name=SAMPLED)
+                    _save(path, document)
+            except Exception as e:
+                logger.warning(f"Could not write profiles to {self.directory}: {str(e)}")
+
+
+def _save(path: Path, document: dict) -> None:
+    partial = path.with_suffix(".tmp")
+    partial.write_text(json.dumps(document, separators=(",", ":")))
+    os.replace(partial, path)
+
+
+def _prune(directory: Path, keep: int) -> None:
+    requests = sorted(directory.glob("request-*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in requests[keep:]:
+        path.unlink(missing_ok=True)
+
+# --------------------------------
+# Stored profiles
+# --------------------------------
+
+def load(path: Path) -> dict:
+    return json.loads(path.read_text())
+
+
+def merge(documents: list[dict], name: str) -> dict:
+    """One profile adding up several (e.g. every worker's sampled profile)."""
+    frames: dict[tuple, int] = {}
+    counts: Counter = Counter()
+    for document in documents:
+        local = [frames.setdefault(tuple(frame), len(frames)) for frame in document["frames"]]
+        for stack, count in document["stacks"]:
+            counts[tuple(local[i] for i in stack)] += count
+    return {
+        "id": name,
+        "kind": documents[0]["kind"] if documents else SAMPLED,
+        "name": name,
+        "started": min((d["started"] for d in documents), default=time.time()),
+        "interval_ms": documents[0]["interval_ms"] if documents else 0,
+        "requests": sum(d["requests"] for d in documents),
+        "samples": sum(d["samples"] for d in documents),
+        "frames": [list(frame) for frame in frames],
+        "stacks": [[list(stack), count] for stack, count in counts.items()],
+    }
+
+
+def find_profile(directory: str, profile_id: str) -> Optional[dict]:
+    """A request profile by id, or every worker's sampled profile merged for SAMPLED."""
+    directory = Path(directory)
+    if profile_id == SAMPLED:
+        paths = sorted(directory.glob(f"{SAMPLED}-*.json"))
+        return merge([load(path) for path in paths], SAMPLED) if paths else None
+    if not PROFILE_ID.fullmatch(profile_id):  # never let the id reach outside the directory
+        return None
+    path = directory / f"request-{profile_id}.json"
+    return load(path) if path.exists() else None
+
+
+def list_profiles(directory: str) -> list[dict]:
+    """Summaries of the stored profiles: the merged sampled one first, then requests newest first."""
+    directory = Path(directory)
+    if not directory.exists():
+        return []
+    documents = []
+    sampled = find_profile(str(directory), SAMPLED)
+    if sampled is not None:
+        documents.append(sampled)
+    requests = sorted(directory.glob("request-*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+    documents += [load(path) for path in requests]
+    return [
+        {key: document[key] for key in ("id", "kind", "name", "started", "requests", "samples")}
+        for document in documents
+    ]
+
+
+def clear_profiles(directory: str) -> int:
+    """Delete every stored profile; returns how many files went."""
+    paths = list(Path(directory).glob("*.json")) if Path(directory).exists() else []
+    for path in paths:
+        path.unlink(missing_ok=True)
+    return len(paths)
+
+# --------------------------------
+# Export formats
+# --------------------------------
+
+def _label(frame: list) -> str:
+    name, path, line = frame
+    label = f"{name} ({path}:{line})" if path else name
+    return label.replace(";", ",")  # ';' separates frames in folded stacks
+
+
+def to_folded(document: dict) -> str:
+    """Brendan Gregg's folded stacks: `root;...;leaf count` per line, for flamegraph.pl or inferno."""
+    labels = [_label(frame) for frame in document["frames"]]
+    return "".join(
+        f"{';'.join(labels[i] for i in stack)} {count}\n"
+        for stack, count in sorted(document["stacks"], key=lambda item: item[1], reverse=True)
+    )
+
+
+def to_speedscope(document: dict) -> dict:
+    """A speedscope (https://www.speedscope.app) sampled profile, weighted in milliseconds."""
+    interval = document["interval_ms"]
+    weights = [count * interval for _, count in document["stacks"]]
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": [
+            {"name": name, "file": path, "line": line} if path else {"name": name}
+            for name, path, line in document["frames"]
+        ]},
+        "profiles": [{
+            "type": "sampled",
+            "name": document["name"] or document["id"],
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": [stack for stack, _ in document["stacks"]],
+            "weights": weights,
+        }],
+        "name": f"lotuslynx {document['name'] or document['id']}",
+        "exporter": "lotuslynx",
+    }
+
+# --------------------------------
+# Middleware
+# --------------------------------
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, profiler: SamplingProfiler, sample_rate: float = 0.0, token: str = ""):
+        self.app = app
+        self.profiler = profiler
+        self.sample_rate = sample_rate
+        self.token = token.encode()
+
+    def _flagged(self, scope: Scope) -> bool:
+        if not self.token:
+            return False
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return hmac.compare_digest(value, self.token)
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sampled = self.sample_rate > 0 and random.random() < self.sample_rate
+        request = Profile("request") if self._flagged(scope) else None
+        if not sampled and request is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append(PROFILE_ID_HEADER, request.id)
+            await send(message)
+
+        window = self.profiler.open(sampled, request)
+        try:
+            await self.app(scope, receive, send_with_id if request is not None else send)
+        finally:
+            if request is not None:
+                route = scope.get("route")
+                request.name = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+            self.profiler.close(window)
+
+
+profiler = SamplingProfiler(
+    settings.PROFILING_DIR,
+    interval=settings.PROFILING_INTERVAL_MS / 1000,
+    max_overhead=settings.PROFILING_MAX_OVERHEAD,
+    max_seconds=settings.PROFILING_MAX_SECONDS,
+    keep=settings.PROFILING_KEEP
+)
@@ -0,0 +1,243 @@
+# backend/core/rate_limit.py
+"""
+Token-bucket rate limiting for endpoints that do expensive work (bcrypt).
+
+Buckets are keyed by client IP and by username. The default store keeps
+buckets in memory, split across lock-protected shards so concurrent
+threads rarely contend. For multi-worker deployments the store can be
+switched to any Redis-compatible server, where the bucket update runs
+atomically as a Lua script.
+"""
+import heapq
+import logging
+import math
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Protocol
+
+from anyio import to_thread
+from fastapi import HTTPException, Request, status
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PERIODS = {
+    "second": 1,
+    "minute": 60,
+    "hour": 3600,
+    "day": 86400,
+}
+
+# -----------------------------
+# Limits
+# -----------------------------
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A bucket of `capacity` tokens that refills completely every `period` seconds."""
+    capacity: int
+    period: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse limits such as '5/minute', '100/hour' or '10/30' (seconds)."""
+        try:
+            count, _, per = value.strip().partition("/")
+            period = _PERIODS.get(per.strip().rstrip("s"), None) or float(per)
+            limit = cls(capacity=int(count), period=float(period))
+        except ValueError as e:
+            raise ValueError(f"Invalid rate limit '{value}'") from e
+        if limit.capacity <= 0 or limit.period <= 0:
+            raise ValueError(f"Invalid rate limit '{value}'")
+        return limit
+
+# -----------------------------
+# Bucket Stores
+# -----------------------------
+
+class BucketStore(Protocol):
+    def consume(self, key: str, limit: RateLimit) -> float:
+        """Take one token. Returns 0 if allowed, else seconds until a token is available."""
+        ...
+
+
+class InMemoryBucketStore:
+    """Process-local buckets, sharded by key hash to keep lock hold times short."""
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10_000):
+        self._shards: list[tuple[threading.Lock, dict]] = [
+            (threading.Lock(), {}) for _ in range(shards)
+        ]
+        self._max_keys = max_keys_per_shard
+        # Evicting scans the whole shard, so let it overshoot a little and trim back in one go
+        self._evict_at = max_keys_per_shard + max(1, max_keys_per_shard // 10)
+
+    def consume(self, key: str, limit: RateLimit) -> float:
+        lock, buckets = self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+        now = time.monotonic()
+        rate = limit.refill_rate
+
+        with lock:
+            tokens, updated, _ = buckets.get(key, (limit.capacity, now, limit))
+            tokens = min(limit.capacity, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                buckets[key] = (tokens - 1, now, limit)
+                wait = 0.0
+            else:
+                buckets[key] = (tokens, now, limit)
+                wait = (1 - tokens) / rate
+
+            if len(buckets) >= self._evict_at:
+                self._evict(buckets, self._max_keys, now)
+        return wait
+
+    @staticmethod
+    def _evict(buckets: dict, max_keys: int, now: float) -> None:
+        """Drop buckets that have refilled (they behave like absent ones), then the fullest while still over."""
+        # Each bucket keeps its own limit: a login bucket's refill time says nothing about a register one
+        def fill(state: tuple) -> float:
+            tokens, updated, limit = state
+            return (tokens + (now - updated) * limit.refill_rate) / limit.capacity
+
+        for key in [k for k, state in buckets.items() if fill(state) >= 1]:
+            del buckets[key]
+        excess = len(buckets) - max_keys
+        if excess > 0:
+            # Drained buckets are the ones being limited; spraying fresh keys mustn't reset them
+            for key, _ in heapq.nlargest(excess, buckets.items(), key=lambda item: fill(item[1])):
+                del buckets[key]
+
+
+# Runs atomically on the server; uses the server clock so workers never disagree.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """
+    Buckets shared by every worker through a Redis-compatible server
+    (Redis, Valkey, KeyDB...). Falls back to local buckets if the server
+    is unreachable so authentication never hard-fails on the limiter.
+    """
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RATE_LIMIT_BACKEND=redis requires the 'redis' package"
+            ) from e
+
+        self._errors = (redis.RedisError,)
+        self._client = redis.Redis.from_url(
+            url,
+            socket_timeout=0.25,
+            socket_connect_timeout=0.25
+        )
+        self._script = self._client.register_script(_TOKEN_BUCKET_LUA)
+        self._prefix = prefix
+        self._fallback = InMemoryBucketStore()
+
+    def consume(self, key: str, limit: RateLimit) -> float:
+        try:
+            return float(self._script(
+                keys=[self._prefix + key],
+                args=[limit.capacity, limit.refill_rate]
+            ))
+        except self._errors as e:
+            logger.warning(f"Rate limit store unavailable, using local buckets: {str(e)}")
+            return self._fallback.consume(key, limit)
+
+# -----------------------------
+# Limiter
+# -----------------------------
+
+class RateLimiter:
+    """Applies the per-route IP and username limits configured in settings."""
+
+    def __init__(self, store: BucketStore, shared: bool = False):
+        self.store = store
+        # Shared stores do network I/O, so keep them off the event loop
+        self._shared = shared
+        self._limits: dict[str, tuple[RateLimit, RateLimit]] = {}
+
+    def limits_for(self, route: str) -> tuple[RateLimit, RateLimit]:
+        if route not in self._limits:
+            prefix = f"RATE_LIMIT_{route.upper()}"
+            self._limits[route] = (
+                RateLimit.parse(getattr(settings, f"{prefix}_PER_IP")),
+                RateLimit.parse(getattr(settings, f"{prefix}_PER_USERNAME")),
+            )
+        return self._limits[route]
+
+    def check(self, route: str, ip: str, username: str | None = None) -> float:
+        """Consume a token from each applicable bucket; return the longest wait."""
+        ip_limit, username_limit = self.limits_for(route)
+        wait = self.store.consume(f"{route}:ip:{ip}", ip_limit)
+        if username:
+            wait = max(wait, self.store.consume(
+                f"{route}:user:{username.strip().lower()}", username_limit
+            ))
+        return wait
+
+    async def enforce(self, request: Request, route: str, username: str | None = None) -> None:
+        """Raise 429 if the caller is over the limit. Call before any hashing work."""
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        ip = client_ip(request)
+        if self._shared:
+            wait = await to_thread.run_sync(self.check, route, ip, username)
+        else:
+            wait = self.check(route, ip, username)
+
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, please try again later",
+                headers={"Retry-After": str(math.ceil(wait))}
+            )
+
+
+def client_ip(request: Request) -> str:
+    """Best-effort client address, honouring X-Forwarded-For only when trusted."""
+    if settings.RATE_LIMIT_TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _build_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        return RateLimiter(RedisBucketStore(settings.RATE_LIMIT_REDIS_URL), shared=True)
+    if settings.RATE_LIMIT_BACKEND != "memory":
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND '{settings.RATE_LIMIT_BACKEND}'")
+    return RateLimiter(InMemoryBucketStore())
+
+
+rate_limiter = _build_limiter()
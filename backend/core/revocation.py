@@ -0,0 +1,162 @@
+# backend/core/revocation.py
+"""
+Token revocation (denylist) keyed by the JWT "jti" claim.
+
+The `revoked_tokens` table is the source of truth. Each worker keeps the
+unexpired revoked *access* token ids in a dict, so the per-request check
+is a single hash lookup. New revocations are pulled in the background of
+normal requests at most every REVOCATION_SYNC_SECONDS, either from the
+table (one indexed range query) or from an optional shared Redis cache.
+
+Refresh tokens are never checked on the hot path: /auth/refresh claims a
+refresh token by inserting its jti, so a second use hits the primary key.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Re-read revocations this far behind the watermark to tolerate clock skew
+# between the app servers that stamp `revoked_at`.
+_SYNC_OVERLAP_SECONDS = 30
+
+
+def _utc_naive(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None)
+
+
+class RedisRevocationCache:
+    """Shared feed of recent access-token revocations (sorted set scored by revoke time)."""
+
+    def __init__(self, url: str, key: str = "revoked:access"):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("REVOCATION_REDIS_URL requires the 'redis' package") from e
+        self._client = redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
+        self._errors = (redis.RedisError,)
+        self._key = key
+
+    def publish(self, jti: str, expires_at: float) -> None:
+        now = time.time()
+        try:
+            pipe = self._client.pipeline()
+            pipe.zadd(self._key, {f"{jti}:{expires_at}": now})
+            # Access tokens can't outlive their lifetime, so older entries are dead weight
+            pipe.zremrangebyscore(self._key, 0, now - settings.ACCESS_TOKEN_EXPIRES_MINUTES * 60)
+            pipe.execute()
+        except self._errors as e:
+            logger.warning(f"Revocation cache unavailable: {str(e)}")
+
+    def since(self, ts: float) -> list[tuple[str, float]] | None:
+        """Revocations recorded after `ts`, or None if the cache can't be reached."""
+        try:
+            members = self._client.zrangebyscore(self._key, ts, "+inf")
+        except self._errors as e:
+            logger.warning(f"Revocation cache unavailable: {str(e)}")
+            return None
+        entries = []
+        for member in members:
+            jti, _, exp = member.decode().partition(":")
+            entries.append((jti, float(exp)))
+        return entries
+
+
+class RevocationStore:
+    """In-memory view of revoked access tokens, backed by the revoked_tokens table."""
+
+    def __init__(self, sync_interval: float, cache: RedisRevocationCache | None = None):
+        self._revoked: dict[str, float] = {}
+        self._sync_interval = sync_interval
+        self._sync_lock = threading.Lock()
+        self._next_sync = 0.0
+        self._watermark = 0.0
+        self._cache = cache
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, jti: str | None) -> bool:
+        """O(1) membership check used on every authenticated request."""
+        return jti is not None and jti in self._revoked
+
+    def revoke(
+        self,
+        db: Session,
+        jti: str,
+        token_type: str,
+        expires_at: float,
+        username: str | None = None
+    ) -> bool:
+        """
+        Add a revocation to the caller's transaction (the caller commits).
+        Returns False, after rolling the transaction back, if the token was
+        already revoked.
+        """
+        db.add(RevokedToken(
+            jti=jti,
+            token_type=token_type,
+            username=username,
+            expires_at=_utc_naive(expires_at)
+        ))
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            return False
+
+        if token_type == "access":
+            self._revoked[jti] = expires_at
+            if self._cache:
+                self._cache.publish(jti, expires_at)
+        return True
+
+    def maybe_sync(self, db: Session) -> None:
+        """Pull new revocations if the sync interval elapsed; never blocks on another sync."""
+        if time.monotonic() < self._next_sync:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            self.sync(db)
+        except Exception as e:
+            logger.error(f"Failed to sync token revocations: {str(e)}")
+        finally:
+            self._next_sync = time.monotonic() + self._sync_interval
+            self._sync_lock.release()
+
+    def sync(self, db: Session) -> None:
+        now = time.time()
+        since = max(self._watermark - _SYNC_OVERLAP_SECONDS, 0)
+
+        entries = self._cache.since(since) if self._cache else None
+        if entries is None:
+            rows = db.query(RevokedToken.jti, RevokedToken.expires_at).filter(
+                RevokedToken.token_type == "access",
+                RevokedToken.revoked_at >= _utc_naive(since),
+                RevokedToken.expires_at > _utc_naive(now)
+            ).all()
+            entries = [
+                (jti, expires_at.replace(tzinfo=timezone.utc).timestamp())
+                for jti, expires_at in rows
+            ]
+
+        revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+        revoked.update((jti, exp) for jti, exp in entries if exp > now)
+        # Swap rather than mutate so readers on other threads never see a resize
+        self._revoked = revoked
+        self._watermark = now
+
+
+revocation_store = RevocationStore(
+    sync_interval=settings.REVOCATION_SYNC_SECONDS,
+    cache=RedisRevocationCache(settings.REVOCATION_REDIS_URL) if settings.REVOCATION_REDIS_URL else None
+)
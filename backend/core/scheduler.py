@@ -0,0 +1,85 @@
+# backend/core/scheduler.py
+"""
+In-app periodic job scheduler, started from main.lifespan.
+
+Every worker runs the same schedule, but each run first takes a Postgres
+session-level advisory lock derived from the job name, so only one
+worker (the current "leader" for that job) executes it at a time; the
+others skip that tick. Jobs run in a worker thread with their own
+connection and receive a Session bound to it.
+"""
+import asyncio
+import logging
+import random
+import zlib
+from dataclasses import dataclass, field
+from typing import Callable
+
+from anyio import to_thread
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Job:
+    name: str
+    interval: float  # seconds between runs
+    func: Callable[[Session], int]  # returns the number of rows it touched
+    lock_key: int = field(init=False)
+
+    def __post_init__(self):
+        self.lock_key = zlib.crc32(f"lotuslynx:job:{self.name}".encode())
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs: list[Job] = []
+        self._tasks: list[asyncio.Task] = []
+
+    def add(self, name: str, interval: float, func: Callable[[Session], int]) -> None:
+        self.jobs.append(Job(name=name, interval=interval, func=func))
+
+    def run_once(self, job: Job) -> int | None:
+        """Run `job` if this worker wins its advisory lock; returns rows touched or None if skipped."""
+        with engine.connect() as conn:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:key)"), {"key": job.lock_key}
+            ).scalar()
+            conn.commit()
+            if not acquired:
+                return None
+            try:
+                with Session(bind=conn) as db:
+                    return job.func(db)
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": job.lock_key})
+                conn.commit()
+
+    async def _loop(self, job: Job) -> None:
+        # Spread first runs so workers that boot together don't all contend at once
+        await asyncio.sleep(random.uniform(0, min(job.interval, 30)))
+        while True:
+            try:
+                touched = await to_thread.run_sync(self.run_once, job)
+                if touched:
+                    logger.info(f"Job {job.name} touched {touched} rows")
+            except Exception as e:
+                logger.error(f"Job {job.name} failed: {str(e)}")
+            await asyncio.sleep(job.interval)
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._loop(job), name=f"job:{job.name}") for job in self.jobs]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        # A job already running in a thread is allowed to finish its current batch
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+scheduler = Scheduler()
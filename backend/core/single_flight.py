@@ -0,0 +1,80 @@
+# backend/core/single_flight.py
+"""
+Request coalescing ("single-flight") for hot reads.
+
+Concurrent calls with the same key on one worker share a single execution:
+the first caller (the leader) runs the blocking fetch in a worker thread,
+the others await its result without taking a thread or a DB connection.
+Nothing is cached - the key is forgotten as soon as the fetch finishes,
+so a request never sees data older than one that started before it.
+
+Results are shared between requests, so fetches should return immutable
+values (serialized bytes, tuples).
+"""
+import asyncio
+from typing import Callable, Hashable, TypeVar
+
+from anyio import to_thread
+
+from core.config import settings
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.executions = 0
+        GROUPS[name] = self
+
+    def stats(self) -> dict:
+        coalesced = self.calls - self.executions
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": coalesced,
+            "coalescing_ratio": round(coalesced / self.calls, 4) if self.calls else 0.0,
+            "in_flight": len(self._inflight),
+        }
+
+    def reset_stats(self) -> None:
+        self.calls = self.executions = 0
+
+    async def run(self, key: Hashable, func: Callable[[], T]) -> T:
+        """func() in a thread, or the result of an identical call already running."""
+        self.calls += 1
+        if not settings.SINGLE_FLIGHT_ENABLED:
+            self.executions += 1
+            return await to_thread.run_sync(func)
+
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # this request was cancelled, not the leader
+                # The leader was cancelled before finishing; take over
+
+        future = asyncio.get_running_loop().create_future()
+        # Marks the exception as retrieved when nobody was waiting for it
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        self.executions += 1
+        try:
+            result = await to_thread.run_sync(func)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+
+GROUPS: dict[str, SingleFlight] = {}
@@ -0,0 +1,295 @@
+# backend/core/tracing.py
+"""
+Lightweight request tracing and Server-Timing headers.
+
+TracingMiddleware starts a Trace for every HTTP request and keeps it in a
+contextvar, which FastAPI/anyio carry into the threadpool that runs sync
+endpoints. Instrumented code records spans with `span(category, name)`.
+SQL statements are timed through engine events (instrument_engine). The
+categories are db, stripe, cloudinary and hash.
+
+Requests that carry `X-Server-Timing: <TRACING_TIMING_TOKEN>` get a
+Server-Timing header. It adds up time and call count per category, so a
+slow checkout shows at a glance whether the time went to Postgres, Stripe
+or bcrypt. It is never sent to everyone: per-request query counts describe
+the data, and a bcrypt entry on POST /login only for existing accounts
+would let anyone enumerate usernames. Only a sampled fraction of requests
+(TRACING_SAMPLE_RATE, or any request whose W3C `traceparent` says it is
+sampled) keeps individual spans. Those requests are exported in the
+background as OTLP/JSON, to a collector or a JSON-lines file. Unsampled
+requests cost two perf_counter() calls and a dict update per span.
+"""
+import hmac
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TIMING_HEADER = b"x-server-timing"
+TRACEPARENT = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+EXPORT_QUEUE_SIZE = 1000
+EXPORT_BATCH_SIZE = 100
+EXPORT_INTERVAL = 2.0
+
+
+def _hex_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+@dataclass
+class Span:
+    category: str
+    name: str
+    start: float  # perf_counter()
+    duration: float
+    span_id: str = field(default_factory=lambda: _hex_id(8))
+
+
+@dataclass
+class Trace:
+    sampled: bool
+    trace_id: str = field(default_factory=lambda: _hex_id(16))
+    parent_span_id: Optional[str] = None
+    span_id: str = field(default_factory=lambda: _hex_id(8))
+    name: str = ""
+    status_code: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    started_ns: int = field(default_factory=time.time_ns)
+    duration: float = 0.0
+    totals: dict[str, list] = field(default_factory=dict)  # category -> [seconds, calls]
+    spans: list[Span] = field(default_factory=list)
+
+    def record(self, category: str, name: str, start: float, duration: float) -> None:
+        total = self.totals.get(category)
+        if total is None:
+            self.totals[category] = [duration, 1]
+        else:
+            total[0] += duration
+            total[1] += 1
+        if self.sampled:
+            self.spans.append(Span(category, name, start, duration))
+
+    def server_timing(self) -> str:
+        parts = [
+            f'{category};dur={seconds * 1000:.1f};desc="{calls} call{"s" if calls != 1 else ""}"'
+            for category, (seconds, calls) in self.totals.items()
+        ]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_current: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current.get()
+
+
+@contextmanager
+def span(category: str, name: str) -> Iterator[None]:
+    """Time the block as a `category` span of the current request (no-op outside one)."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.record(category, name, start, time.perf_counter() - start)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record every SQL statement on `engine` as a db span."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        if _current.get() is not None:
+            conn.info.setdefault("trace_starts", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _end(conn, cursor, statement, parameters, context, executemany):
+        trace = _current.get()
+        starts = conn.info.get("trace_starts")
+        if trace is not None and starts:
+            start = starts.pop()
+            # The first word is enough to tell SELECTs from writes without leaking values
+            trace.record("db", statement.lstrip().split(None, 1)[0].upper(), start, time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        starts = exception_context.connection.info.get("trace_starts") if exception_context.connection else None
+        if starts:
+            starts.pop()
+
+
+# --------------------------------
+# Export
+# --------------------------------
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+def to_otlp(traces: list[Trace]) -> dict:
+    """OTLP/JSON ExportTraceServiceRequest for finished traces."""
+    spans = []
+    for trace in traces:
+        def unix_ns(perf: float) -> str:
+            return str(trace.started_ns + int((perf - trace.started) * 1e9))
+
+        root = {
+            "traceId": trace.trace_id,
+            "spanId": trace.span_id,
+            "name": trace.name,
+            "kind": 2,  # SERVER
+            "startTimeUnixNano": str(trace.started_ns),
+            "endTimeUnixNano": unix_ns(trace.started + trace.duration),
+            "attributes": [_attribute("http.response.status_code", trace.status_code)],
+            "status": {"code": 2 if trace.status_code >= 500 else 0},
+        }
+        if trace.parent_span_id:
+            root["parentSpanId"] = trace.parent_span_id
+        spans.append(root)
+        for child in trace.spans:
+            spans.append({
+                "traceId": trace.trace_id,
+                "spanId": child.span_id,
+                "parentSpanId": trace.span_id,
+                "name": f"{child.category} {child.name}",
+                "kind": 3,  # CLIENT
+                "startTimeUnixNano": unix_ns(child.start),
+                "endTimeUnixNano": unix_ns(child.start + child.duration),
+                "attributes": [_attribute("lotuslynx.category", child.category)],
+            })
+    return {"resourceSpans": [{
+        "resource": {"attributes": [_attribute("service.name", settings.TRACING_SERVICE_NAME)]},
+        "scopeSpans": [{"scope": {"name": "lotuslynx.tracing"}, "spans": spans}],
+    }]}
+
+
+class TraceExporter:
+    """Background thread that ships sampled traces in batches; drops them if it falls behind."""
+
+    def __init__(self, target: str, destination: str):
+        self.target = target
+        self.destination = destination
+        self._queue: queue.Queue[Trace] = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+        self.dropped = 0
+
+    def submit(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        import httpx
+        client = httpx.Client(timeout=5) if self.target == "otlp" else None
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + EXPORT_INTERVAL
+            while len(batch) < EXPORT_BATCH_SIZE and (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                payload = to_otlp(batch)
+                if client is not None:
+                    client.post(self.destination, json=payload).raise_for_status()
+                else:
+                    with open(self.destination, "a") as out:
+                        out.write(json.dumps(payload, separators=(",", ":")) + "\n")
+            except Exception as e:
+                logger.warning(f"Could not export {len(batch)} trace(s): {str(e)}")
+
+
+# --------------------------------
+# Middleware
+# --------------------------------
+
+class TracingMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 0.0,
+        exporter: Optional[TraceExporter] = None,
+        timing_token: str = ""
+    ):
+        self.app = app
+        self.sample_rate = sample_rate if exporter else 0.0
+        self.exporter = exporter
+        self.timing_token = timing_token.encode()
+
+    def _wants_timing(self, scope: Scope) -> bool:
+        if not self.timing_token:
+            return False
+        for name, value in scope["headers"]:
+            if name == TIMING_HEADER:
+                return hmac.compare_digest(value, self.timing_token)
+        return False
+
+    def _start(self, scope: Scope) -> Trace:
+        match = TRACEPARENT.match(Headers(scope=scope).get("traceparent", ""))
+        if match:
+            trace_id, parent_id, flags = match.groups()
+            sampled = self.exporter is not None and (int(flags, 16) & 1 or random.random() < self.sample_rate)
+            return Trace(sampled=bool(sampled), trace_id=trace_id, parent_span_id=parent_id)
+        return Trace(sampled=self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = self._start(scope)
+        token = _current.set(trace)
+        timing = self._wants_timing(scope)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                trace.status_code = message["status"]
+                if timing:
+                    MutableHeaders(scope=message).append("Server-Timing", trace.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if trace.sampled:
+                trace.duration = time.perf_counter() - trace.started
+                # The matched route template keeps span names low-cardinality
+                route = scope.get("route")
+                trace.name = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+                self.exporter.submit(trace)
+
+
+def create_exporter() -> Optional[TraceExporter]:
+    if settings.TRACING_EXPORTER == "otlp":
+        return TraceExporter("otlp", settings.TRACING_OTLP_ENDPOINT)
+    if settings.TRACING_EXPORTER == "file":
+        return TraceExporter("file", settings.TRACING_FILE)
+    return None
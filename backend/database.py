@@ -17,11 +17,16 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+# connection pool per worker process; serve.py sizes the worker count so
+# workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW) fits the server's max_connections
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+
 # create engine 
 engine = create_engine(
     DATABASE_URL,
-    pool_size=10,
-    max_overflow=5,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
     pool_pre_ping=True
 )
 
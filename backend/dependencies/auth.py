@@ -4,6 +4,7 @@ from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 
 from core.config import settings
+from core.revocation import revocation_store
 from models.user import User
 from database import get_db
 
@@ -20,8 +21,16 @@ async def get_current_user(
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username = payload.get("sub")
-        if not username:
+        if not username or payload.get("type") != "access":
             raise HTTPException(status_code=401, detail="Invalid token")
+
+        revocation_store.maybe_sync(db)
+        if revocation_store.is_revoked(payload.get("jti")):
+            raise HTTPException(
+                status_code=401,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
         
         user = db.query(User).filter(User.username == username).first()
         if not user:
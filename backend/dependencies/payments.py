@@ -2,6 +2,8 @@ import stripe
 from models import User
 from fastapi import Depends, HTTPException, status
 from core.config import settings
+from core.tracing import span
+from services.payments import stripe_breaker
 from .auth import get_current_user
 
 # Initialize Stripe
@@ -14,13 +16,14 @@ async def stripe_payment(
 ) -> stripe.PaymentIntent:
     """Create a Stripe payment intent for the specified amount"""
     try:
-        return stripe.PaymentIntent.create(
-            amount=amount,
-            currency=currency,
-            metadata={"user_id": str(user.id)},
-            description=f"Payment from {user.username}",
-            automatic_payment_methods={"enabled": True}
-        )
+        with stripe_breaker.protect(), span("stripe", "PaymentIntent.create"):
+            return stripe.PaymentIntent.create(
+                amount=amount,
+                currency=currency,
+                metadata={"user_id": str(user.id)},
+                description=f"Payment from {user.username}",
+                automatic_payment_methods={"enabled": True}
+            )
     except stripe.StripeError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -6,7 +6,8 @@ async def require_admin(
     user: User = Depends(get_current_user)
 ) -> User:
     """Dependency to restrict access to admins"""
-    if str(user.role) != UserRole.admin.value:  # Convert to string and compare values
+    # Compare the enum itself: str() of a str-mixin Enum is "UserRole.admin" on Python 3.11+
+    if user.role != UserRole.admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
@@ -17,7 +18,7 @@ async def require_editor(
     user: User = Depends(get_current_user)
 ) -> User:
     """Dependency for editors or admins"""
-    if str(user.role) not in [role.value for role in (UserRole.admin, UserRole.editor)]:
+    if user.role not in (UserRole.admin, UserRole.editor):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Editor privileges required"
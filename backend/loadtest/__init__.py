@@ -0,0 +1,12 @@
+"""
+End-to-end load tests for the API.
+
+Runs an asyncio/httpx driver against a local app whose Stripe and
+Cloudinary traffic goes to in-process fake servers, then reports
+throughput and p50/p95/p99 latency per endpoint. Run from the backend
+directory:
+
+    python -m loadtest --scenario browse --users 50 --duration 30
+    python -m loadtest --save-baseline loadtest/baselines/main.json
+    python -m loadtest --baseline loadtest/baselines/main.json
+"""
@@ -0,0 +1,158 @@
+# backend/loadtest/__main__.py
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from loadtest import driver, fixtures
+from loadtest.fakes import BackgroundServer, create_cloudinary_app, create_stripe_app
+from loadtest.report import compare, error_rates, print_report, summarize
+from loadtest.scenarios import SCENARIOS
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def launch_app(port: int, workers: int, env_overrides: dict) -> subprocess.Popen:
+    """Start the API with uvicorn, pointed at the fake services, and wait until healthy."""
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--log-level", "warning",
+            "--no-access-log",
+        ],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env_overrides}
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("App exited during startup")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError("App did not become healthy within 60s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Run API load tests")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="scenario to run (repeatable, default: all)")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds per scenario")
+    parser.add_argument("--ramp-up", type=float, default=2, help="seconds to start all users")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--products", type=int, default=200, help="products to seed")
+    parser.add_argument("--accounts", type=int, default=20, help="user accounts to seed")
+    parser.add_argument("--target", help="test an already running app instead of launching one")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--stripe-port", type=int, default=12111)
+    parser.add_argument("--cloudinary-port", type=int, default=12112)
+    parser.add_argument("--output", default="loadtest-report.json")
+    parser.add_argument("--baseline", help="fail if results regress against this report")
+    parser.add_argument("--save-baseline", help="also write the report here")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed regression fraction")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="fail if any endpoint has more unexpected responses than this fraction "
+                             "(raise it for runs with --fault-error-rate)")
+    parser.add_argument("--no-single-flight", action="store_true",
+                        help="launch the app with request coalescing off, to compare pool usage")
+    parser.add_argument("--fault-latency", type=float, default=0.0,
+                        help="seconds the fake Stripe/Cloudinary add to every call")
+    parser.add_argument("--fault-error-rate", type=float, default=0.0,
+                        help="fraction of fake Stripe/Cloudinary calls that fail")
+    parser.add_argument("--fault-status", type=int, default=503, help="status of injected failures")
+    args = parser.parse_args()
+
+    faults = {"latency": args.fault_latency, "error_rate": args.fault_error_rate, "status": args.fault_status}
+    stripe = BackgroundServer(create_stripe_app(**faults), args.stripe_port).start()
+    cloudinary = BackgroundServer(create_cloudinary_app(**faults), args.cloudinary_port).start()
+    app = None
+    try:
+        base_url = args.target
+        if not base_url:
+            app = launch_app(args.port, args.workers, {
+                "STRIPE_API_BASE": stripe.url,
+                "CLOUDINARY_UPLOAD_PREFIX": cloudinary.url,
+                # Fixtures and the auth scenario log in far faster than any real user
+                "RATE_LIMIT_ENABLED": "false",
+                "SINGLE_FLIGHT_ENABLED": "false" if args.no_single_flight else "true",
+            })
+            base_url = f"http://127.0.0.1:{args.port}"
+
+        context = asyncio.run(fixtures.prepare(base_url, args.products, args.accounts, args.seed))
+
+        results = {}
+        admin = {"Authorization": f"Bearer {context['admin_token']}"}
+        for name in args.scenario or sorted(SCENARIOS):
+            print(f"Running {name}: {args.users} users for {args.duration}s", file=sys.stderr)
+            # Pool peak and coalescing counters per scenario (one worker's view)
+            httpx.get(f"{base_url}/admin/metrics", params={"reset": "true"}, headers=admin).raise_for_status()
+            recorder = asyncio.run(driver.run(
+                base_url, SCENARIOS[name](), context,
+                users=args.users,
+                duration=args.duration,
+                seed=args.seed,
+                ramp_up=args.ramp_up
+            ))
+            results[name] = summarize(recorder)
+            metrics = httpx.get(f"{base_url}/admin/metrics", headers=admin)
+            metrics.raise_for_status()
+            results[name]["server"] = metrics.json()
+
+        report = {
+            "config": {k: v for k, v in vars(args).items() if k not in ("baseline", "save_baseline")},
+            "scenarios": results,
+            "external_calls": {
+                "stripe": httpx.get(f"{stripe.url}/_stats").json(),
+                "cloudinary": httpx.get(f"{cloudinary.url}/_stats").json(),
+            },
+        }
+    finally:
+        if app:
+            app.terminate()
+            app.wait(timeout=30)
+        stripe.stop()
+        cloudinary.stop()
+
+    print_report(results)
+    print(f"\nExternal calls: {json.dumps(report['external_calls'])}")
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        Path(path).write_text(json.dumps(report, indent=2))
+
+    status = 0
+    failing = error_rates(results, args.max_error_rate)
+    if failing:
+        print(f"\n{len(failing)} endpoint(s) over the {args.max_error_rate:.0%} error budget:")
+        for line in failing:
+            print(f"  - {line}")
+        status = 1
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline["scenarios"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) vs {args.baseline}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\nNo regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
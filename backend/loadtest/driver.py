@@ -0,0 +1,84 @@
+# backend/loadtest/driver.py
+"""
+Asyncio load driver: N virtual users loop over a scenario for a fixed
+duration, and every request's latency is recorded by endpoint name.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+
+import httpx
+
+
+@dataclass
+class Recorder:
+    """Latency samples (seconds) and error counts, keyed by endpoint name."""
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def record(self, name: str, latency: float, ok: bool) -> None:
+        self.latencies.setdefault(name, []).append(latency)
+        if not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+class VirtualUser:
+    """One simulated client: a shared HTTP client, its own RNG and session state."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, context: dict):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.context = context
+        self.state: dict = {}
+
+    async def request(
+        self,
+        name: str,
+        method: str,
+        url: str,
+        expected: tuple[int, ...] = (200,),
+        **kwargs
+    ) -> httpx.Response | None:
+        """Send a request and record it under `name`; returns None on transport errors."""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(name, time.perf_counter() - started, ok=False)
+            return None
+        self.recorder.record(name, time.perf_counter() - started, ok=response.status_code in expected)
+        return response
+
+
+async def run(
+    base_url: str,
+    scenario,
+    context: dict,
+    users: int,
+    duration: float,
+    seed: int = 0,
+    ramp_up: float = 0.0
+) -> Recorder:
+    """Run `scenario` with `users` concurrent virtual users for `duration` seconds."""
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user_loop(index: int) -> None:
+            if ramp_up:
+                await asyncio.sleep(ramp_up * index / users)
+            user = VirtualUser(client, recorder, random.Random(seed * 100_003 + index), context)
+            await scenario.on_start(user)
+            while time.perf_counter() < deadline:
+                await scenario.step(user)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user_loop(i) for i in range(users)))
+        recorder.elapsed = time.perf_counter() - started
+
+    return recorder
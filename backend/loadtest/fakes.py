@@ -0,0 +1,239 @@
+# backend/loadtest/fakes.py
+"""
+Local stand-ins for the Stripe and Cloudinary HTTP APIs.
+
+They implement just enough of each API for the app's client libraries
+(PaymentIntent create/retrieve/modify/cancel, upload/destroy and bulk
+resource deletion) and count the calls they receive, exposed at
+GET /_stats.
+
+Both can be told to misbehave (FaultInjector): POST /_faults with
+{"latency": seconds, "error_rate": 0..1, "status": 503} delays every API
+call and fails a fraction of them, which is how loadtest.resilience
+drives the circuit breakers. POST /_faults with {} heals them.
+"""
+import asyncio
+import itertools
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.types import Message, Receive, Scope, Send
+
+
+class BackgroundServer:
+    """Runs an ASGI app with uvicorn on its own thread and event loop."""
+
+    def __init__(self, app, port: int):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(
+            app,
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+            access_log=False,
+            lifespan="off"
+        ))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def start(self) -> "BackgroundServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Fake server on port {self.port} did not start")
+            time.sleep(0.05)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+class FaultInjector:
+    """ASGI wrapper adding latency and errors to every route except /_stats and /_faults."""
+
+    def __init__(self, app, latency: float = 0.0, error_rate: float = 0.0, status: int = 503):
+        self.app = app
+        self.configure(latency=latency, error_rate=error_rate, status=status)
+
+    def configure(self, latency: float = 0.0, error_rate: float = 0.0, status: int = 503) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.status = status
+
+    async def _respond(self, send: Send, status: int, body: dict) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({"type": "http.response.body", "body": json.dumps(body).encode()})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/_stats":
+            await self.app(scope, receive, send)
+            return
+        # Read the body up front: the client may time out and hang up during the delay
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        if scope["path"] == "/_faults":
+            self.configure(**(json.loads(body) if body else {}))
+            await self._respond(send, 200, {
+                "latency": self.latency, "error_rate": self.error_rate, "status": self.status
+            })
+            return
+        if self.latency:
+            # Like a real server, drop requests whose client gave up waiting
+            disconnect = asyncio.ensure_future(receive())
+            done, _ = await asyncio.wait({disconnect}, timeout=self.latency)
+            if done:
+                return
+            disconnect.cancel()
+        if self.error_rate and random.random() < self.error_rate:
+            await self._respond(send, self.status, {
+                "error": {"type": "api_error", "message": "Injected fault"}
+            })
+            return
+
+        async def replay() -> Message:
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(scope, replay, send)
+
+
+def _form_to_dict(form) -> dict:
+    """Collapse Stripe's `metadata[key]=value` encoding into nested dicts."""
+    data: dict = {}
+    for key, value in form.multi_items():
+        if "[" in key and key.endswith("]"):
+            outer, inner = key[:-1].split("[", 1)
+            data.setdefault(outer, {})[inner] = value
+        else:
+            data[key] = value
+    return data
+
+
+def create_stripe_app(**faults) -> FaultInjector:
+    intents: dict[str, dict] = {}
+    idempotent: dict[str, str] = {}
+    calls: Counter = Counter()
+    ids = itertools.count(1)
+
+    async def create_intent(request: Request):
+        calls["payment_intents.create"] += 1
+        key = request.headers.get("idempotency-key")
+        if key in idempotent:
+            # Stripe replays the original response for a repeated idempotency key
+            return JSONResponse(intents[idempotent[key]])
+        data = _form_to_dict(await request.form())
+        intent_id = f"pi_fake_{next(ids)}"
+        intent = {
+            "id": intent_id,
+            "object": "payment_intent",
+            "amount": int(data.get("amount", 0)),
+            "currency": data.get("currency", "usd"),
+            "status": "requires_payment_method",
+            "client_secret": f"{intent_id}_secret_{secrets.token_hex(8)}",
+            "metadata": data.get("metadata", {}),
+            "description": data.get("description"),
+            "created": int(time.time()),
+            "livemode": False,
+        }
+        intents[intent_id] = intent
+        if key:
+            idempotent[key] = intent_id
+        return JSONResponse(intent)
+
+    async def intent_detail(request: Request):
+        intent_id = request.path_params["intent_id"]
+        intent = intents.get(intent_id)
+        if intent is None:
+            return JSONResponse(
+                {"error": {"type": "invalid_request_error", "message": "No such payment_intent"}},
+                status_code=404
+            )
+        if request.method == "POST":
+            calls["payment_intents.modify"] += 1
+            data = _form_to_dict(await request.form())
+            if "amount" in data:
+                intent["amount"] = int(data["amount"])
+            intent["metadata"].update(data.get("metadata", {}))
+        else:
+            calls["payment_intents.retrieve"] += 1
+        return JSONResponse(intent)
+
+    async def cancel_intent(request: Request):
+        calls["payment_intents.cancel"] += 1
+        intent = intents.get(request.path_params["intent_id"])
+        if intent is None:
+            return JSONResponse({"error": {"type": "invalid_request_error"}}, status_code=404)
+        intent["status"] = "canceled"
+        return JSONResponse(intent)
+
+    async def stats(request: Request):
+        return JSONResponse(dict(calls))
+
+    return FaultInjector(Starlette(routes=[
+        Route("/v1/payment_intents", create_intent, methods=["POST"]),
+        Route("/v1/payment_intents/{intent_id}", intent_detail, methods=["GET", "POST"]),
+        Route("/v1/payment_intents/{intent_id}/cancel", cancel_intent, methods=["POST"]),
+        Route("/_stats", stats),
+    ]), **faults)
+
+
+def create_cloudinary_app(**faults) -> FaultInjector:
+    calls: Counter = Counter()
+
+    async def upload(request: Request):
+        calls["upload"] += 1
+        form = await request.form()
+        cloud = request.path_params["cloud"]
+        public_id = str(form.get("public_id", secrets.token_hex(6)))
+        folder = form.get("folder")
+        if folder:
+            public_id = f"{folder}/{public_id}"
+        return JSONResponse({
+            "public_id": public_id,
+            "version": 1,
+            "format": "png",
+            "resource_type": "image",
+            "secure_url": f"https://res.cloudinary.com/{cloud}/image/upload/v1/{public_id}.png",
+        })
+
+    async def destroy(request: Request):
+        calls["destroy"] += 1
+        return JSONResponse({"result": "ok"})
+
+    async def delete_resources(request: Request):
+        calls["delete_resources"] += 1
+        params = request.query_params.getlist("public_ids[]")
+        content_type = request.headers.get("content-type", "")
+        if not params and content_type.startswith("application/json"):
+            params = (await request.json()).get("public_ids", [])
+        elif not params and content_type:
+            params = (await request.form()).getlist("public_ids[]")
+        return JSONResponse({"deleted": {public_id: "deleted" for public_id in params}})
+
+    async def stats(request: Request):
+        return JSONResponse(dict(calls))
+
+    return FaultInjector(Starlette(routes=[
+        Route("/v1_1/{cloud}/{resource_type}/upload", upload, methods=["POST"]),
+        Route("/v1_1/{cloud}/{resource_type}/destroy", destroy, methods=["POST"]),
+        Route("/v1_1/{cloud}/resources/{resource_type}/{kind}", delete_resources, methods=["DELETE"]),
+        Route("/_stats", stats),
+    ]), **faults)
@@ -0,0 +1,88 @@
+# backend/loadtest/fixtures.py
+"""Seed data for a load-test run: an admin, regular users and a product catalog."""
+import asyncio
+import random
+import secrets
+
+import httpx
+
+PASSWORD = "loadtest-password"
+
+
+async def _register(client: httpx.AsyncClient, username: str) -> None:
+    response = await client.post("/auth/register", json={
+        "username": username,
+        "email": f"{username}@loadtest.invalid",
+        "password": PASSWORD,
+    })
+    response.raise_for_status()
+
+
+async def _login(client: httpx.AsyncClient, username: str) -> str:
+    response = await client.post("/auth/login", data={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+def _promote_to_admin(username: str) -> None:
+    """There is no API for granting roles, so go straight to the database."""
+    from database import SessionLocal
+    from models.user import User, UserRole
+
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.username == username).update({User.role: UserRole.admin})
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _check_admin(client: httpx.AsyncClient, token: str) -> None:
+    """Fail the run up front if admin-only routes refuse an admin; otherwise every admin number is a 403."""
+    response = await client.get("/admin/metrics", headers={"Authorization": f"Bearer {token}"})
+    if not response.is_success:
+        raise RuntimeError(f"Admin token rejected by GET /admin/metrics: {response.status_code} {response.text}")
+
+
+async def prepare(base_url: str, products: int, accounts: int, seed: int) -> dict:
+    """Create fresh, uniquely named fixtures and return the shared scenario context."""
+    rng = random.Random(seed)
+    run_id = secrets.token_hex(3)
+    limit = asyncio.Semaphore(16)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        admin = f"lt_admin_{run_id}"
+        await _register(client, admin)
+        await asyncio.to_thread(_promote_to_admin, admin)
+        admin_token = await _login(client, admin)
+        await _check_admin(client, admin_token)
+
+        async def create_product(index: int) -> int:
+            async with limit:
+                response = await client.post(
+                    "/products/",
+                    headers={"Authorization": f"Bearer {admin_token}"},
+                    json={
+                        "name": f"Load test product {index}",
+                        "description": "Seeded by the load test. " * rng.randint(1, 20),
+                        "price": round(rng.uniform(1, 500), 2),
+                    }
+                )
+                response.raise_for_status()
+                return response.json()["id"]
+
+        async def create_account(index: int) -> str:
+            async with limit:
+                username = f"lt_user_{run_id}_{index}"
+                await _register(client, username)
+                return username
+
+        product_ids = await asyncio.gather(*(create_product(i) for i in range(products)))
+        usernames = await asyncio.gather(*(create_account(i) for i in range(accounts)))
+
+    return {
+        "admin_token": admin_token,
+        "product_ids": list(product_ids),
+        "usernames": list(usernames),
+        "password": PASSWORD,
+    }
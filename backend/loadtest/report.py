@@ -0,0 +1,111 @@
+# backend/loadtest/report.py
+"""Throughput/percentile summaries and baseline comparison for load-test runs."""
+import math
+import statistics
+
+from loadtest.driver import Recorder
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def _stats(latencies: list[float], errors: int, elapsed: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+    }
+
+
+def summarize(recorder: Recorder) -> dict:
+    endpoints = {
+        name: _stats(latencies, recorder.errors.get(name, 0), recorder.elapsed)
+        for name, latencies in sorted(recorder.latencies.items())
+    }
+    everything = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    return {
+        "elapsed_s": round(recorder.elapsed, 2),
+        "total": _stats(everything, sum(recorder.errors.values()), recorder.elapsed),
+        "endpoints": endpoints,
+    }
+
+
+def print_report(results: dict) -> None:
+    header = f"{'endpoint':<34}{'count':>8}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    for scenario, summary in results.items():
+        print(f"\n== {scenario} ({summary['elapsed_s']}s)")
+        print(header)
+        rows = list(summary["endpoints"].items()) + [("TOTAL", summary["total"])]
+        for name, s in rows:
+            print(
+                f"{name:<34}{s['count']:>8}{s['errors']:>6}{s['rps']:>10}"
+                f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}"
+            )
+        server = summary.get("server") or {}
+        pool = server.get("db_pool")
+        if pool:
+            print(f"db pool: peak {pool['peak_in_use']} of {pool['size']} in use, {pool['checkouts']} checkouts")
+        for group, stats in (server.get("single_flight") or {}).items():
+            if stats["calls"]:
+                print(
+                    f"single-flight {group}: {stats['calls']} calls, {stats['executions']} fetches, "
+                    f"coalescing ratio {stats['coalescing_ratio']:.1%}"
+                )
+        for name, stats in (server.get("circuit_breakers") or {}).items():
+            if stats["times_opened"] or stats["rejected"] or stats["state"] != "closed":
+                print(
+                    f"breaker {name}: {stats['state']}, opened {stats['times_opened']}x, "
+                    f"{stats['rejected']} calls failed fast"
+                )
+
+
+def error_rates(results: dict, max_error_rate: float) -> list[str]:
+    """
+    Endpoints whose share of unexpected responses exceeds `max_error_rate`;
+    a 403 answered in a millisecond is not a fast endpoint.
+    """
+    failures = []
+    for scenario, summary in results.items():
+        for name, stats in summary["endpoints"].items():
+            if stats["count"] and stats["errors"] / stats["count"] > max_error_rate:
+                failures.append(
+                    f"{scenario}/{name}: {stats['errors']} of {stats['count']} requests failed "
+                    f"({stats['errors'] / stats['count']:.1%})"
+                )
+    return failures
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    List regressions against a baseline run: p95/p99 latency up or
+    throughput down by more than `tolerance` (a fraction), or new errors.
+    """
+    regressions = []
+    for scenario, summary in results.items():
+        base_scenario = baseline.get(scenario)
+        if not base_scenario:
+            continue
+        for name, current in summary["endpoints"].items():
+            base = base_scenario["endpoints"].get(name)
+            if not base:
+                continue
+            for metric in ("p95_ms", "p99_ms"):
+                if base[metric] and current[metric] > base[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{scenario}/{name}: {metric} {base[metric]} -> {current[metric]}"
+                    )
+            if base["rps"] and current["rps"] < base["rps"] * (1 - tolerance):
+                regressions.append(f"{scenario}/{name}: rps {base['rps']} -> {current['rps']}")
+            if current["errors"] > base["errors"]:
+                regressions.append(f"{scenario}/{name}: errors {base['errors']} -> {current['errors']}")
+    return regressions
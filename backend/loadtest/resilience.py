@@ -0,0 +1,195 @@
+# backend/loadtest/resilience.py
+"""
+Deadline and circuit-breaker checks against misbehaving fake services.
+
+    python -m loadtest.resilience [--deadline 1] [--threshold 3] [--reset 2]
+
+Runs the app's real Stripe and Cloudinary call paths (stripe_payment,
+upload_to_cloudinary, the outbox image deletion) in-process against the
+fakes from loadtest.fakes, injects latency and errors through their
+/_faults endpoint, and checks that:
+
+- a slow service costs at most the deadline per call,
+- after `threshold` failures calls fail fast without reaching the service,
+- after `reset` seconds exactly one concurrent caller probes it,
+- a failed probe re-opens the breaker and a successful one closes it.
+
+Needs the same environment as the app (settings are loaded), but no
+database. The repo has no test suite, so this is the automated check: it
+exits 1 if any check fails, including when a service's run errors out
+partway (the remaining services are still checked), so CI can run it as is.
+"""
+import argparse
+import asyncio
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Callable
+
+import cloudinary
+import httpx
+import stripe
+
+from core.circuit_breaker import CLOSED, OPEN, CircuitBreaker, CircuitOpenError
+from core.config import settings
+from dependencies.payments import stripe_payment
+from loadtest.fakes import BackgroundServer, create_cloudinary_app, create_stripe_app
+from services.cloudinary import _delete_images, cloudinary_breaker, upload_to_cloudinary
+from services.payments import configure_stripe_client, stripe_breaker
+
+# Backoff stripe-python sleeps before each retry (at most, with jitter)
+STRIPE_RETRY_DELAY = 0.5
+# Allowed overhead on top of the deadline, and for a fast-fail
+DEADLINE_SLACK = 0.5
+FAST_FAIL_SECONDS = 0.01
+PROBE_CALLERS = 10
+
+# A 1x1 PNG
+PIXEL = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+class Checker:
+    def __init__(self):
+        self.failures: list[str] = []
+
+    def check(self, ok: bool, description: str) -> None:
+        print(f"  [{'ok' if ok else 'FAIL'}] {description}")
+        if not ok:
+            self.failures.append(description)
+
+
+def _timed(call: Callable[[], None]) -> tuple[float, BaseException | None]:
+    start = time.perf_counter()
+    try:
+        call()
+        error = None
+    except Exception as e:
+        error = e
+    return time.perf_counter() - start, error
+
+
+def _calls(server: BackgroundServer) -> int:
+    return sum(httpx.get(f"{server.url}/_stats").json().values())
+
+
+def _faults(server: BackgroundServer, **faults) -> None:
+    httpx.post(f"{server.url}/_faults", json=faults).raise_for_status()
+
+
+def exercise(
+    checker: Checker,
+    name: str,
+    server: BackgroundServer,
+    breaker: CircuitBreaker,
+    call: Callable[[], None],
+    max_call_seconds: float,
+    reset: float
+) -> None:
+    print(f"\n{name}")
+    breaker.reset()
+    _faults(server)
+    seconds, error = _timed(call)
+    checker.check(error is None, f"healthy call succeeds ({seconds * 1000:.0f}ms)")
+
+    # Slow service: every call gives up at the deadline until the breaker opens
+    _faults(server, latency=max_call_seconds * 3)
+    slowest = 0.0
+    for _ in range(breaker.failure_threshold):
+        seconds, error = _timed(call)
+        slowest = max(slowest, seconds)
+        if isinstance(error, CircuitOpenError):
+            break
+    checker.check(slowest <= max_call_seconds, f"slow calls give up within {max_call_seconds:.1f}s "
+                                               f"(slowest {slowest:.2f}s)")
+    checker.check(breaker.state == OPEN, f"breaker opens after {breaker.failure_threshold} failures")
+
+    before = _calls(server)
+    seconds, error = _timed(call)
+    checker.check(isinstance(error, CircuitOpenError) and seconds < FAST_FAIL_SECONDS,
+                  f"open breaker fails fast ({seconds * 1000:.2f}ms)")
+    checker.check(_calls(server) == before, "open breaker does not reach the service")
+
+    # Still failing (errors now, not latency): the single probe re-opens it
+    _faults(server, error_rate=1.0, status=503)
+    time.sleep(reset)
+    opened = breaker.times_opened
+    seconds, error = _timed(call)
+    checker.check(error is not None and not isinstance(error, CircuitOpenError) and breaker.state == OPEN
+                  and breaker.times_opened == opened + 1, "failed half-open probe re-opens the breaker")
+
+    # Recovered: of many concurrent callers exactly one probes, and closes it
+    _faults(server, latency=0.05)
+    time.sleep(reset)
+    before = _calls(server)
+    with ThreadPoolExecutor(PROBE_CALLERS) as pool:
+        errors = list(pool.map(lambda _: _timed(call)[1], range(PROBE_CALLERS)))
+    probes = _calls(server) - before
+    rejected = sum(isinstance(error, CircuitOpenError) for error in errors)
+    checker.check(probes == 1 and rejected == PROBE_CALLERS - 1,
+                  f"one of {PROBE_CALLERS} concurrent callers probes ({probes} reached the service)")
+    checker.check(breaker.state == CLOSED, "successful probe closes the breaker")
+    _faults(server)
+    seconds, error = _timed(call)
+    checker.check(error is None, "calls go through again")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m loadtest.resilience",
+                                     description="Check Stripe/Cloudinary deadlines and circuit breakers")
+    parser.add_argument("--deadline", type=float, default=1.0, help="seconds (overrides the configured deadlines)")
+    parser.add_argument("--threshold", type=int, default=3, help="failures before a breaker opens")
+    parser.add_argument("--reset", type=float, default=2.0, help="seconds a breaker stays open")
+    parser.add_argument("--stripe-port", type=int, default=12121)
+    parser.add_argument("--cloudinary-port", type=int, default=12122)
+    args = parser.parse_args()
+
+    stripe_server = BackgroundServer(create_stripe_app(), args.stripe_port).start()
+    cloudinary_server = BackgroundServer(create_cloudinary_app(), args.cloudinary_port).start()
+    settings.STRIPE_DEADLINE_SECONDS = args.deadline
+    settings.CLOUDINARY_TIMEOUT_SECONDS = args.deadline
+
+    stripe.api_key = settings.STRIPE_SECRET_KEY
+    stripe.api_base = stripe_server.url
+    configure_stripe_client()
+    cloudinary.config(upload_prefix=cloudinary_server.url)
+    for breaker in (stripe_breaker, cloudinary_breaker):
+        breaker.failure_threshold = args.threshold
+        breaker.reset_timeout = args.reset
+
+    user = SimpleNamespace(id=1, username="resilience")
+    checker = Checker()
+    runs = [
+        ("stripe: PaymentIntent.create", stripe_server, stripe_breaker,
+         lambda: asyncio.run(stripe_payment(amount=1000, currency="usd", user=user)),
+         args.deadline + STRIPE_RETRY_DELAY * settings.STRIPE_MAX_NETWORK_RETRIES + DEADLINE_SLACK),
+        ("cloudinary: upload", cloudinary_server, cloudinary_breaker,
+         lambda: upload_to_cloudinary(SimpleNamespace(file=io.BytesIO(PIXEL)), "resilience"),
+         args.deadline + DEADLINE_SLACK),
+        ("cloudinary: delete_resources (outbox)", cloudinary_server, cloudinary_breaker,
+         lambda: _delete_images([{"public_id": "products/product_resilience"}]),
+         args.deadline + DEADLINE_SLACK),
+    ]
+    try:
+        for name, server, breaker, call, max_call_seconds in runs:
+            try:
+                exercise(checker, name, server, breaker, call, max_call_seconds, reset=args.reset)
+            except Exception as e:
+                checker.check(False, f"{name} ran to completion ({type(e).__name__}: {e})")
+    finally:
+        stripe_server.stop()
+        cloudinary_server.stop()
+
+    if checker.failures:
+        print(f"\n{len(checker.failures)} check(s) failed")
+        return 1
+    print("\nAll checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+# backend/loadtest/scenarios.py
+"""Traffic mixes exercised by the load test. One `step` is one user iteration."""
+from loadtest.driver import VirtualUser
+
+# 1x1 transparent PNG used for image uploads
+PNG_BYTES = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _popular_product(user: VirtualUser) -> int:
+    """Pick a product id with a long-tailed (Pareto) popularity skew."""
+    ids = user.context["product_ids"]
+    return ids[min(int(user.rng.paretovariate(1.2)) - 1, len(ids) - 1)]
+
+
+class Scenario:
+    name = ""
+
+    async def on_start(self, user: VirtualUser) -> None:
+        pass
+
+    async def step(self, user: VirtualUser) -> None:
+        raise NotImplementedError
+
+
+class Browse(Scenario):
+    """Anonymous catalog browsing: list pages, cart-sized batch reads and skewed product detail reads."""
+    name = "browse"
+
+    async def step(self, user: VirtualUser) -> None:
+        roll = user.rng.random()
+        if roll < 0.3:
+            pages = max(len(user.context["product_ids"]) // 20, 1)
+            await user.request(
+                "GET /products", "GET", "/products/",
+                params={"skip": user.rng.randrange(pages) * 20, "limit": user.rng.choice((20, 50, 100))}
+            )
+        elif roll < 0.4:
+            ids = {_popular_product(user) for _ in range(user.rng.randint(2, 20))}
+            await user.request(
+                "GET /products/batch", "GET", "/products/batch",
+                params={"ids": ",".join(map(str, ids))}
+            )
+        else:
+            await user.request("GET /products/{id}", "GET", f"/products/{_popular_product(user)}")
+
+
+class Herd(Scenario):
+    """Thundering herd: every user hammers the same product, as when one goes viral."""
+    name = "herd"
+
+    async def step(self, user: VirtualUser) -> None:
+        await user.request("GET /products/{hot}", "GET", f"/products/{user.context['product_ids'][0]}")
+
+
+class Auth(Scenario):
+    """Login followed by a chain of refresh-token rotations."""
+    name = "auth"
+
+    async def on_start(self, user: VirtualUser) -> None:
+        user.state["username"] = user.rng.choice(user.context["usernames"])
+
+    async def step(self, user: VirtualUser) -> None:
+        response = await user.request(
+            "POST /auth/login", "POST", "/auth/login",
+            data={"username": user.state["username"], "password": user.context["password"]}
+        )
+        if response is None or response.status_code != 200:
+            return
+        refresh_token = response.json()["refresh_token"]
+        for _ in range(3):
+            response = await user.request(
+                "POST /auth/refresh", "POST", "/auth/refresh",
+                params={"refresh_token": refresh_token}
+            )
+            if response is None or response.status_code != 200:
+                return
+            refresh_token = response.json()["refresh_token"]
+
+
+class AdminCrud(Scenario):
+    """Admin product lifecycle: create, update, upload an image, delete."""
+    name = "admin"
+
+    async def step(self, user: VirtualUser) -> None:
+        headers = _auth(user.context["admin_token"])
+        response = await user.request(
+            "POST /products", "POST", "/products/",
+            expected=(201,),
+            headers=headers,
+            json={
+                "name": f"LT product {user.rng.randrange(10**9)}",
+                "description": "Created by the load test",
+                "price": round(user.rng.uniform(1, 500), 2),
+            }
+        )
+        if response is None or response.status_code != 201:
+            return
+        product_id = response.json()["id"]
+
+        await user.request(
+            "PUT /products/{id}", "PUT", f"/products/{product_id}",
+            headers=headers,
+            json={"price": round(user.rng.uniform(1, 500), 2)}
+        )
+        await user.request(
+            "POST /products/{id}/upload-image", "POST", f"/products/{product_id}/upload-image",
+            expected=(201,),
+            headers=headers,
+            files={"file": ("image.png", PNG_BYTES, "image/png")}
+        )
+        await user.request(
+            "DELETE /products/{id}", "DELETE", f"/products/{product_id}",
+            expected=(204,),
+            headers=headers
+        )
+
+
+class Checkout(Scenario):
+    """Logged-in users requesting payment intents, often retrying the same product."""
+    name = "checkout"
+
+    async def on_start(self, user: VirtualUser) -> None:
+        response = await user.request(
+            "POST /auth/login", "POST", "/auth/login",
+            data={"username": user.rng.choice(user.context["usernames"]), "password": user.context["password"]}
+        )
+        user.state["token"] = response.json()["access_token"] if response and response.status_code == 200 else ""
+        user.state["product_id"] = _popular_product(user)
+
+    async def step(self, user: VirtualUser) -> None:
+        if user.rng.random() < 0.3:
+            user.state["product_id"] = _popular_product(user)
+        await user.request(
+            "POST /products/{id}/create-payment-intent", "POST",
+            f"/products/{user.state['product_id']}/create-payment-intent",
+            headers=_auth(user.state["token"])
+        )
+
+
+SCENARIOS: dict[str, type[Scenario]] = {
+    cls.name: cls for cls in (Browse, Herd, Auth, AdminCrud, Checkout)
+}
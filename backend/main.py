@@ -1,14 +1,38 @@
 # /backend/main.py
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import math
 from fastapi.middleware.cors import CORSMiddleware
 from database import engine, Base
 from routers.auth_router import router as auth_router
 from routers.product_router import router as product_router
+from routers.admin_router import router as admin_router
+from routers.payment_router import router as payment_router
+from routers.category_router import router as category_router
+from routers.promotion_router import router as promotion_router
 from anyio import to_thread
 import stripe
 from core.config import settings
+from core.compression import CompressionMiddleware
+from core import metrics
+from core.circuit_breaker import CircuitOpenError
+from core.tracing import TracingMiddleware, create_exporter, instrument_engine
+from core.profiling import ProfilingMiddleware, profiler
+from core.scheduler import scheduler
+from services.maintenance import cancel_stale_orders, expire_cart_items, purge_revoked_tokens
+from services.recommendations import refresh_related_products
+from services.outbox import dispatch_outbox
+from services.payments import configure_stripe_client
+from services.product_events import listener as product_event_listener
+import services.analytics  # noqa: F401 - registers the sales rollup ORM hooks
+
+
+# Pool usage for GET /admin/metrics, SQL timings for Server-Timing/traces
+metrics.track_pool(engine)
+if settings.TRACING_ENABLED:
+    instrument_engine(engine)
 
 
 #create all tables
@@ -19,10 +43,28 @@ async def lifespan(app: FastAPI):
     
     # Configure Stripe
     stripe.api_key = settings.STRIPE_SECRET_KEY
+    if settings.STRIPE_API_BASE:
+        stripe.api_base = settings.STRIPE_API_BASE
+    configure_stripe_client()
+
+    # Periodic jobs (one worker runs each tick, via advisory locks)
+    if settings.SCHEDULER_ENABLED:
+        scheduler.add("expire_cart_items", settings.MAINTENANCE_INTERVAL_SECONDS, expire_cart_items)
+        scheduler.add("cancel_stale_orders", settings.MAINTENANCE_INTERVAL_SECONDS, cancel_stale_orders)
+        scheduler.add("purge_revoked_tokens", settings.MAINTENANCE_INTERVAL_SECONDS, purge_revoked_tokens)
+        scheduler.add("refresh_related_products", settings.RECOMMENDATIONS_REFRESH_SECONDS, refresh_related_products)
+        scheduler.add("dispatch_outbox", settings.OUTBOX_INTERVAL_SECONDS, dispatch_outbox)
+        scheduler.start()
+
+    # Fans product changes from every worker out to this worker's SSE clients
+    if settings.PRODUCT_STREAM_ENABLED:
+        product_event_listener.start()
     
     yield
-    # Shutdown: (e.g., close pools)
-    # await engine.dispose()
+    # Shutdown runs after uvicorn has drained in-flight requests
+    await scheduler.stop()
+    await product_event_listener.stop()
+    await to_thread.run_sync(engine.dispose)
     
 # Initialize fastapi app
 app = FastAPI(
@@ -39,9 +81,49 @@ app.add_middleware(
     allow_headers=("*")
 )    
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        cache_entries=settings.COMPRESSION_CACHE_ENTRIES
+    )
+
+# Outermost, so Server-Timing's total covers compression too
+if settings.TRACING_ENABLED:
+    app.add_middleware(
+        TracingMiddleware,
+        sample_rate=settings.TRACING_SAMPLE_RATE,
+        exporter=create_exporter(),
+        timing_token=settings.TRACING_TIMING_TOKEN
+    )
+
+# Opt-in sampling profiler; outermost so profiles cover the whole middleware stack
+if settings.PROFILING_ENABLED:
+    app.add_middleware(
+        ProfilingMiddleware,
+        profiler=profiler,
+        sample_rate=settings.PROFILING_SAMPLE_RATE,
+        token=settings.PROFILING_TOKEN
+    )
+
+# A Stripe/Cloudinary breaker is open: fail fast and tell clients when to retry
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"{exc.name.capitalize()} is temporarily unavailable, please retry shortly"},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))}
+    )
+
 # Include routers
 app.include_router(auth_router, tags=["Authentication"])
 app.include_router(product_router, tags=["Products"])
+app.include_router(admin_router, tags=["Admin"])
+app.include_router(payment_router, tags=["Payments"])
+app.include_router(category_router, tags=["Categories"])
+app.include_router(promotion_router, tags=["Promotions"])
 
 # read route
 @app.get("/")
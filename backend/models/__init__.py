@@ -5,7 +5,13 @@ from .user import User
 from .product import Product
 from .cart import CartItem
 from .order import Order, OrderItem
-from .category import Category
+from .category import Category, CategoryClosure
+from .token import RevokedToken
+from .analytics import DailySales, DailyProductSales, DailyCategoryRevenue
+from .recommendation import ProductCooccurrence, RelatedProduct, RecommendationState
+from .payment import PaymentIntentRecord
+from .outbox import OutboxMessage
+from .promotion import Promotion
 
 # Export all models
 __all__ = [
@@ -15,5 +21,16 @@ __all__ = [
     "CartItem",
     "Order",
     "OrderItem",
-    "Category"
+    "Category",
+    "CategoryClosure",
+    "RevokedToken",
+    "DailySales",
+    "DailyProductSales",
+    "DailyCategoryRevenue",
+    "ProductCooccurrence",
+    "RelatedProduct",
+    "RecommendationState",
+    "PaymentIntentRecord",
+    "OutboxMessage",
+    "Promotion"
 ]
\ No newline at end of file
@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, Float, Date
+from database import Base
+
+
+# sales rollups, maintained incrementally when an order is completed
+# (see services/analytics.py); product/category ids carry no foreign keys
+# so history survives catalog deletions. category_id 0 = uncategorized.
+class DailySales(Base):
+    __tablename__ = 'daily_sales'
+
+    day = Column(Date, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class DailyProductSales(Base):
+    __tablename__ = 'daily_product_sales'
+
+    day = Column(Date, primary_key=True)
+    product_id = Column(Integer, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
+
+
+class DailyCategoryRevenue(Base):
+    __tablename__ = 'daily_category_revenue'
+
+    day = Column(Date, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    order_count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -8,5 +8,26 @@ class Category(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
     description = Column(String, nullable=True)
+    parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
 
-    products = relationship("Product", back_populates="category")
\ No newline at end of file
+    products = relationship("Product", back_populates="category")
+    parent = relationship("Category", remote_side=[id], back_populates="children")
+    children = relationship("Category", back_populates="parent")
+
+
+class CategoryClosure(Base):
+    """
+    Every (ancestor, descendant) pair of the category tree, including each
+    category paired with itself at depth 0, so a subtree is one indexed
+    lookup by ancestor_id. Maintained by services.categories.
+    """
+    __tablename__ = "category_closure"
+
+    ancestor_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True)
+    depth = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Ancestors of a category (moves, breadcrumbs)
+        Index("ix_category_closure_descendant", "descendant_id", "ancestor_id"),
+    )
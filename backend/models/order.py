@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index, text
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime, timezone
@@ -19,10 +19,20 @@ class Order(Base):
     status = Column(Enum(OrderStatus), default=OrderStatus.pending)
     total_price = Column(Float)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # set when the order first becomes completed; drives the sales rollups
+    # and the incremental recommendation refresh
+    completed_at = Column(DateTime, nullable=True, index=True)
     
     # relationships 
     user = relationship("User", back_populates="orders")
     items = relationship("OrderItem", back_populates="order")
+
+    __table_args__ = (
+        # order history: WHERE user_id = ? ORDER BY created_at DESC
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        # stale-order cleanup only ever scans pending orders
+        Index("ix_orders_pending_created_at", "created_at", postgresql_where=text("status = 'pending'")),
+    )
     
 
 # orderitem model 
@@ -30,8 +40,8 @@ class OrderItem(Base):
     __tablename__ = 'order_items'
     
     id = Column(Integer, primary_key=True)
-    order_id = Column(Integer, ForeignKey('orders.id'))
-    product_id = Column(Integer, ForeignKey('products.id'))
+    order_id = Column(Integer, ForeignKey('orders.id'), index=True)
+    product_id = Column(Integer, ForeignKey('products.id'), index=True)
     quantity = Column(Integer)
     price = Column(Float)
     
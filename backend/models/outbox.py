@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Index, text
+from database import Base
+from datetime import datetime, timezone
+
+
+# transactional outbox: external side effects (Cloudinary deletes, later
+# Stripe calls and emails) are written here in the same transaction as the
+# change that causes them and executed by services/outbox.py's dispatcher.
+# Delivered messages are deleted; ones that exhaust their retries keep a
+# failed_at for inspection.
+class OutboxMessage(Base):
+    __tablename__ = 'outbox'
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    available_at = Column(DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+    last_error = Column(Text, nullable=True)
+    failed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # the dispatcher only ever looks for due, not-yet-failed messages
+        Index("ix_outbox_due", "available_at", postgresql_where=text("failed_at IS NULL")),
+    )
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from database import Base
+from datetime import datetime, timezone
+
+
+# the Stripe PaymentIntent currently open for one checkout of one user.
+# checkout_key names what is being bought ("product:42", later "cart"),
+# contents_hash + amount say what it was priced for; see services/payments.py
+class PaymentIntentRecord(Base):
+    __tablename__ = 'payment_intents'
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete="CASCADE"), nullable=False)
+    checkout_key = Column(String(64), nullable=False)
+    contents_hash = Column(String(64), nullable=False)
+    amount = Column(Integer, nullable=False)  # cents
+    currency = Column(String(3), nullable=False)
+    stripe_intent_id = Column(String(255), nullable=False, unique=True)
+    client_secret = Column(String(255), nullable=False)
+    status = Column(String(32), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc)
+    )
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "checkout_key", name="uq_payment_intents_user_checkout"),
+    )
@@ -11,9 +11,9 @@ class Product(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     description = Column(String, nullable=True)
-    price = Column(Float)
+    price = Column(Float, index=True)
     image_url = Column(String, nullable=True)
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
     
     category = relationship("Category", back_populates="products")
     cart_items = relationship("CartItem", back_populates="product")
@@ -0,0 +1,30 @@
+from sqlalchemy import Boolean, Column, Integer, String, Float, DateTime, ForeignKey, CheckConstraint
+from database import Base
+from datetime import datetime, timezone
+
+
+# a discount rule. Scope: one product, a category and everything under it,
+# or (neither set) the whole catalog. A line qualifies once its quantity
+# reaches min_quantity (volume tiers are several rules with rising
+# thresholds), and coupon rules only when the cart presents their code.
+# Each line gets the single best qualifying discount; see services/pricing.py
+class Promotion(Base):
+    __tablename__ = 'promotions'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    product_id = Column(Integer, ForeignKey('products.id', ondelete="CASCADE"), nullable=True, index=True)
+    category_id = Column(Integer, ForeignKey('categories.id', ondelete="CASCADE"), nullable=True, index=True)
+    percent_off = Column(Float, nullable=True)  # 0-100
+    amount_off = Column(Integer, nullable=True)  # cents off each unit
+    min_quantity = Column(Integer, nullable=False, default=1)
+    coupon_code = Column(String(64), nullable=True, unique=True)  # stored upper-case
+    starts_at = Column(DateTime, nullable=True)
+    ends_at = Column(DateTime, nullable=True)
+    active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        CheckConstraint("(percent_off IS NULL) <> (amount_off IS NULL)", name="ck_promotions_one_discount"),
+        CheckConstraint("product_id IS NULL OR category_id IS NULL", name="ck_promotions_one_scope"),
+    )
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, SmallInteger, DateTime
+from database import Base
+
+
+# "frequently bought together", built offline by services/recommendations.py.
+# product_cooccurrence holds the full sparse matrix (one row per ordered pair
+# of products bought in the same completed order) so refreshes only re-rank
+# the products touched by new orders; related_products is the top-K per
+# product that GET /products/{id}/related reads with one primary-key range scan.
+class ProductCooccurrence(Base):
+    __tablename__ = 'product_cooccurrence'
+
+    product_id = Column(Integer, primary_key=True)
+    other_id = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False)  # completed orders containing both
+
+
+class RelatedProduct(Base):
+    __tablename__ = 'related_products'
+
+    product_id = Column(Integer, primary_key=True)
+    rank = Column(SmallInteger, primary_key=True)
+    related_id = Column(Integer, nullable=False)
+    score = Column(Integer, nullable=False)
+
+
+class RecommendationState(Base):
+    __tablename__ = 'recommendation_state'
+
+    id = Column(Integer, primary_key=True, default=1)
+    # orders completed up to (and including) this time are in the matrix
+    orders_through = Column(DateTime, nullable=True)
+    built_at = Column(DateTime, nullable=True)
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime
+from database import Base
+from datetime import datetime, timezone
+
+
+# revoked token model (durable denylist, keyed by the JWT "jti" claim)
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+
+    jti = Column(String(32), primary_key=True)
+    token_type = Column(String(16), nullable=False)
+    username = Column(String, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index, func
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime, timezone
@@ -21,6 +21,13 @@ class User(Base):
     hashed_password = Column(String)
     role = Column(Enum(UserRole), default=UserRole.user)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    # Case-insensitive uniqueness; the plain unique indexes above still serve
+    # the exact-match lookups done on every authenticated request
+    __table_args__ = (
+        Index("uq_users_username_lower", func.lower(username), unique=True),
+        Index("uq_users_email_lower", func.lower(email), unique=True),
+    )
     
     # relationships
     carts = relationship("CartItem", back_populates="user")
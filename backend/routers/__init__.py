@@ -1,5 +1,9 @@
 from .auth_router import router as auth_router
 from .product_router import router as product_router
+from .admin_router import router as admin_router
+from .payment_router import router as payment_router
+from .category_router import router as category_router
+from .promotion_router import router as promotion_router
 # from .cart_router import router as cart_router
 # from .order_router import router as order_router
 
@@ -7,6 +11,10 @@ from .product_router import router as product_router
 __all__ = [
     "auth_router",
     "product_router",
+    "admin_router",
+    "payment_router",
+    "category_router",
+    "promotion_router",
     # "cart_router",
     # "order_router"
 ]
\ No newline at end of file
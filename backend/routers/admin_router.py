@@ -0,0 +1,206 @@
+# backend/routers/admin_router.py
+from datetime import date, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic_core import to_json
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core import metrics, profiling
+from core.config import settings
+from dependencies import get_db, require_admin
+from models.analytics import DailyCategoryRevenue, DailyProductSales, DailySales
+from models.category import Category
+from models.product import Product
+from schemas.analytics import AnalyticsGrouping, SalesAnalytics, SalesRollup
+from schemas.product import ProductBulkFilter, ProductBulkResult, ProductBulkUpdate
+from schemas.user import UserBulkCreate, UserBulkResult
+from services.bulk_products import bulk_delete_products, bulk_update_products
+from services.users import provision_users
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    dependencies=[Depends(require_admin)]
+)
+
+# --------------------------------
+# Sales Analytics
+# --------------------------------
+
+@router.get("/analytics", response_model=SalesAnalytics)
+def sales_analytics(
+    start: Optional[date] = Query(None, description="First day (default: 30 days ago)"),
+    end: Optional[date] = Query(None, description="Last day, inclusive (default: today)"),
+    group_by: AnalyticsGrouping = Query(AnalyticsGrouping.day, description="day, category or product"),
+    limit: int = Query(50, ge=1, le=500, description="Top-N rows for category/product grouping"),
+    db: Session = Depends(get_db)
+):
+    """
+    Revenue, units and order counts from the daily rollup tables (Admin only).
+    Never touches orders/order_items, so cost scales with days in range.
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+
+    if group_by == AnalyticsGrouping.day:
+        rows = (
+            db.query(DailySales)
+            .filter(DailySales.day.between(start, end))
+            .order_by(DailySales.day)
+            .all()
+        )
+        results = [
+            SalesRollup(day=r.day, order_count=r.order_count, quantity=r.quantity, revenue=r.revenue)
+            for r in rows
+        ]
+    else:
+        model, key, names = (
+            (DailyCategoryRevenue, DailyCategoryRevenue.category_id, Category)
+            if group_by == AnalyticsGrouping.category
+            else (DailyProductSales, DailyProductSales.product_id, Product)
+        )
+        revenue = func.sum(model.revenue).label("revenue")
+        totals = (
+            db.query(
+                key.label("id"),
+                func.sum(model.order_count).label("order_count"),
+                func.sum(model.quantity).label("quantity"),
+                revenue
+            )
+            .filter(model.day.between(start, end))
+            .group_by(key)
+            .order_by(revenue.desc())
+            .limit(limit)
+            .subquery()
+        )
+        rows = (
+            db.query(totals, names.name)
+            .outerjoin(names, names.id == totals.c.id)
+            .order_by(totals.c.revenue.desc())
+            .all()
+        )
+        id_field = "category_id" if group_by == AnalyticsGrouping.category else "product_id"
+        results = [
+            SalesRollup(**{
+                id_field: r.id,
+                "name": r.name,
+                "order_count": r.order_count,
+                "quantity": r.quantity,
+                "revenue": r.revenue,
+            })
+            for r in rows
+        ]
+
+    return SalesAnalytics(start=start, end=end, group_by=group_by, rows=results)
+
+# --------------------------------
+# Runtime Metrics
+# --------------------------------
+
+@router.get("/metrics")
+def runtime_metrics(
+    reset: bool = Query(False, description="Start a new measurement window after reading")
+):
+    """
+    This worker's DB pool usage (current and peak checked-out connections)
+    and request-coalescing counters per single-flight group
+    """
+    snapshot = metrics.snapshot()
+    if reset:
+        metrics.reset()
+    return snapshot
+
+# --------------------------------
+# Profiling
+# --------------------------------
+
+def _require_profiling() -> None:
+    if not settings.PROFILING_ENABLED:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+
+@router.get("/profiles", dependencies=[Depends(_require_profiling)])
+def list_profiles():
+    """
+    Stored profiles: every worker's sampled requests added up (id "sampled"),
+    then single-request profiles, newest first
+    """
+    return profiling.list_profiles(settings.PROFILING_DIR)
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(_require_profiling)])
+def download_profile(
+    profile_id: str,
+    format: str = Query("speedscope", pattern="^(speedscope|folded)$",
+                        description="speedscope JSON, or folded stacks for flamegraph.pl / inferno")
+):
+    """Download a profile, by the X-Profile-Id of a request or "sampled" (Admin only)"""
+    document = profiling.find_profile(settings.PROFILING_DIR, profile_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == "folded":
+        content, media_type, suffix = profiling.to_folded(document), "text/plain", "folded"
+    else:
+        content, media_type, suffix = to_json(profiling.to_speedscope(document)), "application/json", "speedscope.json"
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.{suffix}"'}
+    )
+
+@router.delete(
+    "/profiles",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(_require_profiling)]
+)
+def clear_profiles():
+    """Delete every stored profile; the sampled profile starts over (Admin only)"""
+    profiling.clear_profiles(settings.PROFILING_DIR)
+    return None
+
+# --------------------------------
+# Bulk Product Operations
+# --------------------------------
+
+@router.post("/products/bulk-update", response_model=ProductBulkResult)
+def bulk_update(
+    request: ProductBulkUpdate,
+    db: Session = Depends(get_db)
+):
+    """
+    Reprice (absolute or by percentage) and/or recategorize every product
+    matching ids/category/price range, in a single UPDATE
+    """
+    ids = bulk_update_products(db, request)
+    return {"count": len(ids), "ids": ids}
+
+@router.post("/products/bulk-delete", response_model=ProductBulkResult)
+def bulk_delete(
+    request: ProductBulkFilter,
+    db: Session = Depends(get_db)
+):
+    """
+    Delete every product matching ids/category/price range, in a single
+    DELETE; their images are removed in batches by the outbox dispatcher
+    """
+    ids = bulk_delete_products(db, request)
+    return {"count": len(ids), "ids": ids}
+
+# --------------------------------
+# User Provisioning
+# --------------------------------
+
+@router.post("/users/bulk", response_model=UserBulkResult)
+def bulk_create_users(
+    request: UserBulkCreate,
+    db: Session = Depends(get_db)
+):
+    """
+    Create up to 200 regular user accounts (B2B onboarding); send larger
+    files in chunks. Passwords are hashed in parallel and rows inserted in
+    batches; accounts whose username or email is already registered are
+    skipped, so a chunk can be re-sent
+    """
+    created, skipped = provision_users(db, request.users)
+    return {"created": created, "skipped": skipped}
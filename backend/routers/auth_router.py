@@ -1,7 +1,7 @@
 # backend/routers/auth_router.py
 
 # required imports
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
@@ -9,19 +9,23 @@ from sqlalchemy.orm import Session
 
 # local imports
 from core.auth import (
-    get_password_hash,
     authenticate_user,
     create_tokens,
     get_current_user,
+    oauth2_scheme,
+    revoke_token,
+    validate_token,
     Token
 )
 from core.config import settings
+from core.rate_limit import rate_limiter
 from database import get_db
 from models.user import User
 from schemas.user import(
     UserResponse,
     UserCreate
 )
+from services.users import conflict_detail, create_user
 
 
 # Setup & Initialize router
@@ -40,41 +44,27 @@ router = APIRouter(
     summary="Register new user"
 )
 async def register(
+    request: Request,
     user_data: UserCreate,
     db: Session = Depends(get_db)
 ):
     """
     Register a new user with:
-    - **username**: Unique username
-    - **email**: Valid email address
+    - **username**: Unique username (case-insensitive)
+    - **email**: Valid email address, not already registered
     - **password**: Strong password (min 8 chars)
     """
-    #Check for existing username
-    if db.query(User).filter(User.username == user_data.username).first():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
-        )
-    
-    #check for existing email
-    if db.query(User).filter(User.email == user_data.email).first():
+    # Throttle before touching the DB or bcrypt
+    await rate_limiter.enforce(request, "register", user_data.username)
+
+    # One INSERT ... ON CONFLICT DO NOTHING; the unique indexes do the checking
+    new_user = create_user(db, user_data)
+    if new_user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already in use"
+            detail=conflict_detail(db, user_data)
         )
     
-    # Create user
-    hashed_password = get_password_hash(user_data.password)
-    new_user = User(
-        username = user_data.username,
-        email = user_data.email,
-        hashed_password = hashed_password
-    )
-    
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    
     return new_user
 
 # --------------------------------
@@ -86,6 +76,7 @@ async def register(
     summary="Authenticated user"
 )
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -98,6 +89,9 @@ async def login(
     - **refresh_token**: Token to get new access tokens
     - **token_type**: Always 'bearer'
     """
+    # Throttle before the (deliberately slow) password check
+    await rate_limiter.enforce(request, "login", form_data.username)
+
     user = authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
@@ -122,7 +116,8 @@ async def refresh_token(
     db: Session = Depends(get_db)
 ):
     """
-    Get new access token using refresh token
+    Exchange a refresh token for a new token pair.
+    The presented refresh token is revoked, so each one works only once.
     """
     try:
         payload = jwt.decode(
@@ -140,6 +135,11 @@ async def refresh_token(
         user = db.query(User).filter(User.username == username).first()
         if not user:
             raise JWTError("User not found")
+
+        # Rotation: claiming the jti fails if this token was already used
+        if not revoke_token(db, payload):
+            raise JWTError("Token has been revoked")
+        db.commit()
             
         return create_tokens(username)  # Now username is guaranteed to be str
         
@@ -149,6 +149,49 @@ async def refresh_token(
             detail=str(e),
             headers={"WWW-Authenticate": "Bearer"}
         )
+
+# --------------------------------
+# Logout Endpoint
+# --------------------------------
+
+@router.post(
+    "/logout",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Revoke the current tokens"
+)
+async def logout(
+    token: str = Depends(oauth2_scheme),
+    refresh_token: str | None = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Revoke the access token used for this request and, if given,
+    the matching refresh token. Takes effect on every worker within
+    REVOCATION_SYNC_SECONDS.
+    """
+    payload = validate_token(token)
+    if payload.get("type") != "access":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid token type",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    # Separate commits: a token that is already revoked rolls back only its own insert
+    if refresh_token:
+        refresh_payload = validate_token(refresh_token)
+        if refresh_payload.get("type") != "refresh" or refresh_payload.get("sub") != payload.get("sub"):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Refresh token does not belong to this session"
+            )
+        if revoke_token(db, refresh_payload):
+            db.commit()
+
+    if revoke_token(db, payload):
+        db.commit()
+    return None
+
 # --------------------------------
 # /user/me endpoint (protected route)
 # --------------------------------
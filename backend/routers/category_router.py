@@ -0,0 +1,110 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from sqlalchemy.orm import Session
+from typing import List
+
+from dependencies import get_db, require_admin
+from models.category import Category
+from schemas.category import CategoryCreate, CategoryNode, CategoryResponse, CategorySubtree, CategoryUpdate
+from services.catalog_cache import catalog_cache
+from services.categories import category_tree, delete_category, move_category
+
+router = APIRouter(
+    prefix="/categories",
+    tags=["Categories"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+def _name_taken(db: Session, name: str, category_id: int | None = None) -> bool:
+    query = db.query(Category.id).filter(Category.name == name)
+    if category_id is not None:
+        query = query.filter(Category.id != category_id)
+    return query.first() is not None
+
+# --------------------------------
+# Public Routes
+# --------------------------------
+
+@router.get("/", response_model=List[CategoryNode])
+def get_category_tree(db: Session = Depends(get_db)):
+    """The whole category tree, top-level categories first (served from a per-worker cache)"""
+    return Response(content=category_tree.get(db).body, media_type="application/json")
+
+@router.get("/{category_id}", response_model=CategorySubtree)
+def get_category(category_id: int, db: Session = Depends(get_db)):
+    """A category with its subcategories and its path from the top level"""
+    body = category_tree.get(db).subtree(category_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return Response(content=body, media_type="application/json")
+
+# --------------------------------
+# Admin-Only Routes
+# --------------------------------
+
+@router.post(
+    "/",
+    response_model=CategoryResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_admin)]
+)
+def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
+    """Create a category, optionally under a parent (Admin only)"""
+    if _name_taken(db, category.name):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Category name already exists")
+    if category.parent_id is not None and db.get(Category, category.parent_id) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parent category not found")
+
+    db_category = Category(**category.model_dump())
+    db.add(db_category)
+    db.commit()
+    db.refresh(db_category)
+    return db_category
+
+@router.patch(
+    "/{category_id}",
+    response_model=CategoryResponse,
+    dependencies=[Depends(require_admin)]
+)
+def update_category(category_id: int, category: CategoryUpdate, db: Session = Depends(get_db)):
+    """Rename a category or move it, with its subtree, under another parent (Admin only)"""
+    db_category = db.get(Category, category_id)
+    if not db_category:
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    update_data = category.model_dump(exclude_unset=True)
+    if update_data.get("name") and _name_taken(db, update_data["name"], category_id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Category name already exists")
+    if "parent_id" in update_data:
+        try:
+            move_category(db, db_category, update_data.pop("parent_id"))
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    for field, value in update_data.items():
+        if value is not None or field == "description":
+            setattr(db_category, field, value)
+
+    db.commit()
+    if "name" in update_data:
+        catalog_cache.clear()  # cached products carry the category name
+    db.refresh(db_category)
+    return db_category
+
+@router.delete(
+    "/{category_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_admin)]
+)
+def remove_category(category_id: int, db: Session = Depends(get_db)):
+    """Delete a category without subcategories; its products move to the parent (Admin only)"""
+    db_category = db.get(Category, category_id)
+    if not db_category:
+        raise HTTPException(status_code=404, detail="Category not found")
+    try:
+        delete_category(db, db_category)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    db.commit()
+    catalog_cache.clear()
+    return None
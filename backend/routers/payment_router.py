@@ -0,0 +1,46 @@
+# backend/routers/payment_router.py
+import logging
+
+import stripe
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from dependencies import get_db
+from services.payments import update_intent_status
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/payments",
+    tags=["Payments"]
+)
+
+# --------------------------------
+# Stripe Webhooks
+# --------------------------------
+
+@router.post("/webhook", status_code=status.HTTP_200_OK)
+async def stripe_webhook(
+    request: Request,
+    stripe_signature: str = Header(..., alias="Stripe-Signature"),
+    db: Session = Depends(get_db)
+):
+    """
+    Receive Stripe events. PaymentIntent status changes are recorded so a
+    paid or cancelled intent is never handed out again for a retry.
+    """
+    payload = await request.body()
+    try:
+        event = stripe.Webhook.construct_event(payload, stripe_signature, settings.STRIPE_WEBHOOK_SECRET)
+    except (ValueError, stripe.SignatureVerificationError) as e:
+        logger.warning(f"Rejected Stripe webhook: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid webhook payload or signature"
+        )
+
+    if event["type"].startswith("payment_intent."):
+        intent = event["data"]["object"]
+        update_intent_status(db, intent["id"], intent["status"])
+    return {"received": True}
@@ -1,24 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
+from fastapi.responses import StreamingResponse
+from anyio import to_thread
+from pydantic_core import to_json
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Callable, Hashable, List, Optional, TypeVar
 import stripe
-from decimal import Decimal
 import logging
-from database import get_db
+from database import SessionLocal, get_db
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
 # Dependencies
-from dependencies import get_db, require_admin
+from dependencies import get_current_user, get_db, require_admin
 from models.product import Product
+from models.user import User
 from schemas.product import (
+    MAX_BATCH_IDS,
+    partial_product_response,
+    ProductBatchRequest,
+    ProductBatchResponse,
     ProductCreate, 
     ProductResponse, 
     ProductUpdate,
     ProductWithPrice
 )
-from services.cloudinary import upload_to_cloudinary, delete_from_cloudinary, handle_product_image
+from core.circuit_breaker import CircuitOpenError
+from core.config import settings
+from core.single_flight import SingleFlight
+from services.catalog import parse_fields, product_list_query, related_products_query, resolve_category
+from services.catalog_cache import catalog_cache, load_products
+from services.payments import CheckoutConflictError, CheckoutLine, checkout_intent
+from services.pricing import checkout_price
+from services.product_events import broadcaster, deleted_event, notify_product_changes, product_event
+from services.cloudinary import public_id_from_url, schedule_image_deletion, upload_to_cloudinary
+
+T = TypeVar("T")
 
 router = APIRouter(
     prefix="/products",
@@ -26,49 +43,218 @@ router = APIRouter(
     responses={404: {"description": "Not found"}}
 )
 
+# Hot public reads go through single-flight groups (see core.single_flight)
+list_reads = SingleFlight("products.list")
+detail_reads = SingleFlight("products.detail")
+batch_reads = SingleFlight("products.batch")
+related_reads = SingleFlight("products.related")
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return (id is always included), e.g. name,price,image_url"
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def _parse_ids(ids: str) -> list[int]:
+    try:
+        product_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be comma-separated integers"
+        )
+    if not product_ids or len(product_ids) > MAX_BATCH_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 1 and {MAX_BATCH_IDS} ids"
+        )
+    return product_ids
+
+
+def _partial_response(content) -> Response:
+    """?fields= responses hold trimmed models, so skip response_model validation."""
+    return Response(content=to_json(content), media_type="application/json")
+
+
+def _in_session(fetch: Callable[[Session], T]) -> Callable[[], T]:
+    """fetch(db) with a session of its own, for reads run outside a request's dependencies."""
+    def run() -> T:
+        db = SessionLocal()
+        try:
+            return fetch(db)
+        finally:
+            db.close()
+    return run
+
+
+async def _coalesced(group: SingleFlight, key: Hashable, fetch: Callable[[Session], Optional[bytes]]) -> Optional[Response]:
+    """JSON body from fetch(db), shared with identical requests in flight on this worker."""
+    body = await group.run(key, _in_session(fetch))
+    return None if body is None else Response(content=body, media_type="application/json")
+
 # --------------------------------
 # Public Routes
 # --------------------------------
 
 @router.get("/", response_model=List[ProductResponse])
-def list_products(
+async def list_products(
     skip: int = Query(0, ge=0, description="Pagination offset"),
     limit: int = Query(100, le=500, description="Items per page"),
-    category: Optional[str] = Query(None, description="Filter by category"),
+    category: Optional[str] = Query(None, description="Filter by category name, including subcategories"),
+    category_id: Optional[int] = Query(None, description="Filter by category id, including subcategories"),
     min_price: Optional[float] = Query(None, ge=0, description="Minimum price"),
     max_price: Optional[float] = Query(None, ge=0, description="Maximum price"),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
     """
     List all products with optional filters:
     - Pagination (skip/limit)
-    - Category filter
+    - Category filter (a category and everything under it)
     - Price range
+    - Sparse fieldsets (only the requested columns are read)
     """
-    query = db.query(Product)
+    selected = _parse_fields(fields)
+    model = ProductResponse if selected is None else partial_product_response(selected)
+
+    def fetch(db: Session) -> bytes:
+        products = product_list_query(db, skip, limit, category, min_price, max_price, selected, category_id).all()
+        return to_json([model.model_validate(product) for product in products])
 
-    if category:
-        query = query.filter(Product.category.ilike(f"%{category}%"))
-    if min_price is not None:
-        query = query.filter(Product.price >= min_price)
-    if max_price is not None:
-        query = query.filter(Product.price <= max_price)
+    key = (skip, limit, category, category_id, min_price, max_price, selected)
+    return await _coalesced(list_reads, key, fetch)
 
-    return query.offset(skip).limit(limit).all()
+# Batch routes are declared before /{product_id} so "batch" isn't parsed as an id
+@router.get("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    ids: str = Query(..., description=f"Comma-separated product ids (max {MAX_BATCH_IDS})"),
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
+):
+    """
+    Fetch several products in one request and one query.
+    Products come back in the requested order; unknown ids are listed in `missing`.
+    """
+    product_ids = tuple(_parse_ids(ids))
+    selected = _parse_fields(fields)
+
+    def fetch(db: Session) -> bytes:
+        products, missing = load_products(db, list(product_ids), selected)
+        return to_json({"products": products, "missing": missing})
+
+    return await _coalesced(batch_reads, (product_ids, selected), fetch)
+
+@router.post("/batch", response_model=ProductBatchResponse)
+def post_products_batch(
+    request: ProductBatchRequest,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
+    """Same as GET /products/batch, for id lists too long for a URL"""
+    selected = _parse_fields(fields)
+    products, missing = load_products(db, request.ids, selected)
+    if selected is None:
+        return {"products": products, "missing": missing}
+    return _partial_response({"products": products, "missing": missing})
+
+def _sse(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + to_json(data) + b"\n\n"
+
+
+@router.get("/stream")
+async def stream_products(
+    ids: str = Query(..., description=f"Comma-separated product ids to watch (max {MAX_BATCH_IDS})")
+):
+    """
+    Server-Sent Events feed of changes to the given products, instead of polling.
+    Starts with a `product` event per existing product (`deleted` for unknown ids), then:
+    - **product**: id, name, price and image_url after an update or new image
+    - **deleted**: the product was removed
+    - **resync**: events may have been missed; refetch the products
+    A client that falls too far behind gets `resync` and is disconnected.
+    """
+    product_ids = list(dict.fromkeys(_parse_ids(ids)))
+    if not settings.PRODUCT_STREAM_ENABLED or len(broadcaster) >= settings.PRODUCT_STREAM_MAX_CONNECTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many product streams open, try again later",
+            headers={"Retry-After": "30"}
+        )
+
+    # Subscribe before the snapshot so no change can slip in between
+    subscriber = broadcaster.subscribe(product_ids)
+
+    async def events():
+        try:
+            yield b"retry: 5000\n\n"
+            products, missing = await to_thread.run_sync(
+                _in_session(lambda db: load_products(db, product_ids))
+            )
+            for product in products:
+                yield _sse("product", product_event(product))
+            for product_id in missing:
+                yield _sse("deleted", deleted_event(product_id))
+
+            while True:
+                batch = await subscriber.next_batch(settings.PRODUCT_STREAM_HEARTBEAT_SECONDS)
+                if subscriber.overflowed:
+                    yield _sse("resync", {})
+                    return
+                if not batch:
+                    yield b": ping\n\n"  # keeps proxies from closing an idle stream
+                    continue
+                yield b"".join(_sse(kind, event) for kind, event in batch)
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(
+async def get_product(
     product_id: int,
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION)
 ):
-    """Get detailed product information by ID"""
-    product = db.query(Product).filter(Product.id == product_id).first()
-    if not product:
+    """
+    Get detailed product information by ID. Concurrent requests for the
+    same product on a worker share one lookup.
+    """
+    selected = _parse_fields(fields)
+
+    def fetch(db: Session) -> Optional[bytes]:
+        products, _ = load_products(db, [product_id], selected)
+        return to_json(products[0]) if products else None
+
+    response = await _coalesced(detail_reads, (product_id, selected), fetch)
+    if response is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
-    return product
+    return response
+
+@router.get("/{product_id}/related", response_model=List[ProductResponse])
+async def get_related_products(
+    product_id: int,
+    limit: int = Query(10, ge=1, le=settings.RECOMMENDATIONS_TOP_K, description="Max products")
+):
+    """
+    Products most often bought together with this one, precomputed from
+    completed orders. Empty for unknown products or ones never ordered.
+    """
+    def fetch(db: Session) -> bytes:
+        products = related_products_query(db, product_id, limit).all()
+        return to_json([ProductResponse.model_validate(product) for product in products])
+
+    return await _coalesced(related_reads, (product_id, limit), fetch)
 
 # --------------------------------
 # Admin-Only Routes
@@ -91,7 +277,9 @@ def create_product(
             detail="Price must be positive"
         )
 
-    db_product = Product(**product.dict())
+    product_data = product.dict()
+    category = resolve_category(db, product_data.pop("category"))
+    db_product = Product(**product_data, category=category)
     db.add(db_product)
     db.commit()
     db.refresh(db_product)
@@ -117,10 +305,15 @@ def update_product(
             detail="Price must be positive"
         )
 
+    if 'category' in update_data:
+        update_data['category'] = resolve_category(db, update_data['category'])
+
     for field, value in update_data.items():
         setattr(db_product, field, value)
 
+    notify_product_changes(db, [product_event(db_product)])
     db.commit()
+    catalog_cache.invalidate(product_id)
     db.refresh(db_product)
     return db_product
 
@@ -135,11 +328,13 @@ def delete_product(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    # Handle image deletion
-    handle_product_image(product)
+    # Image is deleted by the outbox dispatcher once this commits
+    schedule_image_deletion(db, product)
 
     db.delete(product)
+    notify_product_changes(db, [deleted_event(product_id)])
     db.commit()
+    catalog_cache.invalidate(product_id)
     return None
 
 # --------------------------------
@@ -167,13 +362,17 @@ def upload_product_image(
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
-    # Delete old image using helper function
-    handle_product_image(product)
-
     # Upload new image
     image_url = upload_to_cloudinary(file, str(product_id))
+
+    # Uploads overwrite products/product_{id}; only an image stored under
+    # another public_id (e.g. an older naming scheme) needs deleting
+    if product.image_url is not None and public_id_from_url(str(product.image_url)) != public_id_from_url(image_url):
+        schedule_image_deletion(db, product)
     product.image_url.set(image_url) if hasattr(product.image_url, "set") else setattr(product, "image_url", image_url)
+    notify_product_changes(db, [product_event(product)])
     db.commit()
+    catalog_cache.invalidate(product_id)
 
     return {"image_url": image_url}
 
@@ -184,31 +383,41 @@ def upload_product_image(
 @router.post("/{product_id}/create-payment-intent", response_model=ProductWithPrice)
 def create_payment_intent(
     product_id: int,
-    db: Session = Depends(get_db)
+    coupon: Optional[str] = Query(None, max_length=64, description="Coupon code to apply"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
 ):
-    """Create Stripe PaymentIntent for checkout"""
+    """
+    Get the Stripe PaymentIntent for buying this product, at its price after
+    the best applicable promotion.
+    Retries reuse the user's open intent (no Stripe call); a price or
+    discount change updates its amount in place.
+    """
     product = db.query(Product).filter(Product.id == product_id).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
 
     try:
-        # Convert SQLAlchemy Column to Decimal for precise calculation
-        price = Decimal(str(product.price))
-        amount = int(price * 100)  # Convert to cents
-        
-        intent = stripe.PaymentIntent.create(
-            amount=amount,
-            currency="usd",
-            metadata={
-                "product_id": str(product.id),
-                "product_name": str(product.name)
-            }
+        amount, promotion_id = checkout_price(db, product, coupons=[coupon] if coupon else [])
+        line = CheckoutLine(product_id=product.id, quantity=1, unit_amount=amount)
+        metadata = {
+            "product_id": str(product.id),
+            "product_name": str(product.name)
+        }
+        if promotion_id is not None:
+            metadata["promotion_id"] = str(promotion_id)
+        intent = checkout_intent(
+            db,
+            user_id=current_user.id,
+            checkout_key=f"product:{product.id}",
+            lines=[line],
+            metadata=metadata
         )
         
         return {
             "product": product,
             "client_secret": intent.client_secret,
-            "amount": amount
+            "amount": intent.amount
         }
         
     except ValueError as e:
@@ -217,14 +426,18 @@ def create_payment_intent(
             detail=f"Invalid price format: {str(e)}"
         )
     except stripe.StripeError as e:
-        # Get HTTP status from Stripe error or default to 400
-        status_code = getattr(e, 'http_status', 400)
+        # Get HTTP status from Stripe error; connection errors and timeouts have none
+        status_code = getattr(e, 'http_status', None) or status.HTTP_502_BAD_GATEWAY
         # Get user message or fallback to error string
         error_message = getattr(e, 'user_message', str(e))
         raise HTTPException(
             status_code=status_code,
             detail=error_message
         )
+    except CircuitOpenError:
+        raise  # 503 with Retry-After (see main.py)
+    except CheckoutConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
         # Log unexpected errors but don't expose details to client
         logger.error(f"Unexpected error in payment processing: {str(e)}")
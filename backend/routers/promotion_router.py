@@ -0,0 +1,119 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Response
+from pydantic import ValidationError
+from pydantic_core import to_json
+from sqlalchemy.orm import Session
+from typing import List
+
+from dependencies import get_current_user, get_db, require_admin
+from models.category import Category
+from models.product import Product
+from models.promotion import Promotion
+from schemas.promotion import (
+    PromotionBase, PromotionCreate, PromotionResponse, PromotionUpdate, QuoteRequest, QuoteResponse
+)
+from services.pricing import quote_carts
+
+router = APIRouter(
+    prefix="/promotions",
+    tags=["Promotions"],
+    responses={404: {"description": "Not found"}}
+)
+
+
+def _check_rule(db: Session, rule: PromotionBase, promotion_id: int | None = None) -> None:
+    """400 for a scope that doesn't exist, 409 for a coupon code another promotion uses."""
+    if rule.product_id is not None and db.get(Product, rule.product_id) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Product not found")
+    if rule.category_id is not None and db.get(Category, rule.category_id) is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Category not found")
+    if rule.coupon_code is not None:
+        query = db.query(Promotion.id).filter(Promotion.coupon_code == rule.coupon_code)
+        if promotion_id is not None:
+            query = query.filter(Promotion.id != promotion_id)
+        if query.first() is not None:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Coupon code already in use")
+
+# --------------------------------
+# Customer Routes
+# --------------------------------
+
+@router.post("/quote", response_model=QuoteResponse, dependencies=[Depends(get_current_user)])
+def quote(request: QuoteRequest, db: Session = Depends(get_db)):
+    """
+    Price a batch of carts at current prices and promotions, in cents.
+    Each line gets its single best discount.
+    """
+    quotes, missing = quote_carts(
+        db,
+        [[(line.product_id, line.quantity) for line in cart.lines] for cart in request.carts],
+        [cart.coupon_codes for cart in request.carts],
+        include_lines=request.include_lines
+    )
+    return Response(content=to_json({"carts": quotes, "missing": missing}), media_type="application/json")
+
+# --------------------------------
+# Admin-Only Routes
+# --------------------------------
+
+@router.get("/", response_model=List[PromotionResponse], dependencies=[Depends(require_admin)])
+def list_promotions(db: Session = Depends(get_db)):
+    """All promotions, newest first, including inactive and expired ones (Admin only)"""
+    return db.query(Promotion).order_by(Promotion.id.desc()).all()
+
+@router.post(
+    "/",
+    response_model=PromotionResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(require_admin)]
+)
+def create_promotion(promotion: PromotionCreate, db: Session = Depends(get_db)):
+    """Create a promotion; it applies to new quotes and checkouts right away (Admin only)"""
+    _check_rule(db, promotion)
+    db_promotion = Promotion(**promotion.model_dump())
+    db.add(db_promotion)
+    db.commit()
+    db.refresh(db_promotion)
+    return db_promotion
+
+@router.patch(
+    "/{promotion_id}",
+    response_model=PromotionResponse,
+    dependencies=[Depends(require_admin)]
+)
+def update_promotion(promotion_id: int, promotion: PromotionUpdate, db: Session = Depends(get_db)):
+    """Change a promotion; send null to clear a scope, coupon or date (Admin only)"""
+    db_promotion = db.get(Promotion, promotion_id)
+    if not db_promotion:
+        raise HTTPException(status_code=404, detail="Promotion not found")
+
+    update_data = promotion.model_dump(exclude_unset=True)
+    # Validate the rule as it will be; switching between percent_off and amount_off clears the other
+    merged = {**PromotionResponse.model_validate(db_promotion).model_dump(), **update_data}
+    for field, other in (("percent_off", "amount_off"), ("amount_off", "percent_off")):
+        if update_data.get(field) is not None and other not in update_data:
+            merged[other] = None
+    try:
+        rule = PromotionBase.model_validate(merged)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False, include_input=False))
+    _check_rule(db, rule, promotion_id)
+
+    for field in PromotionBase.model_fields:
+        setattr(db_promotion, field, getattr(rule, field))
+    db.commit()
+    db.refresh(db_promotion)
+    return db_promotion
+
+@router.delete(
+    "/{promotion_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    dependencies=[Depends(require_admin)]
+)
+def delete_promotion(promotion_id: int, db: Session = Depends(get_db)):
+    """Delete a promotion; set active=false instead to keep it for later (Admin only)"""
+    db_promotion = db.get(Promotion, promotion_id)
+    if not db_promotion:
+        raise HTTPException(status_code=404, detail="Promotion not found")
+    db.delete(db_promotion)
+    db.commit()
+    return None
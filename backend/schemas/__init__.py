@@ -1,8 +1,17 @@
 # Import all schema models
-from .user import UserBase, UserCreate, UserLogin, UserResponse, UserRole
-from .product import ProductBase, ProductCreate, ProductResponse, ProductUpdate
+from .user import UserBase, UserCreate, UserLogin, UserResponse, UserRole, UserBulkCreate, UserBulkResult
+from .product import (
+    ProductBase, ProductCreate, ProductResponse, ProductUpdate, ProductBatchRequest, ProductBatchResponse,
+    ProductBulkFilter, ProductBulkUpdate, ProductBulkResult
+)
+from .category import CategoryBase, CategoryCreate, CategoryUpdate, CategoryResponse, CategoryNode, CategorySubtree
 from .cart import CartItemBase, CartItemCreate, CartItemResponse
 from .order import OrderBase, OrderCreate, OrderResponse, OrderItemBase, OrderItemCreate, OrderItemResponse
+from .analytics import AnalyticsGrouping, SalesRollup, SalesAnalytics
+from .promotion import (
+    PromotionBase, PromotionCreate, PromotionUpdate, PromotionResponse, QuoteLine, QuoteCart, QuoteRequest,
+    LineQuote, CartQuote, QuoteResponse
+)
 
 # Export all schemas
 __all__ = [
@@ -12,12 +21,27 @@ __all__ = [
     "UserLogin",
     "UserResponse",
     "UserRole",
+    "UserBulkCreate",
+    "UserBulkResult",
     
     # Product schemas
     "ProductBase",
     "ProductCreate",
     "ProductResponse",
     "ProductUpdate",
+    "ProductBatchRequest",
+    "ProductBatchResponse",
+    "ProductBulkFilter",
+    "ProductBulkUpdate",
+    "ProductBulkResult",
+
+    # Category schemas
+    "CategoryBase",
+    "CategoryCreate",
+    "CategoryUpdate",
+    "CategoryResponse",
+    "CategoryNode",
+    "CategorySubtree",
     
     # Cart schemas
     "CartItemBase",
@@ -30,5 +54,22 @@ __all__ = [
     "OrderResponse",
     "OrderItemBase",
     "OrderItemCreate",
-    "OrderItemResponse"
+    "OrderItemResponse",
+
+    # Analytics schemas
+    "AnalyticsGrouping",
+    "SalesRollup",
+    "SalesAnalytics",
+
+    # Promotion schemas
+    "PromotionBase",
+    "PromotionCreate",
+    "PromotionUpdate",
+    "PromotionResponse",
+    "QuoteLine",
+    "QuoteCart",
+    "QuoteRequest",
+    "LineQuote",
+    "CartQuote",
+    "QuoteResponse"
 ]
\ No newline at end of file
@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date
+from enum import Enum
+
+
+class AnalyticsGrouping(str, Enum):
+    day = "day"
+    category = "category"
+    product = "product"
+
+
+# analytics schemas
+class SalesRollup(BaseModel):
+    day: Optional[date] = None
+    category_id: Optional[int] = None
+    product_id: Optional[int] = None
+    name: Optional[str] = None
+    order_count: int
+    quantity: int
+    revenue: float
+
+
+class SalesAnalytics(BaseModel):
+    start: date
+    end: date
+    group_by: AnalyticsGrouping
+    rows: List[SalesRollup]
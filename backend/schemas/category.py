@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class CategoryBase(BaseModel):
+    name: str = Field(..., min_length=1)
+    description: Optional[str] = None
+
+class CategoryCreate(CategoryBase):
+    parent_id: Optional[int] = None  # None creates a top-level category
+
+class CategoryUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1)
+    description: Optional[str] = None
+    parent_id: Optional[int] = None  # moves the category with its subtree; send null for top level
+
+class CategoryResponse(CategoryBase):
+    id: int
+    parent_id: Optional[int] = None
+
+    model_config = {'from_attributes': True}
+
+class CategoryNode(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    children: List["CategoryNode"] = []
+
+class CategorySubtree(CategoryNode):
+    path: List[CategoryResponse] = []  # ancestors, top-level first
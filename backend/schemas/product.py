@@ -1,5 +1,15 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, create_model, field_validator, model_validator
+from functools import lru_cache
+from typing import List, Optional
+
+# most ids a single batch lookup accepts
+MAX_BATCH_IDS = 500
+# most ids a single bulk admin operation accepts
+MAX_BULK_IDS = 10_000
+
+def _category_name(cls, value):
+    """ORM rows carry a Category object; expose just its name."""
+    return getattr(value, "name", value)
 
 class ProductBase(BaseModel):
     name: str
@@ -22,6 +32,58 @@ class ProductResponse(ProductBase):
     
     model_config = {'from_attributes': True}
 
+    category_name = field_validator("category", mode="before")(_category_name)
+
+@lru_cache(maxsize=64)
+def partial_product_response(fields: tuple[str, ...]) -> type[BaseModel]:
+    """ProductResponse trimmed to `fields` (as returned by services.catalog.parse_fields)."""
+    return create_model(
+        "PartialProductResponse",
+        __config__={'from_attributes': True},
+        __validators__=(
+            {"category_name": field_validator("category", mode="before")(_category_name)}
+            if "category" in fields else {}
+        ),
+        **{name: (ProductResponse.model_fields[name].annotation, ProductResponse.model_fields[name]) for name in fields}
+    )
+
+class ProductBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
+
+class ProductBatchResponse(BaseModel):
+    products: List[ProductResponse]  # in requested order
+    missing: List[int] = []
+
+class ProductBulkFilter(BaseModel):
+    ids: Optional[List[int]] = Field(None, max_length=MAX_BULK_IDS)
+    category: Optional[str] = None  # exact category name
+    min_price: Optional[float] = Field(None, ge=0)
+    max_price: Optional[float] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def require_filter(self):
+        """Never touch the whole catalog by accident."""
+        if not self.ids and self.category is None and self.min_price is None and self.max_price is None:
+            raise ValueError("Select products with ids, category or a price range")
+        return self
+
+class ProductBulkUpdate(ProductBulkFilter):
+    price: Optional[float] = Field(None, gt=0)  # new absolute price
+    price_change_percent: Optional[float] = Field(None, gt=-100)  # e.g. -15 for 15% off
+    new_category: Optional[str] = None
+
+    @model_validator(mode="after")
+    def require_change(self):
+        if self.price is not None and self.price_change_percent is not None:
+            raise ValueError("Use either price or price_change_percent, not both")
+        if self.price is None and self.price_change_percent is None and self.new_category is None:
+            raise ValueError("Nothing to update")
+        return self
+
+class ProductBulkResult(BaseModel):
+    count: int
+    ids: List[int]
+
 class ProductWithPrice(BaseModel):
     product: ProductResponse
     client_secret: str
@@ -0,0 +1,101 @@
+from pydantic import BaseModel, Field, field_validator, model_validator
+from datetime import datetime
+from typing import List, Optional
+
+# most lines one cart may have in a quote
+MAX_CART_LINES = 1000
+# most carts, and lines across them, one quote request may price
+MAX_QUOTE_CARTS = 10_000
+MAX_QUOTE_LINES = 200_000
+
+def _upper(cls, value):
+    return value.strip().upper() if isinstance(value, str) else value
+
+class PromotionBase(BaseModel):
+    name: str = Field(..., min_length=1)
+    product_id: Optional[int] = None  # one product, or
+    category_id: Optional[int] = None  # a category and everything below it; neither = whole catalog
+    percent_off: Optional[float] = Field(None, gt=0, le=100)
+    amount_off: Optional[int] = Field(None, gt=0)  # cents off each unit
+    min_quantity: int = Field(1, ge=1)
+    coupon_code: Optional[str] = Field(None, min_length=1, max_length=64)  # only applies when presented
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    active: bool = True
+
+    coupon_upper = field_validator("coupon_code", mode="before")(_upper)
+
+    @model_validator(mode="after")
+    def check_rule(self):
+        if (self.percent_off is None) == (self.amount_off is None):
+            raise ValueError("Set exactly one of percent_off and amount_off")
+        if self.product_id is not None and self.category_id is not None:
+            raise ValueError("Scope a promotion to a product or a category, not both")
+        if self.starts_at and self.ends_at and self.ends_at <= self.starts_at:
+            raise ValueError("ends_at must be after starts_at")
+        return self
+
+class PromotionCreate(PromotionBase):
+    pass
+
+class PromotionUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1)
+    product_id: Optional[int] = None
+    category_id: Optional[int] = None
+    percent_off: Optional[float] = Field(None, gt=0, le=100)
+    amount_off: Optional[int] = Field(None, gt=0)
+    min_quantity: Optional[int] = Field(None, ge=1)
+    coupon_code: Optional[str] = Field(None, min_length=1, max_length=64)
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    active: Optional[bool] = None
+
+    coupon_upper = field_validator("coupon_code", mode="before")(_upper)
+
+class PromotionResponse(PromotionBase):
+    id: int
+    created_at: Optional[datetime] = None
+
+    model_config = {'from_attributes': True}
+
+class QuoteLine(BaseModel):
+    product_id: int
+    quantity: int = Field(..., ge=1, le=1_000_000)
+
+class QuoteCart(BaseModel):
+    lines: List[QuoteLine] = Field(..., min_length=1, max_length=MAX_CART_LINES)
+    coupon_codes: List[str] = Field([], max_length=10)
+
+    @field_validator("coupon_codes", mode="before")
+    @classmethod
+    def upper_codes(cls, value):
+        return [_upper(cls, code) for code in value] if isinstance(value, list) else value
+
+class QuoteRequest(BaseModel):
+    carts: List[QuoteCart] = Field(..., min_length=1, max_length=MAX_QUOTE_CARTS)
+    include_lines: bool = False  # per-line breakdown; totals only by default
+
+    @model_validator(mode="after")
+    def limit_lines(self):
+        if sum(len(cart.lines) for cart in self.carts) > MAX_QUOTE_LINES:
+            raise ValueError(f"At most {MAX_QUOTE_LINES} lines per quote")
+        return self
+
+class LineQuote(BaseModel):
+    product_id: int
+    quantity: int
+    unit_amount: int  # all amounts in cents
+    subtotal: int
+    discount: int
+    total: int
+    promotion_id: Optional[int] = None
+
+class CartQuote(BaseModel):
+    subtotal: int
+    discount: int
+    total: int
+    lines: Optional[List[LineQuote]] = None
+
+class QuoteResponse(BaseModel):
+    carts: List[CartQuote]  # same order as the request
+    missing: List[int] = []  # unknown product ids; their lines are left out
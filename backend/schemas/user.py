@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from enum import Enum
 
@@ -32,4 +32,22 @@ class UserResponse(UserBase):
     role: UserRole
     created_at: datetime
     
-    model_config = {'from_attributes': True}
\ No newline at end of file
+    model_config = {'from_attributes': True}
+
+
+# bulk provisioning: each account costs one bcrypt hash (~0.25s at the default
+# cost), so a request takes about MAX_BULK_USERS x hash time / HASH_WORKERS;
+# 200 keeps that under a minute even on a single core. Send larger files in chunks
+MAX_BULK_USERS = 200
+
+
+class UserBulkCreate(BaseModel):
+    users: list[UserCreate] = Field(..., min_length=1, max_length=MAX_BULK_USERS)
+
+
+class UserBulkResult(BaseModel):
+    created: int
+    skipped: list[str] = Field(
+        default_factory=list,
+        description="Usernames not created: username or email already registered, or repeated in the request"
+    )
@@ -0,0 +1,4 @@
+"""
+Operational commands. Run from the backend directory, e.g.
+`python -m scripts.generate_dataset --preset small`.
+"""
@@ -0,0 +1,38 @@
+# backend/scripts/build_recommendations.py
+"""
+Build the "frequently bought together" tables from completed orders.
+
+    python -m scripts.build_recommendations                # full rebuild
+    python -m scripts.build_recommendations --incremental  # only orders since the last run
+
+The app refreshes incrementally on its own (refresh_related_products job);
+run a full rebuild after bulk loads such as scripts.generate_dataset.
+"""
+import argparse
+import time
+
+from database import Base, SessionLocal, engine
+from services.recommendations import rebuild_related_products, refresh_related_products
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m scripts.build_recommendations", description=__doc__.splitlines()[1])
+    parser.add_argument("--incremental", action="store_true", help="fold in new orders instead of rebuilding")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        if args.incremental:
+            touched = refresh_related_products(db)
+            print(f"Re-ranked {touched} products in {time.perf_counter() - started:.1f}s")
+        else:
+            pairs = rebuild_related_products(db)
+            print(f"Stored {pairs} product pairs in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
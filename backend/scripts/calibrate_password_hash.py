@@ -0,0 +1,74 @@
+# backend/scripts/calibrate_password_hash.py
+"""
+Pick the bcrypt cost (BCRYPT_ROUNDS) that fits a login latency budget on this host.
+
+    python -m scripts.calibrate_password_hash                     # 250 ms budget
+    python -m scripts.calibrate_password_hash --target-ms 400 --concurrency 4
+
+Times bcrypt at increasing rounds (each round doubles the work) and prints
+the highest cost whose median hash time stays within --target-ms while
+--concurrency hashes run at once, as logins on a busy pod would. Run it on
+the smallest machine type that serves logins and set the result for every
+instance: hashes with another cost are rehashed at the next login, so
+instances configured differently would keep rehashing each other's users.
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+MAX_ROUNDS = 20
+
+
+def hash_time(rounds: int, concurrency: int, samples: int) -> float:
+    """Median seconds per hash at `rounds` with `concurrency` hashes in flight."""
+    password = b"calibration-password"
+
+    def timed(_) -> float:
+        started = time.perf_counter()
+        bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+        return time.perf_counter() - started
+
+    # bcrypt releases the GIL, so threads contend for CPU like separate workers
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return statistics.median(executor.map(timed, range(samples * concurrency)))
+
+
+def calibrate(target: float, concurrency: int, samples: int, min_rounds: int) -> tuple[int, dict[int, float]]:
+    """(chosen rounds, {rounds: seconds measured}); never below min_rounds."""
+    timings = {}
+    chosen = min_rounds
+    for rounds in range(4, MAX_ROUNDS + 1):
+        seconds = hash_time(rounds, concurrency, samples)
+        timings[rounds] = seconds
+        if seconds <= target:
+            chosen = max(chosen, rounds)
+        if rounds >= min_rounds and seconds * 2 > target:
+            # The next cost takes twice as long; no need to measure it
+            break
+    return chosen, timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m scripts.calibrate_password_hash", description=__doc__.splitlines()[1])
+    parser.add_argument("--target-ms", type=float, default=250, help="latency budget for one password hash")
+    parser.add_argument("--concurrency", type=int, default=1, help="hashes running at once (concurrent logins per instance)")
+    parser.add_argument("--samples", type=int, default=5, help="hashes timed per thread at each cost")
+    parser.add_argument("--min-rounds", type=int, default=10, help="never recommend less than this")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, concurrency {args.concurrency}, budget {args.target_ms:.0f} ms")
+    chosen, timings = calibrate(args.target_ms / 1000, args.concurrency, args.samples, args.min_rounds)
+    for rounds, seconds in timings.items():
+        marker = "  <-" if rounds == chosen else ""
+        print(f"  rounds {rounds:>2}: {seconds * 1000:8.1f} ms{marker}")
+    if timings[chosen] > args.target_ms / 1000:
+        print(f"Even {args.min_rounds} rounds exceed the budget here; raise --target-ms or use a bigger machine")
+    print(f"BCRYPT_ROUNDS={chosen}")
+
+
+if __name__ == "__main__":
+    main()
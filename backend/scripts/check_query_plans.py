@@ -0,0 +1,148 @@
+# backend/scripts/check_query_plans.py
+"""
+Query-plan regression checks for catalog, auth, order and cart queries.
+
+    python -m scripts.check_query_plans                   # against the current DB
+    python -m scripts.check_query_plans --seed small      # generate a dataset first
+
+Each check EXPLAINs (FORMAT JSON) the SQL produced by the same query
+builders the endpoints use and asserts that the expected indexes are
+used, that large tables are never sequentially scanned and that the
+planner's total cost stays under a ceiling. Ceilings are calibrated for
+the `small` preset of scripts.generate_dataset; scale them with
+--cost-scale for bigger datasets. Exits 1 on any failure, for CI.
+"""
+import argparse
+import json
+import sys
+from dataclasses import dataclass, field
+from typing import Callable
+
+from sqlalchemy import text
+from sqlalchemy.orm import Query, Session
+
+from database import SessionLocal, engine
+from models.user import User
+from services.catalog import product_list_query, products_by_ids_query, related_products_query
+from services.orders import cart_items_query, order_history_query, order_items_query
+from services.users import user_conflict_query
+
+# Tables that must never be read with a full sequential scan
+LARGE_TABLES = {"users", "products", "orders", "order_items", "cart_items", "related_products"}
+# Anything smaller than this isn't worth checking plans against
+MIN_PRODUCTS = 10_000
+
+
+@dataclass
+class PlanCheck:
+    name: str
+    build: Callable[[Session], Query]
+    indexed: set[str] = field(default_factory=set)  # relations that must be read via an index
+    max_cost: float = 1_000
+
+
+def plan_nodes(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(db: Session, query: Query) -> dict:
+    compiled = query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    row = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar_one()
+    plan = row if isinstance(row, list) else json.loads(row)
+    return plan[0]["Plan"]
+
+
+def evaluate(plan: dict, check: PlanCheck, cost_scale: float) -> list[str]:
+    problems = []
+    nodes = list(plan_nodes(plan))
+
+    for node in nodes:
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+            problems.append(f"sequential scan on {node['Relation Name']}")
+
+    for relation in check.indexed:
+        if not any(
+            node.get("Relation Name") == relation
+            and node["Node Type"] in ("Index Scan", "Index Only Scan", "Bitmap Heap Scan")
+            for node in nodes
+        ):
+            problems.append(f"{relation} not read via an index")
+
+    ceiling = check.max_cost * cost_scale
+    if plan["Total Cost"] > ceiling:
+        problems.append(f"cost {plan['Total Cost']:.0f} > ceiling {ceiling:.0f}")
+    return problems
+
+
+CHECKS = [
+    PlanCheck("list_products: first page",
+              lambda db: product_list_query(db, 0, 100), {"products"}, 50),
+    PlanCheck("list_products: deep page",
+              lambda db: product_list_query(db, 5_000, 100), {"products"}, 1_000),
+    PlanCheck("list_products: category filter",
+              lambda db: product_list_query(db, 0, 100, category="Electronics"), {"products"}, 2_500),
+    PlanCheck("list_products: category subtree",
+              lambda db: product_list_query(db, 0, 100, category_id=1), {"products", "category_closure"}, 2_500),
+    PlanCheck("list_products: price range",
+              lambda db: product_list_query(db, 0, 100, min_price=100, max_price=120), {"products"}, 2_500),
+    PlanCheck("get_product",
+              lambda db: products_by_ids_query(db, [1234]), {"products"}, 20),
+    PlanCheck("products: batch of 100",
+              lambda db: products_by_ids_query(db, list(range(1_000, 100_000, 990))), {"products"}, 600),
+    PlanCheck("related_products",
+              lambda db: related_products_query(db, 1234, 10), {"related_products", "products"}, 100),
+    PlanCheck("auth: user by username",
+              lambda db: db.query(User).filter(User.username == "user1234").limit(1), {"users"}, 10),
+    PlanCheck("auth: user by email",
+              lambda db: db.query(User).filter(User.email == "user1234@example.com").limit(1), {"users"}, 10),
+    PlanCheck("register: username/email conflict",
+              lambda db: user_conflict_query(db, "User1234", "USER1234@example.com"), {"users"}, 10),
+    PlanCheck("orders: history for user",
+              lambda db: order_history_query(db, user_id=1), {"orders"}, 200),
+    PlanCheck("orders: items for order",
+              lambda db: order_items_query(db, order_id=1234), {"order_items"}, 50),
+    PlanCheck("cart: items for user",
+              lambda db: cart_items_query(db, user_id=1), {"cart_items"}, 50),
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m scripts.check_query_plans", description=__doc__.splitlines()[1])
+    parser.add_argument("--seed", metavar="PRESET", help="generate this dataset preset (truncating tables) first")
+    parser.add_argument("--cost-scale", type=float, default=1.0, help="multiply every cost ceiling")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the plan of failing checks")
+    args = parser.parse_args()
+
+    if args.seed:
+        from scripts.generate_dataset import PRESETS, load
+        from datetime import datetime, timezone
+        load(PRESETS[args.seed], seed=42, anchor=datetime.now(timezone.utc), truncate=True)
+
+    db = SessionLocal()
+    failures = 0
+    try:
+        products = db.execute(text("SELECT count(*) FROM products")).scalar_one()
+        if products < MIN_PRODUCTS:
+            print(f"Only {products} products; run with --seed small (or larger) first")
+            return 1
+
+        for check in CHECKS:
+            plan = explain(db, check.build(db))
+            problems = evaluate(plan, check, args.cost_scale)
+            status = "FAIL" if problems else "ok"
+            print(f"[{status:>4}] {check.name:<36} cost={plan['Total Cost']:>10.1f}  {'; '.join(problems)}")
+            if problems:
+                failures += 1
+                if args.verbose:
+                    print(json.dumps(plan, indent=2))
+    finally:
+        db.close()
+
+    print(f"\n{len(CHECKS) - failures}/{len(CHECKS)} plan checks passed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+# backend/scripts/generate_dataset.py
+"""
+Populate the database with a large, skewed, reproducible dataset.
+
+    python -m scripts.generate_dataset --preset small --truncate
+    python -m scripts.generate_dataset --preset large --seed 7 --truncate
+
+Rows are streamed into Postgres with COPY in fixed-size chunks, so memory
+stays flat regardless of preset. Popularity follows Zipf-like curves: a
+few categories hold most products, a few products appear in most orders
+and a small share of users place most orders. The same seed always
+produces the same rows (timestamps are relative to --anchor).
+"""
+import argparse
+import io
+import itertools
+import random
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+
+from core.auth import get_password_hash
+from database import Base, SessionLocal, engine
+from services.categories import rebuild_closure
+
+CHUNK_ROWS = 100_000
+DEFAULT_PASSWORD = "password123"
+
+ADJECTIVES = (
+    "Classic", "Compact", "Deluxe", "Eco", "Essential", "Premium", "Portable", "Pro",
+    "Rugged", "Smart", "Sleek", "Ultra", "Vintage", "Wireless", "Organic", "Modular",
+)
+NOUNS = (
+    "Backpack", "Blender", "Camera", "Chair", "Desk Lamp", "Headphones", "Jacket", "Kettle",
+    "Keyboard", "Mug", "Monitor", "Notebook", "Sneakers", "Speaker", "Tent", "Watch",
+)
+CATEGORY_ROOTS = (
+    "Electronics", "Home", "Kitchen", "Outdoors", "Fashion", "Office", "Sports", "Toys",
+    "Beauty", "Books", "Garden", "Automotive", "Health", "Pets", "Music", "Grocery",
+)
+
+
+@dataclass(frozen=True)
+class Preset:
+    users: int
+    categories: int
+    products: int
+    orders: int
+    cart_items: int
+
+
+PRESETS = {
+    "small": Preset(users=10_000, categories=50, products=20_000, orders=100_000, cart_items=20_000),
+    "medium": Preset(users=200_000, categories=200, products=200_000, orders=1_000_000, cart_items=200_000),
+    "large": Preset(users=1_000_000, categories=500, products=1_000_000, orders=10_000_000, cart_items=1_000_000),
+}
+
+TABLES = ("cart_items", "order_items", "orders", "products", "categories", "users")
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def zipf_cum_weights(n: int, s: float) -> list[float]:
+    """Cumulative weights for ranks 1..n with P(rank) ~ 1/rank^s (for random.choices)."""
+    return list(itertools.accumulate(1 / rank ** s for rank in range(1, n + 1)))
+
+
+def skewed_ids(rng: random.Random, n: int, cum_weights: list[float], k: int) -> list[int]:
+    """k ids in 1..n drawn with Zipf skew (id 1 is the most popular)."""
+    return [i + 1 for i in rng.choices(range(n), cum_weights=cum_weights, k=k)]
+
+
+def timestamp(anchor: datetime, rng: random.Random, days: int) -> str:
+    """A time within `days` before the anchor, biased towards recent (growing traffic)."""
+    offset = days * 86400 * (1 - rng.random() ** 0.5)
+    return (anchor - timedelta(seconds=offset)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def copy_rows(cursor, table: str, columns: tuple[str, ...], rows: Iterable[tuple]) -> int:
+    """Stream rows into `table` with COPY (text format), CHUNK_ROWS at a time."""
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    total = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, CHUNK_ROWS))
+        if not chunk:
+            return total
+        buffer = io.StringIO()
+        buffer.writelines(
+            "\t".join("\\N" if value is None else str(value) for value in row) + "\n"
+            for row in chunk
+        )
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+        total += len(chunk)
+
+
+# -----------------------------
+# Row Generators
+# -----------------------------
+
+def gen_users(preset: Preset, seed: int, anchor: datetime):
+    rng = random.Random(f"{seed}:users")
+    hashed = get_password_hash(DEFAULT_PASSWORD)  # hashing millions of passwords would take days
+    for user_id in range(1, preset.users + 1):
+        roll = rng.random()
+        role = "admin" if user_id == 1 else "editor" if roll < 0.001 else "user"
+        yield (
+            user_id,
+            f"user{user_id}@example.com",
+            f"user{user_id}",
+            hashed,
+            role,
+            timestamp(anchor, rng, 3 * 365),
+        )
+
+
+def gen_categories(preset: Preset, seed: int):
+    """The CATEGORY_ROOTS at the top level, every other category under its root."""
+    for category_id in range(1, preset.categories + 1):
+        root_id = (category_id - 1) % len(CATEGORY_ROOTS) + 1
+        root = CATEGORY_ROOTS[root_id - 1]
+        is_root = category_id <= len(CATEGORY_ROOTS)
+        name = root if is_root else f"{root} {category_id}"
+        yield (category_id, name, f"All things {name.lower()}", None if is_root else root_id)
+
+
+def gen_products(preset: Preset, seed: int):
+    rng = random.Random(f"{seed}:products")
+    category_weights = zipf_cum_weights(preset.categories, 1.0)
+    category_ids = iter(())
+    for product_id in range(1, preset.products + 1):
+        if product_id % CHUNK_ROWS == 1:
+            category_ids = iter(skewed_ids(rng, preset.categories, category_weights, CHUNK_ROWS))
+        name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {product_id}"
+        description = None if rng.random() < 0.05 else (
+            f"{name} built to last. " * rng.randint(1, 40)
+        ).strip()
+        image_url = None if rng.random() < 0.1 else (
+            f"https://res.cloudinary.com/demo/image/upload/v1/products/product_{product_id}.jpg"
+        )
+        yield (
+            product_id,
+            name,
+            description,
+            round(min(rng.lognormvariate(3.3, 1.0), 5000) + 0.99, 2),
+            image_url,
+            next(category_ids),
+        )
+
+
+def product_prices(preset: Preset, seed: int) -> list[float]:
+    """Re-derive product prices (index = product id) without holding whole rows."""
+    return [0.0] + [row[3] for row in gen_products(preset, seed)]
+
+
+def gen_orders_and_items(preset: Preset, seed: int, anchor: datetime, prices: list[float]):
+    """Yields ('orders', row) and ('order_items', row) so totals match their items."""
+    rng = random.Random(f"{seed}:orders")
+    user_weights = zipf_cum_weights(preset.users, 0.8)
+    product_weights = zipf_cum_weights(preset.products, 1.1)
+    item_counts = (1, 2, 3, 4, 5, 6, 8)
+    item_count_weights = (35, 25, 15, 10, 7, 5, 3)
+
+    item_id = itertools.count(1)
+    order_id = 0
+    while order_id < preset.orders:
+        batch = min(CHUNK_ROWS, preset.orders - order_id)
+        users = skewed_ids(rng, preset.users, user_weights, batch)
+        counts = rng.choices(item_counts, weights=item_count_weights, k=batch)
+        products = iter(skewed_ids(rng, preset.products, product_weights, sum(counts)))
+        for user_id, count in zip(users, counts):
+            order_id += 1
+            total = 0.0
+            for product_id in {next(products) for _ in range(count)}:
+                quantity = 1 if rng.random() < 0.8 else rng.randint(2, 5)
+                price = prices[product_id]
+                total += price * quantity
+                yield "order_items", (next(item_id), order_id, product_id, quantity, price)
+            roll = rng.random()
+            status = "completed" if roll < 0.85 else "cancelled" if roll < 0.95 else "pending"
+            yield "orders", (order_id, user_id, status, round(total, 2), timestamp(anchor, rng, 2 * 365))
+
+
+def gen_cart_items(preset: Preset, seed: int, anchor: datetime):
+    rng = random.Random(f"{seed}:cart_items")
+    product_weights = zipf_cum_weights(preset.products, 1.1)
+    users = rng.sample(range(1, preset.users + 1), k=min(preset.users, max(preset.cart_items // 3, 1)))
+    products = skewed_ids(rng, preset.products, product_weights, preset.cart_items)
+    for cart_item_id, product_id in enumerate(products, start=1):
+        yield (cart_item_id, rng.choice(users), product_id, rng.randint(1, 3), timestamp(anchor, rng, 90))
+
+
+# -----------------------------
+# Loader
+# -----------------------------
+
+def load(preset: Preset, seed: int, anchor: datetime, truncate: bool) -> None:
+    Base.metadata.create_all(bind=engine)
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if truncate:
+            cursor.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+        else:
+            for table in TABLES:
+                cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table})")
+                if cursor.fetchone()[0]:
+                    sys.exit(f"Table '{table}' is not empty; rerun with --truncate")
+
+        def step(label: str, fn) -> None:
+            started = time.perf_counter()
+            count = fn()
+            print(f"{label:<14}{count:>12,} rows  {time.perf_counter() - started:7.1f}s")
+
+        step("users", lambda: copy_rows(
+            cursor, "users", ("id", "email", "username", "hashed_password", "role", "created_at"),
+            gen_users(preset, seed, anchor)
+        ))
+        step("categories", lambda: copy_rows(
+            cursor, "categories", ("id", "name", "description", "parent_id"), gen_categories(preset, seed)
+        ))
+        step("products", lambda: copy_rows(
+            cursor, "products", ("id", "name", "description", "price", "image_url", "category_id"),
+            gen_products(preset, seed)
+        ))
+
+        # Orders and their items come from one generator; split them into two COPY streams
+        # by buffering items per chunk of orders.
+        prices = product_prices(preset, seed)
+        orders_rows: list[tuple] = []
+        item_rows: list[tuple] = []
+        counts = {"orders": 0, "order_items": 0}
+        started = time.perf_counter()
+        for table, row in gen_orders_and_items(preset, seed, anchor, prices):
+            (orders_rows if table == "orders" else item_rows).append(row)
+            if len(orders_rows) >= CHUNK_ROWS:
+                counts["orders"] += copy_rows(cursor, "orders", ("id", "user_id", "status", "total_price", "created_at"), orders_rows)
+                counts["order_items"] += copy_rows(cursor, "order_items", ("id", "order_id", "product_id", "quantity", "price"), item_rows)
+                orders_rows, item_rows = [], []
+        counts["orders"] += copy_rows(cursor, "orders", ("id", "user_id", "status", "total_price", "created_at"), orders_rows)
+        counts["order_items"] += copy_rows(cursor, "order_items", ("id", "order_id", "product_id", "quantity", "price"), item_rows)
+        elapsed = time.perf_counter() - started
+        print(f"{'orders':<14}{counts['orders']:>12,} rows  {elapsed:7.1f}s")
+        print(f"{'order_items':<14}{counts['order_items']:>12,} rows  (with orders)")
+
+        step("cart_items", lambda: copy_rows(
+            cursor, "cart_items", ("id", "user_id", "product_id", "quantity", "updated_at"),
+            gen_cart_items(preset, seed, anchor)
+        ))
+
+        # Explicit ids were copied in, so move each serial sequence past them
+        for table in TABLES:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            )
+        raw.commit()
+
+        # COPY bypassed the ORM hooks that maintain the category closure table
+        db = SessionLocal()
+        try:
+            step("closure", lambda: rebuild_closure(db))
+        finally:
+            db.close()
+
+        started = time.perf_counter()
+        raw.autocommit = True
+        cursor.execute("ANALYZE")
+        print(f"{'analyze':<14}{'':>12}       {time.perf_counter() - started:7.1f}s")
+    finally:
+        raw.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m scripts.generate_dataset", description="Generate a benchmark dataset")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=date.today(),
+                        help="newest timestamp in the data (YYYY-MM-DD, default today)")
+    parser.add_argument("--truncate", action="store_true", help="empty the tables first")
+    for field in Preset.__dataclass_fields__:
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, help=f"override the preset's {field}")
+    args = parser.parse_args()
+
+    preset = PRESETS[args.preset]
+    overrides = {field: getattr(args, field) for field in Preset.__dataclass_fields__ if getattr(args, field)}
+    preset = Preset(**{**preset.__dict__, **overrides})
+    anchor = datetime.combine(args.anchor, datetime.min.time(), tzinfo=timezone.utc)
+
+    print(f"Generating {args.preset} dataset (seed {args.seed}): {preset}")
+    load(preset, args.seed, anchor, args.truncate)
+
+
+if __name__ == "__main__":
+    main()
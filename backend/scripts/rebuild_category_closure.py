@@ -0,0 +1,32 @@
+# backend/scripts/rebuild_category_closure.py
+"""
+Recompute the category closure table from categories.parent_id.
+
+    python -m scripts.rebuild_category_closure
+
+Needed once when upgrading a database whose categories predate the tree,
+and after any load that writes categories without the ORM.
+"""
+import argparse
+import time
+
+from database import Base, SessionLocal, engine
+from services.categories import rebuild_closure
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m scripts.rebuild_category_closure", description=__doc__.splitlines()[1])
+    parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rows = rebuild_closure(db)
+        print(f"Category closure rebuilt ({rows} rows) in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
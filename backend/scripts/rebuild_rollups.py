@@ -0,0 +1,32 @@
+# backend/scripts/rebuild_rollups.py
+"""
+Recompute the sales rollup tables from completed orders.
+
+    python -m scripts.rebuild_rollups                    # everything
+    python -m scripts.rebuild_rollups --since 2025-01-01 # backfill from a day on
+"""
+import argparse
+import time
+from datetime import date
+
+from database import Base, SessionLocal, engine
+from services.analytics import rebuild_rollups
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m scripts.rebuild_rollups", description=__doc__.splitlines()[1])
+    parser.add_argument("--since", type=date.fromisoformat, help="only rebuild days on/after this date")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        rebuild_rollups(db, since=args.since)
+        print(f"Rollups rebuilt in {time.perf_counter() - started:.1f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# backend/serve.py
+"""
+Production launcher.
+
+    python -m serve                       # workers sized automatically
+    python -m serve --workers 4 --port 8080
+
+Runs uvicorn with uvloop and httptools. The worker count is the CPU count
+capped so that workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW + 1 LISTEN
+connection for /products/stream) stays within the Postgres connection
+budget (max_connections minus superuser-reserved slots, read from the
+server unless DB_MAX_CONNECTIONS is set, minus --db-reserved for
+migrations, psql and cron scripts).
+
+With more than one worker, each exits after --max-requests requests (plus
+a random 0..--max-requests-jitter, so workers don't all recycle at once)
+and uvicorn's supervisor starts a replacement, which bounds slow leaks. A
+single worker runs without a supervisor, so recycling is turned off there
+rather than letting the process exit for good. On SIGTERM uvicorn stops accepting
+connections, waits up to --graceful-timeout seconds for in-flight requests,
+then runs main.lifespan's shutdown, which stops the scheduler and disposes
+the connection pool.
+"""
+import argparse
+import importlib.util
+import logging
+import os
+import random
+import sys
+
+import uvicorn
+from sqlalchemy import text
+from uvicorn.main import STARTUP_FAILURE
+from uvicorn.supervisors import Multiprocess
+
+logger = logging.getLogger("serve")
+
+
+def cpu_count() -> int:
+    """CPUs this process may run on (respects affinity / container cpusets)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def connection_budget(reserved: int) -> int:
+    """Connections the app may open in total, from DB_MAX_CONNECTIONS or the server itself."""
+    configured = os.getenv("DB_MAX_CONNECTIONS")
+    if configured:
+        return int(configured) - reserved
+
+    from database import engine
+    try:
+        with engine.connect() as conn:
+            available = conn.execute(text(
+                "SELECT current_setting('max_connections')::int"
+                " - current_setting('superuser_reserved_connections')::int"
+            )).scalar_one()
+    finally:
+        # Don't carry an open pool into the supervisor
+        engine.dispose()
+    return available - reserved
+
+
+class RecyclingConfig(uvicorn.Config):
+    """uvicorn config whose recycle count gets its own jitter in each worker process."""
+
+    def __init__(self, *args, max_requests_jitter: int = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_requests_jitter = max_requests_jitter
+
+    def load(self) -> None:
+        # load() runs in the worker (and again in every replacement), never in the supervisor
+        if self.limit_max_requests and self.max_requests_jitter:
+            self.limit_max_requests += random.randint(0, self.max_requests_jitter)
+        super().load()
+
+
+def size_workers(cpus: int, budget: int, per_worker: int) -> int:
+    """min(CPU count, workers whose pools fit the budget); raises if not even one fits."""
+    by_db = budget // per_worker
+    if by_db < 1:
+        raise SystemExit(
+            f"A worker needs up to {per_worker} connections but the budget is {budget}; "
+            "lower DB_POOL_SIZE/DB_MAX_OVERFLOW or --db-reserved"
+        )
+    return max(1, min(cpus, by_db))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m serve", description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")),
+                        help="worker processes (default: sized from CPUs and the DB budget)")
+    parser.add_argument("--db-reserved", type=int, default=int(os.getenv("DB_RESERVED_CONNECTIONS", "10")),
+                        help="connections left free for non-app clients")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("MAX_REQUESTS", "10000")),
+                        help="recycle a worker after this many requests (0 = never; needs 2+ workers)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("MAX_REQUESTS_JITTER", "1000")),
+                        help="add up to this many requests to each worker's recycle count")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="seconds to drain in-flight requests on shutdown")
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:     %(message)s")
+
+    from database import DB_MAX_OVERFLOW, DB_POOL_SIZE
+    # +1: each worker's LISTEN connection for /products/stream
+    per_worker = DB_POOL_SIZE + DB_MAX_OVERFLOW + 1
+    budget = connection_budget(args.db_reserved)
+    workers = args.workers or size_workers(cpu_count(), budget, per_worker)
+    if workers * per_worker > budget:
+        logger.warning(
+            f"{workers} workers x {per_worker} connections exceeds the budget of {budget}; "
+            "requests may fail with 'too many connections'"
+        )
+    logger.info(
+        f"Starting {workers} workers ({cpu_count()} CPUs, {per_worker} connections each, budget {budget})"
+    )
+
+    max_requests = args.max_requests or None
+    if max_requests and workers == 1:
+        # limit_max_requests only restarts workers under the multiprocess supervisor;
+        # a lone worker would just exit and take the service down
+        logger.warning("--max-requests is ignored with a single worker")
+        max_requests = None
+
+    # uvloop/httptools are in requirements.txt but uvloop has no Windows build
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    config = RecyclingConfig(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http="httptools",
+        limit_max_requests=max_requests,
+        max_requests_jitter=args.max_requests_jitter,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=True,
+        log_level=args.log_level,
+    )
+    server = uvicorn.Server(config)
+    # What uvicorn.run does, with our config class
+    try:
+        if workers > 1:
+            Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+        else:
+            server.run()
+    except KeyboardInterrupt:
+        pass
+    if not server.started and workers == 1:
+        sys.exit(STARTUP_FAILURE)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,3 @@
-from .cloudinary import upload_to_cloudinary, delete_from_cloudinary
+from .cloudinary import upload_to_cloudinary, delete_from_cloudinary, schedule_image_deletion
 
-__all__ = ["upload_to_cloudinary", "delete_from_cloudinary"]
\ No newline at end of file
+__all__ = ["upload_to_cloudinary", "delete_from_cloudinary", "schedule_image_deletion"]
\ No newline at end of file
@@ -0,0 +1,129 @@
+# backend/services/analytics.py
+"""
+Incrementally maintained sales rollups.
+
+When an Order becomes completed on any code path that flushes it through
+the ORM, it is stamped with completed_at and, in the same transaction,
+its items are added to the daily rollup tables with INSERT ... SELECT ...
+ON CONFLICT DO UPDATE. Reports read only the rollups, so their cost grows
+with the number of days rather than orders. rebuild_rollups() recomputes
+them from the orders table for backfills (e.g. after bulk imports, which
+bypass the ORM).
+
+An order's items are folded in once, when it completes, so they are frozen
+from then on: adding, changing or deleting an OrderItem of an order that
+already has completed_at fails the flush with ValueError. Corrections go
+through a new order (or a direct SQL fix followed by rebuild_rollups()).
+"""
+import itertools
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Date, cast, delete, distinct, event, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from models.analytics import DailyCategoryRevenue, DailyProductSales, DailySales
+from models.order import Order, OrderItem, OrderStatus
+from models.product import Product
+
+_COMPLETED_KEY = "analytics.completed_orders"
+_MEASURES = ["order_count", "quantity", "revenue"]
+_KEYS = {
+    DailySales: ["day"],
+    DailyProductSales: ["day", "product_id"],
+    DailyCategoryRevenue: ["day", "category_id"],
+}
+
+
+def _rollup_selects(condition) -> dict:
+    """Aggregates for the orders matching `condition`, one SELECT per rollup table."""
+    day = cast(func.coalesce(Order.completed_at, Order.created_at), Date)
+    category_id = func.coalesce(Product.category_id, 0)
+    measures = (
+        func.count(distinct(Order.id)),
+        func.coalesce(func.sum(OrderItem.quantity), 0),
+        func.coalesce(func.sum(OrderItem.quantity * OrderItem.price), 0),
+    )
+
+    def aggregate(*keys, join_products: bool = False):
+        query = select(*keys, *measures).select_from(OrderItem).join(Order, Order.id == OrderItem.order_id)
+        if join_products:
+            query = query.outerjoin(Product, Product.id == OrderItem.product_id)
+        return query.where(condition).group_by(*keys)
+
+    return {
+        DailySales: aggregate(day),
+        DailyProductSales: aggregate(day, OrderItem.product_id),
+        DailyCategoryRevenue: aggregate(day, category_id, join_products=True),
+    }
+
+
+def _insert(model, query, accumulate: bool):
+    stmt = insert(model).from_select(_KEYS[model] + _MEASURES, query)
+    if accumulate:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=_KEYS[model],
+            set_={name: getattr(model, name) + getattr(stmt.excluded, name) for name in _MEASURES}
+        )
+    return stmt
+
+
+def add_completed_orders(connection, order_ids: list[int]) -> None:
+    """Fold newly completed orders into the rollups (runs in the caller's transaction)."""
+    for model, query in _rollup_selects(Order.id.in_(order_ids)).items():
+        connection.execute(_insert(model, query, accumulate=True))
+
+
+def rebuild_rollups(db: Session, since: Optional[date] = None) -> None:
+    """Recompute the rollups from completed orders, for every day or from `since` on."""
+    # Stamp orders completed before completed_at existed, so a later touch
+    # doesn't count them a second time
+    db.execute(
+        update(Order)
+        .where(Order.status == OrderStatus.completed, Order.completed_at.is_(None))
+        .values(completed_at=Order.created_at),
+        execution_options={"synchronize_session": False}
+    )
+
+    condition = Order.status == OrderStatus.completed
+    if since:
+        condition = condition & (cast(Order.completed_at, Date) >= since)
+
+    for model, query in _rollup_selects(condition).items():
+        db.execute(delete(model).where(model.day >= since) if since else delete(model))
+        db.execute(_insert(model, query, accumulate=False))
+    db.commit()
+
+# -----------------------------
+# ORM hooks
+# -----------------------------
+
+@event.listens_for(Session, "before_flush")
+def _stamp_completed_orders(session: Session, flush_context, instances) -> None:
+    # Before stamping, so items flushed together with their order's completion still count
+    changed_items = itertools.chain(
+        session.new, session.deleted, (obj for obj in session.dirty if session.is_modified(obj))
+    )
+    for obj in changed_items:
+        if not isinstance(obj, OrderItem):
+            continue
+        # New items added by order_id alone don't load the relationship
+        order = obj.order or (session.get(Order, obj.order_id) if obj.order_id is not None else None)
+        if order is not None and order.completed_at is not None:
+            raise ValueError(f"Order {order.id} is completed; its items can't be changed")
+
+    completed = []
+    for obj in itertools.chain(session.new, session.dirty):
+        if isinstance(obj, Order) and obj.status == OrderStatus.completed and obj.completed_at is None:
+            obj.completed_at = datetime.now(timezone.utc)
+            completed.append(obj)
+    # Reset on every flush so a failed flush can't leak orders into the next one
+    session.info[_COMPLETED_KEY] = completed
+
+
+@event.listens_for(Session, "after_flush")
+def _roll_up_completed_orders(session: Session, flush_context) -> None:
+    orders = session.info.pop(_COMPLETED_KEY, None)
+    if orders:
+        add_completed_orders(session.connection(), [order.id for order in orders])
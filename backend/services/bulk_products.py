@@ -0,0 +1,99 @@
+# backend/services/bulk_products.py
+"""
+Set-based admin operations on many products.
+
+Each operation is one UPDATE/DELETE ... RETURNING over the selected rows
+instead of a SELECT + modify + commit per product. Image cleanup for
+deleted products is queued in the same transaction through the outbox,
+where the Cloudinary handler deletes up to 100 images per API call, and
+the changes are announced to /products/stream watchers on commit.
+"""
+from sqlalchemy import Float, Integer, Numeric, any_, cast, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from models.cart import CartItem
+from models.category import Category
+from models.order import OrderItem
+from models.product import Product
+from schemas.product import ProductBulkFilter, ProductBulkUpdate
+from services.catalog import resolve_category
+from services.catalog_cache import catalog_cache
+from services.cloudinary import public_id_from_url
+from services.outbox import enqueue_many
+from services.product_events import deleted_event, notify_product_changes, product_event
+
+
+def _conditions(selection: ProductBulkFilter) -> list:
+    conditions = []
+    if selection.ids:
+        conditions.append(Product.id == any_(literal(selection.ids, ARRAY(Integer))))
+    if selection.category is not None:
+        conditions.append(Product.category_id.in_(
+            select(Category.id).where(Category.name == selection.category)
+        ))
+    if selection.min_price is not None:
+        conditions.append(Product.price >= selection.min_price)
+    if selection.max_price is not None:
+        conditions.append(Product.price <= selection.max_price)
+    return conditions
+
+
+def bulk_update_products(db: Session, request: ProductBulkUpdate) -> list[int]:
+    """Reprice and/or recategorize every selected product in one UPDATE; returns their ids."""
+    values = {}
+    if request.price is not None:
+        values["price"] = request.price
+    elif request.price_change_percent is not None:
+        factor = 1 + request.price_change_percent / 100
+        # Round to cents, and never below one
+        values["price"] = func.greatest(
+            cast(func.round(cast(Product.price * factor, Numeric), 2), Float), 0.01
+        )
+    if request.new_category is not None:
+        category = resolve_category(db, request.new_category)
+        db.flush()
+        values["category_id"] = category.id
+
+    rows = db.execute(
+        update(Product).where(*_conditions(request)).values(**values)
+        .returning(Product.id, Product.name, Product.price, Product.image_url),
+        execution_options={"synchronize_session": False}
+    ).all()
+    notify_product_changes(db, [product_event(row) for row in rows])
+    db.commit()
+
+    ids = [row.id for row in rows]
+    catalog_cache.invalidate(*ids)
+    return ids
+
+
+def bulk_delete_products(db: Session, selection: ProductBulkFilter) -> list[int]:
+    """Delete every selected product in one DELETE; returns their ids."""
+    conditions = _conditions(selection)
+    matched = select(Product.id).where(*conditions)
+
+    # Same effect as deleting through the ORM one by one: carts drop the
+    # product, order history keeps its lines without the reference
+    db.execute(
+        delete(CartItem).where(CartItem.product_id.in_(matched)),
+        execution_options={"synchronize_session": False}
+    )
+    db.execute(
+        update(OrderItem).where(OrderItem.product_id.in_(matched)).values(product_id=None),
+        execution_options={"synchronize_session": False}
+    )
+    rows = db.execute(
+        delete(Product).where(*conditions).returning(Product.id, Product.image_url),
+        execution_options={"synchronize_session": False}
+    ).all()
+
+    enqueue_many(db, "cloudinary.delete", [
+        {"public_id": public_id_from_url(image_url)} for _, image_url in rows if image_url
+    ])
+    ids = [product_id for product_id, _ in rows]
+    notify_product_changes(db, [deleted_event(product_id) for product_id in ids])
+    db.commit()
+
+    catalog_cache.invalidate(*ids)
+    return ids
@@ -0,0 +1,114 @@
+# backend/services/catalog.py
+"""
+Product catalog queries, shared by the product router and the query-plan
+checks (scripts/check_query_plans.py) so the checks EXPLAIN exactly the
+SQL the endpoints run.
+"""
+from typing import Callable, Optional
+
+from sqlalchemy import Integer, any_, literal, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Query, Session, joinedload, load_only, noload, selectinload
+
+from models.category import Category, CategoryClosure
+from models.product import Product
+from models.recommendation import RelatedProduct
+from services.categories import subtree_ids
+
+# Fields a client may ask for with ?fields=; "id" is always returned
+PRODUCT_FIELDS = ("id", "name", "description", "price", "category", "image_url")
+
+
+def parse_fields(fields: Optional[str]) -> Optional[tuple[str, ...]]:
+    """
+    "name,price" -> ("id", "name", "price") in canonical order, or None
+    (every field) when not given. Raises ValueError on unknown fields.
+    """
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(PRODUCT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in PRODUCT_FIELDS if name in requested or name == "id")
+
+
+def _field_options(fields: Optional[tuple[str, ...]], load_category: Callable) -> list:
+    """Loader options that read only the columns behind `fields` (None = all)."""
+    if fields is None:
+        return [load_category(Product.category)]
+    columns = [getattr(Product, name) for name in fields if name != "category"]
+    if "category" not in fields:
+        return [load_only(*columns), noload(Product.category)]
+    # The category loader needs the foreign key, and only the category's name
+    return [
+        load_only(*columns, Product.category_id),
+        load_category(Product.category).load_only(Category.name),
+    ]
+
+
+def product_list_query(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    fields: Optional[tuple[str, ...]] = None,
+    category_id: Optional[int] = None
+) -> Query:
+    """
+    Filtered, stably ordered page of products, loading only `fields` if given.
+    Category filters include subcategories, via the closure table.
+    """
+    query = db.query(Product).options(*_field_options(fields, selectinload))
+
+    if category:
+        # Match the (small) categories table first, expand to their subtrees,
+        # then hit products.category_id's index
+        matching = (
+            select(CategoryClosure.descendant_id)
+            .join(Category, Category.id == CategoryClosure.ancestor_id)
+            .where(Category.name.ilike(f"%{category}%"))
+        )
+        query = query.filter(Product.category_id.in_(matching))
+    if category_id is not None:
+        query = query.filter(Product.category_id.in_(subtree_ids(category_id)))
+    if min_price is not None:
+        query = query.filter(Product.price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.price <= max_price)
+
+    return query.order_by(Product.id).offset(skip).limit(limit)
+
+
+def products_by_ids_query(db: Session, ids: list[int], fields: Optional[tuple[str, ...]] = None) -> Query:
+    """Products whose id is in `ids` (any order), in a single WHERE id = ANY(:ids) query."""
+    return (
+        db.query(Product)
+        .options(*_field_options(fields, joinedload))
+        .filter(Product.id == any_(literal(ids, ARRAY(Integer))))
+    )
+
+
+def related_products_query(db: Session, product_id: int, limit: int) -> Query:
+    """Precomputed "frequently bought together" products, best first, in one query."""
+    return (
+        db.query(Product)
+        .join(RelatedProduct, RelatedProduct.related_id == Product.id)
+        .filter(RelatedProduct.product_id == product_id)
+        .options(joinedload(Product.category))
+        .order_by(RelatedProduct.rank)
+        .limit(limit)
+    )
+
+
+def resolve_category(db: Session, name: Optional[str]) -> Optional[Category]:
+    """Find a category by name, creating it on first use."""
+    if not name:
+        return None
+    category = db.query(Category).filter(Category.name == name).first()
+    if category is None:
+        category = Category(name=name)
+        db.add(category)
+    return category
@@ -0,0 +1,121 @@
+# backend/services/catalog_cache.py
+"""
+Per-worker cache of serialized products, shared by GET /products/{id} and
+the batch lookup. Disabled unless CATALOG_CACHE_TTL_SECONDS > 0.
+
+Writes through the product router invalidate their entries on this
+worker; other workers see the change once the TTL expires. Readers take
+the cache's generation before loading and fill only if no invalidation
+happened meanwhile, so a read that raced a write can't re-cache the old row.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from schemas.product import ProductResponse, partial_product_response
+from services.catalog import products_by_ids_query
+
+
+class CatalogCache:
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[float, ProductResponse]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @property
+    def generation(self) -> int:
+        """Take before loading rows for put_many."""
+        return self._generation
+
+    def get_many(self, ids: Iterable[int]) -> dict[int, ProductResponse]:
+        if not self.enabled:
+            return {}
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for product_id in ids:
+                entry = self._entries.get(product_id)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[product_id]
+                    continue
+                self._entries.move_to_end(product_id)
+                found[product_id] = entry[1]
+        return found
+
+    def put_many(self, products: Iterable[ProductResponse], generation: int) -> None:
+        if not self.enabled:
+            return
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            # Something was invalidated while these were loading; they may predate it
+            if generation != self._generation:
+                return
+            for product in products:
+                self._entries[product.id] = (expires, product)
+                self._entries.move_to_end(product.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *ids: int) -> None:
+        with self._lock:
+            self._generation += 1
+            for product_id in ids:
+                self._entries.pop(product_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+catalog_cache = CatalogCache(settings.CATALOG_CACHE_TTL_SECONDS, settings.CATALOG_CACHE_MAX_ENTRIES)
+
+
+def load_products(
+    db: Session,
+    ids: list[int],
+    fields: Optional[tuple[str, ...]] = None
+) -> tuple[list[BaseModel], list[int]]:
+    """
+    Products for `ids` in the order given (duplicates dropped), plus the ids
+    that don't exist. Cache misses are fetched together in one query. With
+    `fields`, products are trimmed to those fields; without the cache only
+    their columns are read.
+    """
+    ids = list(dict.fromkeys(ids))
+    if fields is not None and not catalog_cache.enabled:
+        model = partial_product_response(fields)
+        found = {product.id: model.model_validate(product) for product in products_by_ids_query(db, ids, fields)}
+        return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
+
+    generation = catalog_cache.generation
+    found = catalog_cache.get_many(ids)
+
+    misses = [product_id for product_id in ids if product_id not in found]
+    if misses:
+        fetched = [
+            ProductResponse.model_validate(product)
+            for product in products_by_ids_query(db, misses)
+        ]
+        catalog_cache.put_many(fetched, generation)
+        found.update((product.id, product) for product in fetched)
+
+    products = [found[product_id] for product_id in ids if product_id in found]
+    missing = [product_id for product_id in ids if product_id not in found]
+    if fields is not None:
+        model = partial_product_response(fields)
+        products = [model.model_validate(product) for product in products]
+    return products, missing
@@ -0,0 +1,214 @@
+# backend/services/categories.py
+"""
+Category tree: closure table maintenance and a cached, serialized tree.
+
+categories.parent_id is the source of truth; category_closure holds every
+(ancestor, descendant, depth) pair so "this category and everything under
+it" is a single indexed lookup (subtree_ids) instead of a recursive walk.
+ORM hooks keep the closure in step on any code path that flushes
+categories (including resolve_category's create-on-first-use): new
+categories get their ancestor rows, a parent_id change moves the whole
+subtree, and deletes cascade. Bulk loads that bypass the ORM call
+rebuild_closure() afterwards.
+
+Tree reads come from category_tree, a per-worker cache of the whole tree
+built with one query and serialized once. A commit that touched
+categories invalidates it on this worker; other workers rebuild after
+CATEGORY_TREE_TTL_SECONDS.
+"""
+import threading
+import time
+from typing import Optional
+
+from pydantic_core import to_json
+from sqlalchemy import delete, event, exists, insert, inspect, literal, select, true, union_all, update
+from sqlalchemy.orm import Session, aliased
+
+from core.config import settings
+from models.category import Category, CategoryClosure
+from models.product import Product
+
+_CHANGED_KEY = "categories.changed"
+
+
+def subtree_ids(category_id: int):
+    """SELECT of the ids of a category and all its descendants."""
+    return select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+
+
+def _add_to_closure(connection, category_id: int, parent_id: Optional[int]) -> None:
+    """Rows for a new leaf: itself at depth 0 plus each of the parent's ancestors one level further."""
+    rows = select(literal(category_id), literal(category_id), literal(0))
+    if parent_id is not None:
+        rows = union_all(rows, select(
+            CategoryClosure.ancestor_id, literal(category_id), CategoryClosure.depth + 1
+        ).where(CategoryClosure.descendant_id == parent_id))
+    connection.execute(insert(CategoryClosure).from_select(["ancestor_id", "descendant_id", "depth"], rows))
+
+
+def _move_in_closure(connection, category_id: int, parent_id: Optional[int]) -> None:
+    """Re-hang a subtree: drop its links to the old ancestors, link it below the new parent's."""
+    subtree = subtree_ids(category_id)
+    connection.execute(delete(CategoryClosure).where(
+        CategoryClosure.descendant_id.in_(subtree),
+        CategoryClosure.ancestor_id.not_in(subtree)
+    ))
+    if parent_id is None:
+        return
+    above, below = aliased(CategoryClosure), aliased(CategoryClosure)
+    connection.execute(insert(CategoryClosure).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+        .select_from(above).join(below, true())  # every new ancestor x every subtree member
+        .where(above.descendant_id == parent_id, below.ancestor_id == category_id)
+    ))
+
+
+def rebuild_closure(db: Session) -> int:
+    """Recompute category_closure from parent_id (after bulk loads); returns the row count."""
+    tree = select(
+        Category.id.label("ancestor_id"), Category.id.label("descendant_id"), literal(0).label("depth")
+    ).cte("tree", recursive=True)
+    child = aliased(Category)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.id, tree.c.depth + 1)
+        .join(child, child.parent_id == tree.c.descendant_id)
+    )
+    db.execute(delete(CategoryClosure))
+    result = db.execute(insert(CategoryClosure).from_select(
+        ["ancestor_id", "descendant_id", "depth"], select(tree.c.ancestor_id, tree.c.descendant_id, tree.c.depth)
+    ))
+    db.commit()
+    category_tree.invalidate()
+    return result.rowcount
+
+
+def move_category(db: Session, category: Category, parent_id: Optional[int]) -> None:
+    """Set a new parent (None = top level). Raises ValueError for unknown parents and cycles."""
+    if parent_id is not None:
+        if db.get(Category, parent_id) is None:
+            raise ValueError(f"Parent category {parent_id} not found")
+        inside = db.scalar(select(exists().where(
+            CategoryClosure.ancestor_id == category.id, CategoryClosure.descendant_id == parent_id
+        )))
+        if inside:
+            raise ValueError("A category can't be moved under itself or one of its subcategories")
+    category.parent_id = parent_id
+
+
+def delete_category(db: Session, category: Category) -> None:
+    """Delete a leaf category; its products move up to the parent (or become uncategorized)."""
+    if db.scalar(select(exists().where(Category.parent_id == category.id))):
+        raise ValueError("Move or delete the subcategories first")
+    db.execute(
+        update(Product).where(Product.category_id == category.id).values(category_id=category.parent_id),
+        execution_options={"synchronize_session": False}
+    )
+    db.delete(category)
+
+# -----------------------------
+# Cached tree
+# -----------------------------
+
+class CategoryTree:
+    """The whole tree, indexed by id, with the full-tree JSON serialized once."""
+
+    def __init__(self, rows):
+        self.nodes: dict[int, dict] = {}
+        self.parents: dict[int, Optional[int]] = {}
+        for category_id, name, description, parent_id in rows:
+            self.nodes[category_id] = {"id": category_id, "name": name, "description": description, "children": []}
+            self.parents[category_id] = parent_id
+        roots = []
+        for category_id, node in self.nodes.items():
+            parent = self.nodes.get(self.parents[category_id])
+            (parent["children"] if parent else roots).append(node)
+        self.body = to_json(roots)
+
+    def subtree(self, category_id: int) -> Optional[bytes]:
+        """JSON of a category, its descendants and its ancestors (top-level first), or None."""
+        node = self.nodes.get(category_id)
+        if node is None:
+            return None
+        path = []
+        parent_id = self.parents[category_id]
+        while parent_id is not None and parent_id in self.nodes:
+            ancestor = self.nodes[parent_id]
+            path.append({
+                "id": parent_id,
+                "name": ancestor["name"],
+                "description": ancestor["description"],
+                "parent_id": self.parents[parent_id],
+            })
+            parent_id = self.parents[parent_id]
+        return to_json({**node, "path": path[::-1]})
+
+
+class CategoryTreeCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._tree: Optional[CategoryTree] = None
+        self._expires = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> CategoryTree:
+        tree = self._tree
+        if tree is not None and time.monotonic() < self._expires:
+            return tree
+        # One thread rebuilds; the others wait for its result rather than query too
+        with self._lock:
+            if self._tree is not None and time.monotonic() < self._expires:
+                return self._tree
+            generation = self._generation
+            tree = CategoryTree(db.execute(
+                select(Category.id, Category.name, Category.description, Category.parent_id).order_by(Category.name)
+            ).all())
+            # An edit committed while we were reading: serve this tree once, don't keep it
+            if generation == self._generation:
+                self._tree, self._expires = tree, time.monotonic() + self.ttl
+            return tree
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._tree = None
+
+
+category_tree = CategoryTreeCache(settings.CATEGORY_TREE_TTL_SECONDS)
+
+# -----------------------------
+# ORM hooks
+# -----------------------------
+
+@event.listens_for(Session, "after_flush")
+def _maintain_closure(session: Session, flush_context) -> None:
+    if not any(isinstance(obj, Category) for obj in (*session.new, *session.dirty, *session.deleted)):
+        return
+    new = [obj for obj in session.new if isinstance(obj, Category)]
+    moved = [
+        obj for obj in session.dirty
+        if isinstance(obj, Category) and inspect(obj).attrs.parent_id.history.has_changes()
+    ]
+    session.info[_CHANGED_KEY] = True
+
+    connection = session.connection()
+    # Parents first, so a child created in the same flush finds its parent's rows
+    pending = {obj.id: obj for obj in new}
+    while pending:
+        ready = [obj for obj in pending.values() if obj.parent_id not in pending]
+        for obj in ready:
+            _add_to_closure(connection, obj.id, obj.parent_id)
+            del pending[obj.id]
+    for obj in moved:
+        _move_in_closure(connection, obj.id, obj.parent_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_tree(session: Session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        category_tree.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changes(session: Session, previous_transaction) -> None:
+    session.info.pop(_CHANGED_KEY, None)
@@ -1,9 +1,19 @@
 import cloudinary
+import cloudinary.api
 import cloudinary.uploader
+from cloudinary.exceptions import AlreadyExists, AuthorizationRequired, BadRequest, NotAllowed, NotFound
 from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from urllib3.util.retry import Retry
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
 from core.config import settings
+from core.tracing import span
 import logging
+import re
 from models.product import Product
+from services.outbox import enqueue, register
+
+logger = logging.getLogger(__name__)
 
 # Configure Cloudinary
 cloudinary.config(
@@ -11,6 +21,19 @@ cloudinary.config(
     api_key=settings.CLOUDINARY_API_KEY,
     api_secret=settings.CLOUDINARY_API_SECRET
 )
+if settings.CLOUDINARY_UPLOAD_PREFIX:
+    cloudinary.config(upload_prefix=settings.CLOUDINARY_UPLOAD_PREFIX)
+
+# Rejected requests (bad file, missing image, credentials) say nothing about
+# Cloudinary's health; timeouts, socket errors, 5xx and rate limits do
+CLIENT_ERRORS = (BadRequest, AuthorizationRequired, NotAllowed, NotFound, AlreadyExists)
+
+cloudinary_breaker = CircuitBreaker(
+    "cloudinary",
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_SECONDS,
+    is_failure=lambda e: not isinstance(e, CLIENT_ERRORS)
+)
 
 def upload_to_cloudinary(file, product_id: str) -> str:
     """
@@ -18,57 +41,83 @@ def upload_to_cloudinary(file, product_id: str) -> str:
     """
     try:
         # Upload file to Cloudinary
-        result = cloudinary.uploader.upload(
-            file.file,
-            folder="products",  # Organize images in a folder
-            public_id=f"product_{product_id}",  # Set custom public ID
-            overwrite=True,  # Override if image exists
-            resource_type="auto"  # Auto-detect file type
-        )
+        with cloudinary_breaker.protect(), span("cloudinary", "upload"):
+            result = cloudinary.uploader.upload(
+                file.file,
+                folder="products",  # Organize images in a folder
+                public_id=f"product_{product_id}",  # Set custom public ID
+                overwrite=True,  # Override if image exists
+                resource_type="auto",  # Auto-detect file type
+                timeout=settings.CLOUDINARY_TIMEOUT_SECONDS
+            )
         return result["secure_url"]
+    except CircuitOpenError:
+        raise  # 503 with Retry-After (see main.py)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to upload image: {str(e)}"
         )
 
+def public_id_from_url(image_url: str) -> str:
+    """
+    Extract the public_id (including folders) from a delivery URL
+    URL format: https://res.cloudinary.com/cloud_name/image/upload/v1234567890/products/product_1.jpg
+    """
+    path = image_url.split("/upload/", 1)[-1]
+    path = re.sub(r"^v\d+/", "", path)  # version segment
+    return path.rsplit(".", 1)[0]
+
 def delete_from_cloudinary(image_url: str) -> bool:
     """
     Delete image from Cloudinary using the URL
     Returns True if successful, False otherwise
     """
     try:
-        # Extract public_id from URL
-        # URL format: https://res.cloudinary.com/cloud_name/image/upload/v1234567890/public_id
-        public_id = image_url.split("/")[-1].split(".")[0]
-        
-        # Delete the image
-        result = cloudinary.uploader.destroy(public_id)
+        with cloudinary_breaker.protect(), span("cloudinary", "destroy"):
+            result = cloudinary.uploader.destroy(
+                public_id_from_url(image_url),
+                timeout=settings.CLOUDINARY_TIMEOUT_SECONDS
+            )
         return result.get("result") == "ok"
     except Exception as e:
         # Log error but don't raise exception as this is cleanup
-        print(f"Failed to delete image from Cloudinary: {str(e)}")
+        logger.error(f"Failed to delete image from Cloudinary: {str(e)}")
         return False
 
-def handle_product_image(product: Product) -> bool:
+def schedule_image_deletion(db: Session, product: Product) -> None:
     """
-    Helper function to handle product image deletion
-    
-    Args:
-        product (Product): Product model instance with image_url
-        
-    Returns:
-        bool: True if deletion was successful or no image existed
+    Queue deletion of the product's current image in the caller's transaction,
+    so it only happens if the change commits and never delays the request
     """
     if product.image_url is not None:
-        try:
-            image_url = str(product.image_url)
-            success = delete_from_cloudinary(image_url)
-            if not success:
-                logging.error(f"Failed to delete image for product {product.id}")
-                return False
-            return True
-        except Exception as e:
-            logging.error(f"Error handling product image: {str(e)}")
-            return False
-    return True
\ No newline at end of file
+        enqueue(db, "cloudinary.delete", {"public_id": public_id_from_url(str(product.image_url))})
+
+# --------------------------------
+# Outbox handlers
+# --------------------------------
+
+# Admin API limit for one delete_resources call
+DELETE_BATCH_SIZE = 100
+# The Admin API client retries idempotent requests (urllib3's default
+# Retry), so each attempt gets a share of the timeout
+ADMIN_API_ATTEMPTS = Retry.DEFAULT.total + 1
+
+def _delete_images(payloads: list[dict]) -> None:
+    public_ids = list(dict.fromkeys(payload["public_id"] for payload in payloads))
+    # While the breaker is open this fails fast and the outbox retries later
+    with cloudinary_breaker.protect():
+        result = cloudinary.api.delete_resources(
+            public_ids,
+            invalidate=True,
+            timeout=settings.CLOUDINARY_TIMEOUT_SECONDS / ADMIN_API_ATTEMPTS
+        )
+    # "not_found" means an earlier attempt already deleted it
+    failed = {
+        public_id: outcome for public_id, outcome in result.get("deleted", {}).items()
+        if outcome not in ("deleted", "not_found")
+    }
+    if failed:
+        raise RuntimeError(f"delete_resources failed for {failed}")
+
+register("cloudinary.delete", _delete_images, batch_size=DELETE_BATCH_SIZE)
\ No newline at end of file
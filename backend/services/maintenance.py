@@ -0,0 +1,101 @@
+# backend/services/maintenance.py
+"""
+Periodic cleanup jobs (registered with core.scheduler in main.lifespan).
+
+Each job works in bounded batches, committing after every batch, so no
+single statement holds locks on a large range of rows. Rows already
+locked by a request are skipped (SKIP LOCKED) and picked up next run.
+"""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.cart import CartItem
+from models.order import Order, OrderStatus
+from models.token import RevokedToken
+
+
+def _cutoff(**delta) -> datetime:
+    return (datetime.now(timezone.utc) - timedelta(**delta)).replace(tzinfo=None)
+
+
+def expire_cart_items(db: Session) -> int:
+    """Delete cart items untouched for CART_EXPIRY_DAYS."""
+    cutoff = _cutoff(days=settings.CART_EXPIRY_DAYS)
+    batch = settings.MAINTENANCE_BATCH_SIZE
+    total = 0
+    while True:
+        stale = (
+            select(CartItem.id)
+            .where(CartItem.updated_at < cutoff)
+            .order_by(CartItem.id)
+            .limit(batch)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            delete(CartItem).where(CartItem.id.in_(stale)),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < batch:
+            return total
+
+
+def cancel_stale_orders(db: Session) -> int:
+    """
+    Cancel orders left pending for PENDING_ORDER_TIMEOUT_MINUTES.
+    The schema has no stock reservations yet, so cancelling is all that
+    is needed to release them.
+    """
+    cutoff = _cutoff(minutes=settings.PENDING_ORDER_TIMEOUT_MINUTES)
+    batch = settings.MAINTENANCE_BATCH_SIZE
+    total = 0
+    while True:
+        stale = (
+            select(Order.id)
+            .where(Order.status == OrderStatus.pending, Order.created_at < cutoff)
+            .order_by(Order.id)
+            .limit(batch)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            update(Order).where(Order.id.in_(stale)).values(status=OrderStatus.cancelled),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < batch:
+            return total
+
+
+def purge_revoked_tokens(db: Session) -> int:
+    """
+    Delete denylist entries for tokens that have expired anyway. Every
+    refresh revokes the old refresh token, so the table grows with traffic;
+    an expired JWT fails validation before the denylist is consulted.
+    """
+    cutoff = _cutoff()
+    batch = settings.MAINTENANCE_BATCH_SIZE
+    total = 0
+    while True:
+        expired = (
+            select(RevokedToken.jti)
+            .where(RevokedToken.expires_at < cutoff)
+            .order_by(RevokedToken.expires_at)
+            .limit(batch)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            delete(RevokedToken).where(RevokedToken.jti.in_(expired)),
+            execution_options={"synchronize_session": False}
+        )
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < batch:
+            return total
@@ -0,0 +1,31 @@
+# backend/services/orders.py
+"""Order and cart queries, shared with the query-plan checks."""
+from sqlalchemy.orm import Query, Session, selectinload
+
+from models.cart import CartItem
+from models.order import Order, OrderItem
+
+
+def order_history_query(db: Session, user_id: int, skip: int = 0, limit: int = 20) -> Query:
+    """A user's orders, newest first (served by ix_orders_user_id_created_at)."""
+    return (
+        db.query(Order)
+        .options(selectinload(Order.items).selectinload(OrderItem.product))
+        .filter(Order.user_id == user_id)
+        .order_by(Order.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+
+
+def order_items_query(db: Session, order_id: int) -> Query:
+    return db.query(OrderItem).filter(OrderItem.order_id == order_id)
+
+
+def cart_items_query(db: Session, user_id: int) -> Query:
+    return (
+        db.query(CartItem)
+        .options(selectinload(CartItem.product))
+        .filter(CartItem.user_id == user_id)
+        .order_by(CartItem.id)
+    )
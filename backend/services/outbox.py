@@ -0,0 +1,132 @@
+# backend/services/outbox.py
+"""
+Transactional outbox.
+
+Request handlers call enqueue() inside their own transaction, so a side
+effect is recorded if and only if the change that causes it commits. The
+dispatch_outbox job (run by core.scheduler) claims due messages with
+FOR UPDATE SKIP LOCKED, hands them to the handler registered for their
+kind, deletes delivered ones and reschedules failures with exponential
+backoff and jitter until OUTBOX_MAX_ATTEMPTS.
+
+Handlers receive a list of payloads (up to their batch_size) and must be
+idempotent: a crash after the side effect but before the delete delivers
+the message again.
+"""
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Callable
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.outbox import OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = timedelta(hours=1)
+# Batches per dispatcher run, so one run can't monopolise its worker thread
+MAX_BATCHES_PER_RUN = 10
+
+
+@dataclass
+class Handler:
+    func: Callable[[list[dict]], None]
+    batch_size: int = 1
+
+
+HANDLERS: dict[str, Handler] = {}
+
+
+def register(kind: str, func: Callable[[list[dict]], None], batch_size: int = 1) -> None:
+    HANDLERS[kind] = Handler(func=func, batch_size=batch_size)
+
+
+def enqueue(db: Session, kind: str, payload: dict) -> None:
+    """Record a side effect in the caller's transaction (no commit here)."""
+    if kind not in HANDLERS:
+        raise ValueError(f"No outbox handler registered for {kind!r}")
+    db.add(OutboxMessage(kind=kind, payload=payload))
+
+
+def enqueue_many(db: Session, kind: str, payloads: list[dict]) -> None:
+    """enqueue() for many payloads, as one multi-row INSERT."""
+    if kind not in HANDLERS:
+        raise ValueError(f"No outbox handler registered for {kind!r}")
+    if payloads:
+        db.execute(insert(OutboxMessage), [{"kind": kind, "payload": payload} for payload in payloads])
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _backoff(attempts: int) -> timedelta:
+    delay = timedelta(seconds=settings.OUTBOX_BACKOFF_SECONDS * 2 ** (attempts - 1))
+    return min(delay, MAX_BACKOFF) * random.uniform(0.8, 1.2)
+
+
+def _deliver(kind: str, messages: list[OutboxMessage]) -> tuple[list[int], list[OutboxMessage]]:
+    """Run the handler in batch_size chunks; returns (delivered ids, failed messages)."""
+    handler = HANDLERS.get(kind)
+    if handler is None:
+        for message in messages:
+            message.last_error = f"No handler registered for {kind!r}"
+        return [], messages
+
+    delivered, failed = [], []
+    for start in range(0, len(messages), handler.batch_size):
+        chunk = messages[start:start + handler.batch_size]
+        try:
+            handler.func([message.payload for message in chunk])
+        except Exception as e:
+            logger.warning(f"Outbox {kind} delivery failed for {len(chunk)} message(s): {str(e)}")
+            for message in chunk:
+                message.last_error = str(e)[:1000]
+            failed += chunk
+        else:
+            delivered += [message.id for message in chunk]
+    return delivered, failed
+
+
+def dispatch_outbox(db: Session) -> int:
+    """Deliver due messages in batches; returns how many were delivered."""
+    total = 0
+    for _ in range(MAX_BATCHES_PER_RUN):
+        now = _now()
+        messages = db.execute(
+            select(OutboxMessage)
+            .where(OutboxMessage.failed_at.is_(None), OutboxMessage.available_at <= now)
+            .order_by(OutboxMessage.available_at)
+            .limit(settings.OUTBOX_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not messages:
+            break
+
+        delivered = []
+        for kind, group in groupby(sorted(messages, key=lambda m: (m.kind, m.id)), key=lambda m: m.kind):
+            ok, failed = _deliver(kind, list(group))
+            delivered += ok
+            for message in failed:
+                message.attempts += 1
+                if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                    message.failed_at = now
+                    logger.error(f"Outbox message {message.id} ({kind}) failed permanently: {message.last_error}")
+                else:
+                    message.available_at = now + _backoff(message.attempts)
+
+        if delivered:
+            db.execute(
+                delete(OutboxMessage).where(OutboxMessage.id.in_(delivered)),
+                execution_options={"synchronize_session": False}
+            )
+        db.commit()
+        total += len(delivered)
+        if len(messages) < settings.OUTBOX_BATCH_SIZE:
+            break
+    return total
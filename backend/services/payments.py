@@ -0,0 +1,204 @@
+# backend/services/payments.py
+"""
+PaymentIntent reuse for checkout.
+
+Each (user, checkout) keeps at most one open intent in payment_intents.
+A retry with the same contents and amount returns the stored client_secret
+without calling Stripe. Changed contents update the open intent's amount
+in place (PaymentIntent.modify). A new intent is created only when there
+is none, or the old one is paid, cancelled, expired or in another currency.
+Creates carry an idempotency key, so concurrent first requests share one
+intent.
+
+No transaction, row lock or pooled connection is held while Stripe
+answers. The result is written under a row lock only if the row still
+looks as it did before the call; if a concurrent checkout changed it in
+between, the whole step runs again from what that checkout stored.
+
+Every Stripe call goes through stripe_breaker and is bounded by
+STRIPE_DEADLINE_SECONDS (configure_stripe_client, called at startup).
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
+
+import stripe
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.circuit_breaker import CircuitBreaker
+from core.config import settings
+from core.tracing import span
+from models.payment import PaymentIntentRecord
+
+logger = logging.getLogger(__name__)
+
+# Intents in these states can still be confirmed by the client
+REUSABLE_STATUSES = {"requires_payment_method", "requires_confirmation", "requires_action"}
+# Rounds of Stripe call + compare-and-write before giving up on a contended checkout
+CHECKOUT_ATTEMPTS = 3
+
+
+class CheckoutConflictError(Exception):
+    """Concurrent requests for the same checkout kept changing it; the client should retry."""
+
+
+def _stripe_outage(e: BaseException) -> bool:
+    """Timeouts, connection errors, 5xx and rate limiting; card declines and bad requests are answers."""
+    if isinstance(e, (stripe.APIConnectionError, stripe.RateLimitError)):
+        return True
+    return isinstance(e, stripe.StripeError) and (e.http_status or 500) >= 500
+
+
+def configure_stripe_client() -> None:
+    """Per-attempt timeout so that all attempts together fit in the deadline (plus ~0.5s backoff per retry)."""
+    stripe.max_network_retries = settings.STRIPE_MAX_NETWORK_RETRIES
+    stripe.default_http_client = stripe.RequestsClient(
+        timeout=settings.STRIPE_DEADLINE_SECONDS / (settings.STRIPE_MAX_NETWORK_RETRIES + 1)
+    )
+
+
+stripe_breaker = CircuitBreaker(
+    "stripe",
+    failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.BREAKER_RESET_SECONDS,
+    is_failure=_stripe_outage
+)
+
+
+@dataclass(frozen=True, order=True)
+class CheckoutLine:
+    product_id: int
+    quantity: int
+    unit_amount: int  # cents
+
+
+def to_cents(price) -> int:
+    return int((Decimal(str(price)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def contents_hash(lines: list[CheckoutLine]) -> str:
+    canonical = ";".join(f"{line.product_id}x{line.quantity}@{line.unit_amount}" for line in sorted(lines))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _reusable(record: PaymentIntentRecord, currency: str) -> bool:
+    max_age = timedelta(hours=settings.PAYMENT_INTENT_REUSE_HOURS)
+    return (
+        record.status in REUSABLE_STATUSES
+        and record.currency == currency
+        and record.created_at > _now() - max_age
+    )
+
+
+def _version(record: Optional[PaymentIntentRecord]) -> Optional[tuple]:
+    """What a compare-and-write checks: None for no row, else the fields a checkout or webhook changes."""
+    if record is None:
+        return None
+    return (record.stripe_intent_id, record.contents_hash, record.amount, record.status)
+
+
+def _record_query(db: Session, user_id: int, checkout_key: str):
+    return db.query(PaymentIntentRecord).filter(
+        PaymentIntentRecord.user_id == user_id,
+        PaymentIntentRecord.checkout_key == checkout_key
+    )
+
+
+def checkout_intent(
+    db: Session,
+    user_id: int,
+    checkout_key: str,
+    lines: list[CheckoutLine],
+    metadata: dict,
+    currency: Optional[str] = None
+) -> PaymentIntentRecord:
+    """The open PaymentIntent for this checkout, reused, repriced or created as needed."""
+    currency = currency or settings.STRIPE_CURRENCY
+    amount = sum(line.quantity * line.unit_amount for line in lines)
+    digest = contents_hash(lines)
+    metadata = {**metadata, "user_id": str(user_id), "checkout_key": checkout_key}
+
+    def unchanged(record: Optional[PaymentIntentRecord]) -> bool:
+        return (
+            record is not None and _reusable(record, currency)
+            and record.contents_hash == digest and record.amount == amount
+        )
+
+    for _ in range(CHECKOUT_ATTEMPTS):
+        # Retries are the common case: one indexed read, no lock, no Stripe call
+        record = _record_query(db, user_id, checkout_key).populate_existing().first()
+        if unchanged(record):
+            return record
+        seen = _version(record)
+        reuse_id = record.stripe_intent_id if record is not None and _reusable(record, currency) else None
+        previous = record.stripe_intent_id if record is not None else "none"
+        # Release the transaction and its connection before waiting on Stripe
+        db.commit()
+
+        intent, modified = None, False
+        if reuse_id is not None:
+            try:
+                with stripe_breaker.protect(), span("stripe", "PaymentIntent.modify"):
+                    intent = stripe.PaymentIntent.modify(reuse_id, amount=amount, metadata=metadata)
+                modified = True
+            except stripe.InvalidRequestError as e:
+                # Typically paid or cancelled before the webhook reached us; start over
+                logger.info(f"Could not update PaymentIntent {reuse_id}: {str(e)}")
+        if intent is None:
+            idempotency_key = hashlib.sha256(
+                f"{user_id}:{checkout_key}:{digest}:{amount}:{currency}:{previous}".encode()
+            ).hexdigest()
+            with stripe_breaker.protect(), span("stripe", "PaymentIntent.create"):
+                intent = stripe.PaymentIntent.create(
+                    amount=amount,
+                    currency=currency,
+                    metadata=metadata,
+                    idempotency_key=idempotency_key
+                )
+
+        # Row lock serializes the writes of concurrent checkouts of the same user and cart/product
+        record = _record_query(db, user_id, checkout_key).with_for_update().populate_existing().first()
+        if _version(record) != seen:
+            db.commit()  # changed while Stripe answered; go again from the new state
+            continue
+
+        if record is None:
+            record = PaymentIntentRecord(user_id=user_id, checkout_key=checkout_key)
+            db.add(record)
+        record.contents_hash = digest
+        record.amount = amount
+        record.status = intent.status
+        if not modified:
+            record.currency = currency
+            record.stripe_intent_id = intent.id
+            record.client_secret = intent.client_secret
+            record.created_at = _now()
+        try:
+            db.commit()
+        except IntegrityError:
+            # A concurrent first checkout inserted the row (with the same intent,
+            # thanks to the idempotency key); compare against it on the next round
+            db.rollback()
+            continue
+        return record
+
+    raise CheckoutConflictError(f"Checkout {checkout_key} kept changing concurrently")
+
+
+def update_intent_status(db: Session, stripe_intent_id: str, status: str) -> bool:
+    """Record a status change reported by a Stripe webhook; False if the intent isn't ours."""
+    updated = (
+        db.query(PaymentIntentRecord)
+        .filter(PaymentIntentRecord.stripe_intent_id == stripe_intent_id)
+        .update({"status": status}, synchronize_session=False)
+    )
+    db.commit()
+    return bool(updated)
@@ -0,0 +1,396 @@
+# backend/services/pricing.py
+"""
+Cart pricing with promotions, in integer cents.
+
+Active promotions are compiled into a RuleSet: parallel NumPy arrays (one
+entry per rule) plus indexes from product id and from category id to
+rules, addressed directly by id. Category rules are expanded through the
+category closure table at compile time, so a rule on "Electronics" is
+indexed under every category below it. Rules that apply everywhere sit in a
+short list of their own.
+
+price_lines() prices any number of lines from any number of carts in one
+pass, with no Python loop per line or per rule:
+
+1. Look every line up in both indexes, giving candidate (line, rule)
+   pairs.
+2. Drop pairs below the rule's min_quantity, and coupon rules whose code
+   the line's cart didn't present.
+3. Compute each pair's discount in cents. A percentage is rounded half up
+   on the line total. An amount off is per unit, capped at the unit price.
+4. Keep the best discount per line. Promotions don't stack.
+
+The compiled RuleSet is cached per worker (promotion_rules). A commit that
+changes promotions or categories invalidates it on this worker. Other
+workers recompile after PROMOTIONS_CACHE_TTL_SECONDS, or sooner if a
+promotion starts or ends.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+import numpy as np
+from sqlalchemy import Integer, any_, event, literal, or_, select
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.category import Category, CategoryClosure
+from models.product import Product
+from models.promotion import Promotion
+from services.payments import to_cents
+
+_CHANGED_KEY = "promotions.changed"
+BASIS_POINTS = 10_000
+NO_COUPON = -1
+NO_PROMOTION = -1
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class RuleIndex:
+    """
+    Rules by integer key (product or category id), laid out like a sparse
+    matrix row index: the rules for key k are rules[offsets[k]:offsets[k + 1]].
+    A lookup is a gather by id, no search or hashing.
+    """
+    offsets: np.ndarray
+    rules: np.ndarray
+
+    @classmethod
+    def build(cls, keys: np.ndarray, rules: np.ndarray) -> "RuleIndex":
+        order = np.argsort(keys, kind="stable")
+        counts = np.bincount(keys, minlength=1)
+        # a trailing empty row that out-of-range keys are clipped to
+        offsets = np.concatenate([[0], np.cumsum(counts), [keys.size]]).astype(np.int64)
+        return cls(offsets, rules[order].astype(np.int64))
+
+    def lookup(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Every (i, rule) indexed under keys[i]: a vectorized one-to-many join."""
+        keys = np.minimum(keys, self.offsets.size - 2)
+        start = self.offsets[keys]
+        counts = self.offsets[keys + 1] - start
+        total = int(counts.sum())
+        key_index = np.repeat(np.arange(keys.size), counts)
+        # position of each match within its key's run of rules
+        position = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return key_index, self.rules[start[key_index] + position]
+
+    def keys(self) -> np.ndarray:
+        """The key of each entry of `rules`."""
+        return np.repeat(np.arange(self.offsets.size - 1), np.diff(self.offsets))
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    promotion_ids: np.ndarray
+    percent_bp: np.ndarray  # basis points, 0 for amount-off rules
+    amount_off: np.ndarray  # cents per unit, 0 for percentage rules
+    min_quantity: np.ndarray
+    coupon: np.ndarray  # index into coupon_codes, NO_COUPON for automatic rules
+    coupon_codes: dict[str, int]
+    by_product: RuleIndex
+    by_category: RuleIndex  # category rules under every category of their subtree
+    global_rules: np.ndarray
+
+    def __len__(self) -> int:
+        return self.promotion_ids.size
+
+
+def compile_rules(promotions: Iterable[tuple], closure: Iterable[tuple[int, int]]) -> RuleSet:
+    """
+    RuleSet from (id, product_id, category_id, percent_off, amount_off,
+    min_quantity, coupon_code) rows and (ancestor_id, descendant_id) pairs.
+    """
+    rows = list(promotions)
+    coupon_codes: dict[str, int] = {}
+    for row in rows:
+        if row[6]:
+            coupon_codes.setdefault(row[6].upper(), len(coupon_codes))
+
+    def column(values) -> np.ndarray:
+        return np.fromiter(values, dtype=np.int64, count=len(rows))
+
+    rule_ids = np.arange(len(rows), dtype=np.int64)
+    product_id = column(row[1] or 0 for row in rows)
+    category_id = column(row[2] or 0 for row in rows)
+    has_product, has_category = product_id > 0, category_id > 0
+
+    closure = np.array([tuple(pair) for pair in closure], dtype=np.int64).reshape(-1, 2)
+    rule_index, subtree_ids = RuleIndex.build(closure[:, 0], closure[:, 1]).lookup(category_id[has_category])
+
+    return RuleSet(
+        promotion_ids=column(row[0] for row in rows),
+        percent_bp=column(round((row[3] or 0) * 100) for row in rows),
+        amount_off=column(row[4] or 0 for row in rows),
+        min_quantity=column(row[5] or 1 for row in rows),
+        coupon=column(coupon_codes[row[6].upper()] if row[6] else NO_COUPON for row in rows),
+        coupon_codes=coupon_codes,
+        by_product=RuleIndex.build(product_id[has_product], rule_ids[has_product]),
+        by_category=RuleIndex.build(subtree_ids, rule_ids[has_category][rule_index]),
+        global_rules=rule_ids[~has_product & ~has_category],
+    )
+
+
+@dataclass(frozen=True)
+class PricedLines:
+    subtotal: np.ndarray  # unit price x quantity
+    discount: np.ndarray
+    promotion_id: np.ndarray  # NO_PROMOTION where none applied
+
+    @property
+    def total(self) -> np.ndarray:
+        return self.subtotal - self.discount
+
+
+def price_lines(
+    rules: RuleSet,
+    cart_index: np.ndarray,
+    category_ids: np.ndarray,
+    product_ids: np.ndarray,
+    quantities: np.ndarray,
+    unit_amounts: np.ndarray,
+    cart_coupons: Optional[list[Iterable[str]]] = None
+) -> PricedLines:
+    """
+    Best discount for each line (int64 arrays, one entry per line; category
+    id 0 for uncategorized products). cart_coupons[c] are the upper-case
+    codes cart c presented.
+    """
+    lines = product_ids.size
+    subtotal = unit_amounts * quantities
+    discount = np.zeros(lines, dtype=np.int64)
+    promotion_id = np.full(lines, NO_PROMOTION, dtype=np.int64)
+    if lines == 0 or len(rules) == 0:
+        return PricedLines(subtotal, discount, promotion_id)
+
+    # 1. Candidate (line, rule) pairs
+    by_product = rules.by_product.lookup(product_ids)
+    by_category = rules.by_category.lookup(category_ids)
+    line = np.concatenate([by_product[0], by_category[0], np.repeat(np.arange(lines), rules.global_rules.size)])
+    rule = np.concatenate([by_product[1], by_category[1], np.tile(rules.global_rules, lines)])
+
+    # 2. Qualifying pairs
+    quantity = quantities[line]
+    eligible = quantity >= rules.min_quantity[rule]
+    coupon = rules.coupon[rule]
+    needs_coupon = coupon != NO_COUPON
+    if needs_coupon.any():
+        # presented[cart, coupon], with a last always-false column for pairs without a coupon
+        carts = max(int(cart_index.max()) + 1, len(cart_coupons or []))
+        presented = np.zeros((carts, len(rules.coupon_codes) + 1), dtype=bool)
+        known = rules.coupon_codes
+        for cart, codes in enumerate(cart_coupons or []):
+            for code in codes:
+                if code in known:
+                    presented[cart, known[code]] = True
+        eligible &= ~needs_coupon | presented[cart_index[line], coupon]
+    line, rule, quantity = line[eligible], rule[eligible], quantity[eligible]
+    if line.size == 0:
+        return PricedLines(subtotal, discount, promotion_id)
+
+    # 3. Discount per pair
+    unit = unit_amounts[line]
+    percent = (unit * quantity * rules.percent_bp[rule] + BASIS_POINTS // 2) // BASIS_POINTS
+    amount = np.minimum(rules.amount_off[rule], unit) * quantity
+    pair_discount = np.maximum(percent, amount)
+
+    # 4. Best per line (ties go to the later promotion)
+    np.maximum.at(discount, line, pair_discount)
+    winners = (pair_discount == discount[line]) & (pair_discount > 0)
+    promotion_id[line[winners]] = rules.promotion_ids[rule[winners]]
+    return PricedLines(subtotal, discount, promotion_id)
+
+
+def cart_totals(cart_index: np.ndarray, values: np.ndarray, carts: int) -> np.ndarray:
+    totals = np.zeros(carts, dtype=np.int64)
+    np.add.at(totals, cart_index, values)
+    return totals
+
+# -----------------------------
+# Loading and caching
+# -----------------------------
+
+def load_rules(db: Session, at: Optional[datetime] = None) -> RuleSet:
+    """Compile the promotions active at `at` (default now), in two queries."""
+    at = at or _now()
+    promotions = db.execute(
+        select(
+            Promotion.id, Promotion.product_id, Promotion.category_id, Promotion.percent_off,
+            Promotion.amount_off, Promotion.min_quantity, Promotion.coupon_code
+        ).where(
+            Promotion.active.is_(True),
+            or_(Promotion.starts_at.is_(None), Promotion.starts_at <= at),
+            or_(Promotion.ends_at.is_(None), Promotion.ends_at > at)
+        ).order_by(Promotion.id)
+    ).all()
+    closure = []
+    if any(row.category_id for row in promotions):
+        closure = db.execute(select(CategoryClosure.ancestor_id, CategoryClosure.descendant_id)).all()
+    return compile_rules(promotions, closure)
+
+
+def _next_change(db: Session, at: datetime) -> Optional[datetime]:
+    """When the set of active promotions next changes on its own (a start or end date)."""
+    starts = db.scalar(select(Promotion.starts_at).where(Promotion.active.is_(True), Promotion.starts_at > at)
+                       .order_by(Promotion.starts_at).limit(1))
+    ends = db.scalar(select(Promotion.ends_at).where(Promotion.active.is_(True), Promotion.ends_at > at)
+                     .order_by(Promotion.ends_at).limit(1))
+    return min(filter(None, (starts, ends)), default=None)
+
+
+class PromotionCache:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._rules: Optional[RuleSet] = None
+        self._expires = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> RuleSet:
+        rules = self._rules
+        if rules is not None and time.monotonic() < self._expires:
+            return rules
+        with self._lock:
+            if self._rules is not None and time.monotonic() < self._expires:
+                return self._rules
+            generation = self._generation
+            at = _now()
+            rules = load_rules(db, at)
+            ttl = self.ttl
+            change = _next_change(db, at)
+            if change is not None:
+                ttl = min(ttl, (change - at).total_seconds())
+            if generation == self._generation:
+                self._rules, self._expires = rules, time.monotonic() + ttl
+            return rules
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._rules = None
+
+
+promotion_rules = PromotionCache(settings.PROMOTIONS_CACHE_TTL_SECONDS)
+
+# -----------------------------
+# Carts
+# -----------------------------
+
+@dataclass(frozen=True)
+class CartLines:
+    """Lines of one or more carts as parallel arrays, priced from the database."""
+    cart_index: np.ndarray
+    product_ids: np.ndarray
+    category_ids: np.ndarray
+    quantities: np.ndarray
+    unit_amounts: np.ndarray
+    missing: list[int]  # product ids that don't exist (their lines are dropped)
+
+
+def load_cart_lines(db: Session, carts: list[list[tuple[int, int]]]) -> CartLines:
+    """Current price and category of every (product_id, quantity) line, in one query."""
+    cart_index = np.repeat(np.arange(len(carts)), [len(lines) for lines in carts])
+    pairs = np.array([line for lines in carts for line in lines], dtype=np.int64).reshape(-1, 2)
+    product_ids, quantities = pairs[:, 0], pairs[:, 1]
+
+    unique_ids = np.unique(product_ids)
+    rows = db.execute(
+        select(Product.id, Product.price, Product.category_id)
+        .where(Product.id == any_(literal(unique_ids.tolist(), ARRAY(Integer))))
+        .order_by(Product.id)
+    ).all()
+    known = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    prices = np.fromiter((to_cents(row[1]) for row in rows), dtype=np.int64, count=len(rows))
+    categories = np.fromiter((row[2] or 0 for row in rows), dtype=np.int64, count=len(rows))
+
+    position = np.searchsorted(known, product_ids)
+    found = position < known.size
+    found[found] = known[position[found]] == product_ids[found]
+    position = position[found]
+    return CartLines(
+        cart_index=cart_index[found],
+        product_ids=product_ids[found],
+        category_ids=categories[position],
+        quantities=quantities[found],
+        unit_amounts=prices[position],
+        missing=np.setdiff1d(unique_ids, known).tolist(),
+    )
+
+
+def quote_carts(
+    db: Session,
+    carts: list[list[tuple[int, int]]],
+    coupons: Optional[list[Iterable[str]]] = None,
+    include_lines: bool = False
+) -> tuple[list[dict], list[int]]:
+    """Subtotal, discount and total per cart (and per line if asked), plus unknown product ids."""
+    lines = load_cart_lines(db, carts)
+    priced = price_lines(
+        promotion_rules.get(db), lines.cart_index, lines.category_ids, lines.product_ids,
+        lines.quantities, lines.unit_amounts, coupons
+    )
+    subtotals = cart_totals(lines.cart_index, priced.subtotal, len(carts)).tolist()
+    discounts = cart_totals(lines.cart_index, priced.discount, len(carts)).tolist()
+    quotes = [
+        {"subtotal": subtotal, "discount": discount, "total": subtotal - discount}
+        for subtotal, discount in zip(subtotals, discounts)
+    ]
+    if include_lines:
+        for quote in quotes:
+            quote["lines"] = []
+        columns = zip(
+            lines.cart_index.tolist(), lines.product_ids.tolist(), lines.quantities.tolist(),
+            lines.unit_amounts.tolist(), priced.subtotal.tolist(), priced.discount.tolist(),
+            priced.promotion_id.tolist()
+        )
+        for cart, product_id, quantity, unit, subtotal, discount, promotion_id in columns:
+            quotes[cart]["lines"].append({
+                "product_id": product_id,
+                "quantity": quantity,
+                "unit_amount": unit,
+                "subtotal": subtotal,
+                "discount": discount,
+                "total": subtotal - discount,
+                "promotion_id": None if promotion_id == NO_PROMOTION else promotion_id,
+            })
+    return quotes, lines.missing
+
+
+def checkout_price(db: Session, product: Product, quantity: int = 1,
+                   coupons: Iterable[str] = ()) -> tuple[int, Optional[int]]:
+    """Discounted total in cents for `quantity` of a loaded product, and the promotion applied."""
+    def one(value: int) -> np.ndarray:
+        return np.array([value], dtype=np.int64)
+
+    priced = price_lines(
+        promotion_rules.get(db), one(0), one(product.category_id or 0), one(product.id),
+        one(quantity), one(to_cents(product.price)), [[code.upper() for code in coupons]]
+    )
+    promotion_id = int(priced.promotion_id[0])
+    return int(priced.total[0]), None if promotion_id == NO_PROMOTION else promotion_id
+
+# -----------------------------
+# ORM hooks
+# -----------------------------
+
+@event.listens_for(Session, "after_flush")
+def _note_rule_changes(session: Session, flush_context) -> None:
+    # Category moves change which products a category rule reaches
+    if any(isinstance(obj, (Promotion, Category)) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info[_CHANGED_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_rules(session: Session) -> None:
+    if session.info.pop(_CHANGED_KEY, False):
+        promotion_rules.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_changes(session: Session, previous_transaction) -> None:
+    session.info.pop(_CHANGED_KEY, None)
@@ -0,0 +1,248 @@
+# backend/services/product_events.py
+"""
+Product change feed for GET /products/stream (Server-Sent Events).
+
+Writers call notify_product_changes() inside their transaction. It issues
+pg_notify on the product_events channel, and Postgres delivers
+notifications only once the transaction commits, so rolled-back changes
+are never announced. Every worker holds one LISTEN connection
+(ProductEventListener, started from main.lifespan) and hands the events
+to its in-process broadcaster. That includes the worker that made the
+change.
+
+The broadcaster indexes subscribers by product id. An event costs one
+dict lookup per product plus an append for each watcher of that product,
+and idle watchers cost one small object each. Every connection has a
+bounded queue. A consumer that falls PRODUCT_STREAM_QUEUE_SIZE events
+behind is told to resync and is disconnected, instead of the queue
+buffering without limit.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Iterable, Optional
+
+from anyio import to_thread
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "product_events"
+# Postgres caps NOTIFY payloads at 8000 bytes
+MAX_PAYLOAD_BYTES = 7900
+RECONNECT_DELAY = 5
+
+
+def product_event(product) -> dict:
+    return {"id": product.id, "name": product.name, "price": product.price, "image_url": product.image_url}
+
+
+def deleted_event(product_id: int) -> dict:
+    return {"id": product_id, "deleted": True}
+
+
+def _payloads(events: list[dict]) -> Iterable[str]:
+    """JSON arrays of events, each small enough for one NOTIFY."""
+    chunk, size = [], 2
+    for event in events:
+        encoded = json.dumps(event, separators=(",", ":"))
+        if chunk and size + len(encoded) + 1 > MAX_PAYLOAD_BYTES:
+            yield "[" + ",".join(chunk) + "]"
+            chunk, size = [], 2
+        chunk.append(encoded)
+        size += len(encoded) + 1
+    if chunk:
+        yield "[" + ",".join(chunk) + "]"
+
+
+def notify_product_changes(db: Session, events: list[dict]) -> None:
+    """Announce product changes once the caller's transaction commits (no commit here)."""
+    for payload in _payloads(events):
+        db.execute(text("SELECT pg_notify(:channel, :payload)"), {"channel": CHANNEL, "payload": payload})
+
+
+# --------------------------------
+# In-process broadcaster
+# --------------------------------
+
+class Subscriber:
+    """One stream connection: the products it watches and its pending events."""
+
+    def __init__(self, ids: frozenset[int], max_pending: int):
+        self.ids = ids
+        self.pending: deque[tuple[str, dict]] = deque()
+        self.max_pending = max_pending
+        self.overflowed = False
+        self.ready = asyncio.Event()
+
+    def offer(self, kind: str, event: dict) -> None:
+        if self.overflowed:
+            return
+        if len(self.pending) >= self.max_pending:
+            self.overflowed = True
+            self.pending.clear()
+        else:
+            self.pending.append((kind, event))
+        self.ready.set()
+
+    async def next_batch(self, timeout: float) -> list[tuple[str, dict]]:
+        """Pending events, waiting up to `timeout` for some; [] on timeout."""
+        if not self.pending and not self.overflowed:
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self.ready.clear()
+        batch = list(self.pending)
+        self.pending.clear()
+        return batch
+
+
+class ProductBroadcaster:
+    """Fans product events out to subscribers; used only from the event loop."""
+
+    def __init__(self):
+        self._by_product: dict[int, set[Subscriber]] = {}
+        self._subscribers: set[Subscriber] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, ids: Iterable[int]) -> Subscriber:
+        subscriber = Subscriber(frozenset(ids), settings.PRODUCT_STREAM_QUEUE_SIZE)
+        self._subscribers.add(subscriber)
+        for product_id in subscriber.ids:
+            self._by_product.setdefault(product_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+        for product_id in subscriber.ids:
+            watchers = self._by_product.get(product_id)
+            if watchers is not None:
+                watchers.discard(subscriber)
+                if not watchers:
+                    del self._by_product[product_id]
+
+    def publish(self, events: list[dict]) -> None:
+        for event in events:
+            watchers = self._by_product.get(event.get("id"))
+            if watchers:
+                kind = "deleted" if event.get("deleted") else "product"
+                for subscriber in watchers:
+                    subscriber.offer(kind, event)
+
+    def resync(self) -> None:
+        """Tell every subscriber that events may have been missed."""
+        for subscriber in self._subscribers:
+            subscriber.offer("resync", {})
+
+
+broadcaster = ProductBroadcaster()
+
+
+# --------------------------------
+# LISTEN connection
+# --------------------------------
+
+class ProductEventListener:
+    """Per-worker LISTEN on product_events, feeding the broadcaster."""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._connection = None
+
+    def _connect(self):
+        # A dedicated connection, detached from the pool: it stays in LISTEN for the worker's lifetime
+        proxied = engine.raw_connection()
+        proxied.detach()
+        connection = proxied.driver_connection
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {CHANNEL}")
+        return connection
+
+    def _drain(self, connection) -> None:
+        connection.poll()
+        events = []
+        while connection.notifies:
+            notify = connection.notifies.pop(0)
+            try:
+                events += json.loads(notify.payload)
+            except ValueError:
+                logger.warning(f"Ignoring malformed product event: {notify.payload[:200]}")
+        if events:
+            broadcaster.publish(events)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        reconnecting = False
+        while True:
+            try:
+                self._connection = await to_thread.run_sync(self._connect)
+            except Exception as e:
+                logger.error(f"Product event listener could not connect: {str(e)}")
+                await asyncio.sleep(RECONNECT_DELAY)
+                reconnecting = True
+                continue
+
+            if reconnecting:
+                # Changes made while we weren't listening are lost
+                broadcaster.resync()
+            lost = loop.create_future()
+
+            def on_readable():
+                try:
+                    self._drain(self._connection)
+                except Exception as e:
+                    if not lost.done():
+                        lost.set_exception(e)
+
+            fd = self._connection.fileno()
+            loop.add_reader(fd, on_readable)
+            try:
+                while not lost.done():
+                    # Also catches connections that died without the socket becoming readable
+                    await asyncio.wait([lost], timeout=settings.PRODUCT_STREAM_HEARTBEAT_SECONDS)
+                    if not lost.done():
+                        with self._connection.cursor() as cursor:
+                            cursor.execute("SELECT 1")
+                        self._drain(self._connection)
+                lost.result()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Product event listener lost its connection: {str(e)}")
+            finally:
+                loop.remove_reader(fd)
+                self._close()
+            reconnecting = True
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+            self._connection = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="product-event-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+listener = ProductEventListener()
@@ -0,0 +1,188 @@
+# backend/services/recommendations.py
+"""
+"Frequently bought together", precomputed from completed orders.
+
+The basket matrix B (orders x products, 1 where the order contains the
+product) is built with SciPy from order_items in one streamed query, and
+the co-occurrence matrix is C = Bᵀ·B with the diagonal dropped. Every
+non-zero of C is stored in product_cooccurrence; the top-K per product,
+ranked with a single vectorized lexsort, goes to related_products.
+
+refresh_related_products() (a scheduler job) only looks at orders
+completed since the last run: it adds their Bᵀ·B to the stored counts and
+re-ranks just the products that appeared in them.
+"""
+import io
+import logging
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.order import Order, OrderItem, OrderStatus
+from models.recommendation import ProductCooccurrence, RecommendationState, RelatedProduct
+
+logger = logging.getLogger(__name__)
+
+# Orders completed more recently than this may still be in uncommitted
+# transactions; leave them for the next run so none are skipped
+SETTLE_DELAY = timedelta(minutes=5)
+COPY_CHUNK_ROWS = 1_000_000
+FETCH_ROWS = 100_000
+
+
+def _settled_cutoff() -> datetime:
+    return (datetime.now(timezone.utc) - SETTLE_DELAY).replace(tzinfo=None)
+
+# -----------------------------
+# Matrix math
+# -----------------------------
+
+def cooccurrence(order_ids: np.ndarray, product_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (product_id, other_id, count) for every pair of distinct products bought
+    in the same order, from parallel arrays of order line ids.
+    """
+    if order_ids.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    orders, order_index = np.unique(order_ids, return_inverse=True)
+    products, product_index = np.unique(product_ids, return_inverse=True)
+    baskets = sparse.csr_matrix(
+        (np.ones(order_index.size, dtype=np.int32), (order_index, product_index)),
+        shape=(orders.size, products.size)
+    )
+    baskets.data[:] = 1  # duplicate lines were summed; an order counts once per product
+    counts = (baskets.T @ baskets).tocoo()
+    off_diagonal = counts.row != counts.col
+    return (
+        products[counts.row[off_diagonal]],
+        products[counts.col[off_diagonal]],
+        counts.data[off_diagonal].astype(np.int64),
+    )
+
+
+def top_k(product_ids: np.ndarray, other_ids: np.ndarray, counts: np.ndarray, k: int):
+    """Keep the `k` highest counts per product (ties -> lower id); returns arrays plus 0-based rank."""
+    order = np.lexsort((other_ids, -counts, product_ids))
+    product_ids, other_ids, counts = product_ids[order], other_ids[order], counts[order]
+    starts = np.flatnonzero(np.r_[True, product_ids[1:] != product_ids[:-1]])
+    lengths = np.diff(np.r_[starts, product_ids.size])
+    rank = np.arange(product_ids.size) - np.repeat(starts, lengths)
+    keep = rank < k
+    return product_ids[keep], other_ids[keep], counts[keep], rank[keep]
+
+# -----------------------------
+# Database I/O
+# -----------------------------
+
+def _fetch_arrays(db: Session, query, columns: int) -> list[np.ndarray]:
+    """Stream a query of integer columns into one int64 array per column."""
+    result = db.execute(query, execution_options={"stream_results": True, "yield_per": FETCH_ROWS})
+    chunks = [np.asarray(part, dtype=np.int64) for part in result.partitions()]
+    if not chunks:
+        return [np.empty(0, dtype=np.int64) for _ in range(columns)]
+    rows = np.concatenate(chunks)
+    return [rows[:, i] for i in range(columns)]
+
+
+def _basket_lines(db: Session, condition) -> list[np.ndarray]:
+    query = (
+        select(OrderItem.order_id, OrderItem.product_id)
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.status == OrderStatus.completed, OrderItem.product_id.is_not(None), condition)
+    )
+    return _fetch_arrays(db, query, 2)
+
+
+def _copy(db: Session, table: str, columns: tuple[str, ...], *arrays: np.ndarray) -> None:
+    rows = np.column_stack(arrays)
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    cursor = db.connection().connection.cursor()
+    try:
+        for start in range(0, len(rows), COPY_CHUNK_ROWS):
+            buffer = io.StringIO()
+            np.savetxt(buffer, rows[start:start + COPY_CHUNK_ROWS], fmt="%d", delimiter="\t")
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+
+
+def _write_related(db: Session, product_ids, other_ids, counts) -> None:
+    product_ids, other_ids, counts, rank = top_k(product_ids, other_ids, counts, settings.RECOMMENDATIONS_TOP_K)
+    _copy(db, RelatedProduct.__tablename__, ("product_id", "rank", "related_id", "score"),
+          product_ids, rank, other_ids, counts)
+
+
+def _save_state(db: Session, orders_through: datetime) -> None:
+    state = db.get(RecommendationState, 1) or RecommendationState(id=1)
+    state.orders_through = orders_through
+    state.built_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    db.add(state)
+
+# -----------------------------
+# Jobs
+# -----------------------------
+
+def rebuild_related_products(db: Session) -> int:
+    """Recompute the whole matrix from every completed order; returns pairs stored."""
+    through = _settled_cutoff()
+    # Orders completed before completed_at existed still count
+    order_ids, product_ids = _basket_lines(db, func.coalesce(Order.completed_at, Order.created_at) <= through)
+    product_ids, other_ids, counts = cooccurrence(order_ids, product_ids)
+
+    # DELETE rather than TRUNCATE: readers keep seeing the old rows until commit
+    db.execute(delete(ProductCooccurrence))
+    db.execute(delete(RelatedProduct))
+    _copy(db, ProductCooccurrence.__tablename__, ("product_id", "other_id", "count"),
+          product_ids, other_ids, counts)
+    _write_related(db, product_ids, other_ids, counts)
+    _save_state(db, through)
+    db.commit()
+    return int(counts.size)
+
+
+def refresh_related_products(db: Session) -> int:
+    """Fold orders completed since the last run into the matrix; returns products re-ranked."""
+    state = db.get(RecommendationState, 1)
+    if state is None or state.orders_through is None:
+        return rebuild_related_products(db)
+
+    through = _settled_cutoff()
+    order_ids, product_ids = _basket_lines(
+        db, (Order.completed_at > state.orders_through) & (Order.completed_at <= through)
+    )
+    delta_products, delta_others, delta_counts = cooccurrence(order_ids, product_ids)
+
+    affected = np.unique(delta_products)
+    if affected.size:
+        db.execute(text(
+            "CREATE TEMP TABLE cooccurrence_delta (product_id int, other_id int, count int) ON COMMIT DROP"
+        ))
+        _copy(db, "cooccurrence_delta", ("product_id", "other_id", "count"),
+              delta_products, delta_others, delta_counts)
+        db.execute(text(
+            "INSERT INTO product_cooccurrence (product_id, other_id, count) "
+            "SELECT product_id, other_id, count FROM cooccurrence_delta "
+            "ON CONFLICT (product_id, other_id) "
+            "DO UPDATE SET count = product_cooccurrence.count + excluded.count"
+        ))
+
+        # Only rows of products in the new orders changed; re-rank just those
+        ids = affected.tolist()
+        rows = _fetch_arrays(
+            db,
+            select(ProductCooccurrence.product_id, ProductCooccurrence.other_id, ProductCooccurrence.count)
+            .where(ProductCooccurrence.product_id.in_(ids)),
+            3
+        )
+        db.execute(delete(RelatedProduct).where(RelatedProduct.product_id.in_(ids)))
+        _write_related(db, *rows)
+
+    _save_state(db, through)
+    db.commit()
+    return int(affected.size)